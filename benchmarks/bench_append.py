@@ -0,0 +1,76 @@
+"""Measures adding many users and products, against a DataFrame copy per insert.
+Run from the repository root: python benchmarks/bench_append.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tables import Food, Users
+
+SIZES = [1000, 10000, 100000]
+COPY_LIMIT = 10000
+
+
+def copy_per_insert(df, rows):
+    """What DataFrame.append did: the whole table is copied on every insert"""
+
+    for row in rows:
+        df = pd.concat([df, pd.DataFrame([row], columns=df.columns)], ignore_index=True)
+    return df
+
+
+def add_bulk(table, rows):
+    table.add_many_to_object(rows)
+    return table.df
+
+
+def add_one_by_one(add, table, rows):
+    for row in rows:
+        add(*row)
+    return table.df
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        users_path = os.path.join(tmp, "users.csv")
+        food_path = os.path.join(tmp, "Food.csv")
+        pd.DataFrame(columns=["userName", "password", "sex", "age", "w", "h", "activity", "goal"]).to_csv(
+            users_path, index=False)
+        pd.DataFrame(columns=["product", "proteins", "fats", "carbohydrates", "calories"]).to_csv(
+            food_path, index=False)
+
+        print("%8s %12s %12s %12s %12s %12s" % ("rows", "users bulk", "users add", "food bulk", "food add",
+                                                 "copy/insert"))
+        for size in SIZES:
+            users = [("User" + str(i), "password") for i in range(size)]
+            products = ["Product " + str(i) for i in range(size)]
+
+            users_bulk = timed(add_bulk, Users(users_path, hash_iterations=1), users)
+            food_bulk = timed(add_bulk, Food(food_path), products)
+
+            users_table = Users(users_path)
+            users_add = timed(add_one_by_one, users_table.__add__, users_table, users)
+            food = Food(food_path)
+            food_add = timed(add_one_by_one, food.add_new_to_object, food, [[product] for product in products])
+
+            if size <= COPY_LIMIT:
+                rows = [[product, 0, 0, 0, 0] for product in products]
+                copy = "%12.3f" % timed(copy_per_insert, Food(food_path).df, rows)
+            else:
+                copy = "%12s" % "-"
+
+            print("%8d %12.3f %12.3f %12.3f %12.3f %s" % (size, users_bulk, users_add, food_bulk, food_add, copy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compares totals of many stored menus calculated row by row through Menu
+with the batch evaluation of menu_batch, and checks both give the same totals.
+Run from the repository root: python benchmarks/bench_batch_menus.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food
+from menu_batch import evaluate_meals, evaluate_menus
+from tables import Food, Menu
+
+PRODUCTS = 100000
+MENU_COUNTS = [1000, 10000, 50000]
+MAX_ROWS = 10
+
+
+def make_menus(count, rng):
+    sizes = rng.integers(1, MAX_ROWS + 1, count)
+    return [[["Product %d" % product, int(volume)]
+             for product, volume in zip(rng.integers(0, PRODUCTS, size), rng.integers(10, 500, size))]
+            for size in sizes]
+
+
+def row_loop(food, menus):
+    totals = []
+    for rows in menus:
+        menu = Menu(food)
+        for product, volume in rows:
+            menu.add_row(product, volume)
+        totals.append(menu.sum_cal)
+    return np.array(totals)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("%8s %8s %14s %12s %14s %9s %6s" % (
+        "menus", "rows", "row loop, ms", "batch, ms", "table, ms", "speedup", "same"))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "Food.csv")
+        make_food(PRODUCTS).to_csv(filename, index=False)
+        food = Food(filename)
+
+        for count in MENU_COUNTS:
+            menus = make_menus(count, rng)
+            meals = pd.DataFrame([[number, product, volume] for number, rows in enumerate(menus)
+                                  for product, volume in rows], columns=["menu", "product", "volume"])
+
+            expected, loop_seconds = timed(row_loop, food, menus)
+            totals, batch_seconds = timed(evaluate_menus, food, menus)
+            by_meals, meals_seconds = timed(evaluate_meals, food, meals, ["menu"])
+            same = (totals == expected).all() and (by_meals.iloc[:, 1:].to_numpy() == expected).all()
+            print("%8d %8d %14.1f %12.1f %14.1f %8.0fx %6s" % (
+                count, len(meals), loop_seconds * 1000, batch_seconds * 1000, meals_seconds * 1000,
+                loop_seconds / batch_seconds, same))
+
+
+if __name__ == "__main__":
+    main()
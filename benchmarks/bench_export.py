@@ -0,0 +1,70 @@
+"""Measures the streaming export against the number of users: speed, size of the report
+and peak memory, which stays flat, next to peak memory of loading the whole Users table.
+Every case runs in its own process and the users are made in another one,
+as a process started by fork keeps the peak of its parent.
+The users include one just registered, without parameters, who must get no BMI category.
+Run from the repository root: python benchmarks/bench_export.py"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculator import NO_BMI_CATEGORY
+from history import MealHistory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [100000, 1000000, 3000000]
+USERS_WITH_HISTORY = 1000
+DAY = "2024-05-01"
+NEW_USER = "Fresh"
+MAKE_USERS = ("import sys; sys.path.insert(0, %r); from bench_storage import make_users; "
+              "users = make_users(int(sys.argv[2])); users.loc[len(users)] = [%r, 'password', 0, 0, 0, 0, 0, 0]; "
+              "users.to_csv(sys.argv[1], index=False)" % (os.path.join(ROOT, "benchmarks"), NEW_USER))
+LOAD_USERS = ("import resource, sys; sys.path.insert(0, %r); from tables import Users; Users(sys.argv[1]); "
+              "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)" % ROOT)
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+
+def check_new_user(report_filename):
+    report = pd.read_csv(report_filename)
+    user = report[report["userName"] == NEW_USER].iloc[0]
+    return user["bmiCategory"] == NO_BMI_CATEGORY and not user["valid"]
+
+
+def main():
+    print("%10s %12s %10s %12s %12s %16s" % ("users", "format", "time, s", "users/s", "peak, MB", "Users load, MB"))
+    with tempfile.TemporaryDirectory() as directory:
+        history_directory = os.path.join(directory, "history")
+        history = MealHistory(history_directory)
+        for i in range(USERS_WITH_HISTORY):
+            history.set_day("User%d" % i, DAY, [["Milk", 200, 20, 46, 9, 532], ["Banana", 100, 1, 0, 23, 99]])
+        history.save()
+
+        for size in SIZES:
+            users_filename = os.path.join(directory, "users%d.csv" % size)
+            run("-c", MAKE_USERS, users_filename, str(size))
+            load_peak = float(run("-c", LOAD_USERS, users_filename))
+
+            for output in ["report.csv.gz", "report.jsonl.gz"]:
+                output = os.path.join(directory, output)
+                text = run("export.py", output, "--users", users_filename, "--history", history_directory,
+                           "--day", DAY)
+                seconds = float(re.search(r"in ([\d.]+) s", text).group(1))
+                peak = re.search(r"Peak memory: (\d+)", text)
+                print("%10d %12s %10.1f %12d %12s %16.0f" % (
+                    size, output.split(".", 1)[1], seconds, size / max(seconds, 1e-9),
+                    peak.group(1) if peak else "-", load_peak))
+                if size == SIZES[0] and output.endswith(".csv.gz") and not check_new_user(output):
+                    sys.exit("The new user without parameters got a BMI category")
+
+
+if __name__ == "__main__":
+    main()
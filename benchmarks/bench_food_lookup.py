@@ -0,0 +1,53 @@
+"""Measures Food.get_product cost for catalogues from 10 to 1M products.
+Run from the repository root: python benchmarks/bench_food_lookup.py"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tables import Food
+
+SIZES = [10, 1000, 100000, 1000000]
+LOOKUPS = 10000
+SCAN_LOOKUPS = 20
+
+
+def make_food_csv(path, size):
+    df = pd.DataFrame({
+        "product": ["Product " + str(i) for i in range(size)],
+        "proteins": 1.0,
+        "fats": 1.0,
+        "carbohydrates": 1.0,
+        "calories": 17})
+    df.to_csv(path, index=False)
+
+
+def time_lookups(lookup, names):
+    start = time.perf_counter()
+    for name in names:
+        lookup(name)
+    return (time.perf_counter() - start) / len(names) * 1e6
+
+
+def main():
+    print("%10s %18s %18s" % ("products", "index, us/lookup", "scan, us/lookup"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, "Food.csv")
+            make_food_csv(path, size)
+            food = Food(path)
+
+            names = ["Product " + str(random.randrange(size)) for _ in range(LOOKUPS)]
+            indexed = time_lookups(food.get_product, names)
+            scan = time_lookups(lambda name: food.df[food.df["product"] == name], names[:SCAN_LOOKUPS])
+
+            print("%10d %18.2f %18.2f" % (size, indexed, scan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measures startup time and peak RSS of the food list: FoodTableModel against
+one QTableWidgetItem per cell. Every case runs in its own process.
+Run from the repository root: python benchmarks/bench_food_view.py"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODEL_SIZES = [10000, 100000, 1000000]
+WIDGET_SIZES = [10000, 50000]
+
+
+def make_food_csv(path, size):
+    df = pd.DataFrame({
+        "product": ["Product " + str(i) for i in range(size)],
+        "proteins": 1.0,
+        "fats": 1.0,
+        "carbohydrates": 1.0,
+        "calories": 17})
+    df.to_csv(path, index=False)
+
+
+def fill_widget(table, df):
+    """The way food_list_load_all filled tableFoods before FoodTableModel"""
+
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QTableWidgetItem
+
+    headers = df.columns.values.tolist()
+    table.setColumnCount(len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    for i, row in enumerate(df.itertuples(index=False)):
+        table.setRowCount(table.rowCount() + 1)
+        for j in range(table.columnCount()):
+            table.setItem(i, j, QTableWidgetItem(str(row[j])))
+            if j == 0 or j == 4:
+                table.item(i, j).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+
+
+def run_case(mode, path):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget
+    from main import FoodTableModel
+    from tables import Food
+
+    app = QApplication(sys.argv)
+    start = time.perf_counter()
+    food = Food(path)
+    loaded = time.perf_counter()
+
+    if mode == "model":
+        table = QTableView()
+        table.setModel(FoodTableModel(food))
+    else:
+        table = QTableWidget()
+        fill_widget(table, food.df)
+    table.show()
+    app.processEvents()
+    shown = time.perf_counter()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print("%.3f %.3f %.1f" % (loaded - start, shown - loaded, rss))
+
+
+def main():
+    if len(sys.argv) == 3:
+        run_case(sys.argv[1], sys.argv[2])
+        return
+
+    print("%8s %10s %10s %10s %10s" % ("mode", "products", "load, s", "view, s", "RSS, MB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [("model", size) for size in MODEL_SIZES] + [("widget", size) for size in WIDGET_SIZES]
+        for mode, size in cases:
+            path = os.path.join(tmp, "Food%d.csv" % size)
+            if not os.path.exists(path):
+                make_food_csv(path, size)
+
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), mode, path],
+                                    capture_output=True, text=True, cwd=ROOT).stdout.split()
+            print("%8s %10d %10s %10s %10s" % (mode, size, *output[-3:]))
+
+
+if __name__ == "__main__":
+    main()
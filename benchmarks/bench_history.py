@@ -0,0 +1,72 @@
+"""Compares range queries over daily totals with summing the raw meals.
+Run from the repository root: python benchmarks/bench_history.py"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from history import MealHistory, NUTRIENT_COLUMNS
+
+YEARS = [1, 3, 10]
+MEALS_PER_DAY = 10
+RANGES = [7, 90, 365]
+QUERIES = 100
+
+
+def fill_history(history, user_name, days, seed=0):
+    rng = random.Random(seed)
+    first_day = pd.Timestamp("2026-01-01") - pd.Timedelta(days=days)
+    for i in range(days):
+        meals = [["Product " + str(rng.randrange(1000)), 100, rng.randrange(30), rng.randrange(30),
+                  rng.randrange(60), rng.randrange(600)] for _ in range(MEALS_PER_DAY)]
+        history.set_day(user_name, first_day + pd.Timedelta(days=i), meals)
+    return first_day
+
+
+def scan_average(history, user_name, start, end):
+    """Average from the raw meals: reads every month of the range"""
+
+    months = pd.period_range(start, end, freq="M")
+    meals = pd.concat([meals for meals in (history.get_month(user_name, str(month)) for month in months)
+                       if not meals.empty])
+    meals = meals[(meals["day"] >= start) & (meals["day"] <= end)]
+    return meals.groupby("day")[NUTRIENT_COLUMNS].sum().mean()
+
+
+def time_queries(query, last_day, days):
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        end = last_day - pd.Timedelta(days=i)
+        query(end - pd.Timedelta(days=days - 1), end)
+    return (time.perf_counter() - start) / QUERIES * 1e3
+
+
+def main():
+    print("%6s %6s %16s %16s %16s" % ("years", "days", "rollup, ms", "raw scan, ms", "raw read, ms"))
+    for years in YEARS:
+        with tempfile.TemporaryDirectory() as tmp:
+            history = MealHistory(tmp)
+            first_day = fill_history(history, "User", years * 365)
+            history.save()
+            last_day = first_day + pd.Timedelta(days=years * 365 - 1)
+
+            for days in RANGES:
+                loaded = MealHistory(tmp)
+                rollup = time_queries(lambda start, end: loaded.average("User", start, end), last_day, days)
+                scan = time_queries(lambda start, end: scan_average(loaded, "User", start, end), last_day, days)
+
+                # Raw meals read from disk for every query, as a store without cached months would
+                cold = MealHistory(tmp)
+                start = time.perf_counter()
+                scan_average(cold, "User", last_day - pd.Timedelta(days=days - 1), last_day)
+                read = (time.perf_counter() - start) * 1e3
+                print("%6d %6d %16.3f %16.3f %16.3f" % (years, days, rollup, scan, read))
+
+
+if __name__ == "__main__":
+    main()
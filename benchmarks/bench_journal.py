@@ -0,0 +1,40 @@
+"""Compares save time through the journal with rewriting the whole file.
+Run from the repository root: python benchmarks/bench_journal.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tables import Users
+from bench_storage import make_users
+
+SIZE = 1000000
+EDITS = [1, 10, 100]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "users.csv")
+        make_users(SIZE).to_csv(filename, index=False)
+        users = Users(filename)
+
+        print("%8s %12s %12s" % ("edits", "journal, s", "rewrite, s"))
+        for edits in EDITS:
+            for i in range(edits):
+                users.find("User" + str(i), False)
+                users.set_current_user_data("w", 70 + i % 50)
+
+            start = time.perf_counter()
+            users.save_to_csv()
+            journal = time.perf_counter() - start
+
+            start = time.perf_counter()
+            users.compact()
+            rewrite = time.perf_counter() - start
+            print("%8d %12.4f %12.4f" % (edits, journal, rewrite))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measures login throughput against user count and password hash cost.
+Run from the repository root: python benchmarks/bench_login.py"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from passwords import hash_password
+from tables import Users
+from bench_storage import make_users
+
+SIZES = [1000, 100000, 1000000]
+COSTS = [1000, 10000, 100000]
+SECONDS = 1.0
+CACHED_USERS = 100
+
+
+def logins_per_second(login, size):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        login("User" + str(random.randrange(size)))
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    print("%8s %8s %12s %12s %12s" % ("users", "cost", "scan, 1/s", "cold, 1/s", "cached, 1/s"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            filename = os.path.join(tmp, "users%d.csv" % size)
+            make_users(size).to_csv(filename, index=False)
+            users = Users(filename)
+
+            def scan_login(user_name):
+                user = users.df[users.df["userName"] == user_name]
+                return user.iloc[0]["password"] == "password"
+
+            scan = logins_per_second(scan_login, size)
+
+            for cost in COSTS:
+                users.df["password"] = hash_password("password", cost)
+                users.hashIterations = cost
+
+                def login(user_name):
+                    users.find(user_name, False)
+                    return users.check_password("password")
+
+                def cold_login(user_name):
+                    users.passwordCache.clear()
+                    return login(user_name)
+
+                cold = logins_per_second(cold_login, size)
+                for i in range(CACHED_USERS):
+                    login("User" + str(i))
+                cached = logins_per_second(login, CACHED_USERS)
+                print("%8d %8d %12.0f %12.0f %12.0f" % (size, cost, scan, cold, cached))
+
+
+if __name__ == "__main__":
+    main()
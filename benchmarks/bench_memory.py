@@ -0,0 +1,88 @@
+"""Measures memory of 1M users and 1M products loaded with the schema types against
+plain pd.read_csv types, and checks that targets and menu numbers stay the same.
+Every case runs in its own process. Run from the repository root: python benchmarks/bench_memory.py"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_storage import make_food, make_users
+
+SIZE = 1000000
+CHECK_SIZE = 100000
+
+
+def current_rss():
+    """Resident memory in MB from /proc, Linux only"""
+
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def run_case(mode, table, path):
+    from tables import Food, Users  # both modes pay for the same imports
+
+    before = current_rss()
+    if mode == "plain":
+        df = pd.read_csv(path)
+    elif table == "food":
+        df = Food(path).df
+    else:
+        df = Users(path).df
+    after = current_rss()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print("%.1f %.1f %.1f" % (df.memory_usage(deep=True).sum() / 1024 / 1024, after - before, peak))
+
+
+def check_results(food_path, users_path):
+    """Targets of every user and menu rows of every product must not change"""
+
+    from calculator import calculate_targets
+    from tables import Food, Menu, Users
+
+    same_targets = calculate_targets(pd.read_csv(users_path)).equals(calculate_targets(Users(users_path).df))
+
+    plain = pd.read_csv(food_path)
+    food = Food(food_path)
+    menu = Menu(food)
+    same_menu = True
+    for row in range(0, len(plain), len(plain) // 1000):
+        nutrients = plain.iloc[row, 1:5].tolist()
+        contribution, calories = menu.calculate_row(plain.iat[row, 0], 150)
+        same_menu &= contribution == [int(round(150 / 100, 6) * value) for value in nutrients]
+        same_menu &= calories == int(float(nutrients[3] / 100) * 150)
+    return same_targets, same_menu
+
+
+def main():
+    if len(sys.argv) == 4:
+        run_case(*sys.argv[1:])
+        return
+
+    print("%8s %8s %10s %14s %14s %14s" % ("table", "mode", "rows", "frame, MB", "RSS delta, MB", "peak RSS, MB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"food": os.path.join(tmp, "Food.csv"), "users": os.path.join(tmp, "users.csv")}
+        make_food(SIZE).to_csv(paths["food"], index=False)
+        make_users(SIZE).to_csv(paths["users"], index=False)
+
+        for table in ("users", "food"):
+            for mode in ("plain", "schema"):
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), mode, table, paths[table]],
+                                        capture_output=True, text=True, cwd=ROOT).stdout.split()
+                print("%8s %8s %10d %14s %14s %14s" % (table, mode, SIZE, *output[-3:]))
+
+        make_food(CHECK_SIZE).to_csv(paths["food"], index=False)
+        make_users(CHECK_SIZE).to_csv(paths["users"], index=False)
+        same_targets, same_menu = check_results(paths["food"], paths["users"])
+        print("\nSame targets: %s, same menu rows: %s" % (same_targets, same_menu))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measures time of plan_menu against the catalogue size and how close the menus are to the targets.
+Run from the repository root: python benchmarks/bench_optimizer.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food
+from optimizer import plan_menu
+from tables import Food
+
+SIZES = [1000, 10000, 100000, 1000000]
+TARGETS = [
+    [75, 60, 250, 1800],
+    [120, 70, 300, 2300],
+    [150, 90, 200, 2200],
+    [60, 50, 350, 2000]]
+REPEATS = 3
+
+
+def make_catalogue(size):
+    """Products with calories calculated from macros, as the food list keeps them"""
+
+    df = make_food(size)
+    df["calories"] = (df["proteins"] * 4 + df["carbohydrates"] * 4 + df["fats"] * 9).round()
+    return df
+
+
+def main():
+    print("%10s %12s %12s %14s %10s" % ("products", "solve, ms", "worst, ms", "deviation, %", "in 5%"))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            filename = os.path.join(directory, "Food%d.csv" % size)
+            make_catalogue(size).to_csv(filename, index=False)
+            food = Food(filename)
+
+            times = []
+            deviations = []
+            within = 0
+            for targets in TARGETS:
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    plan = plan_menu(food, targets)
+                    times.append(time.perf_counter() - start)
+                deviations.append(max(abs(value) for value in plan["deviation"]))
+                within += plan["withinTolerance"]
+            print("%10d %12.1f %12.1f %14.1f %7d/%d" % (
+                size, np.mean(times) * 1000, max(times) * 1000, max(deviations) * 100, within, len(TARGETS)))
+
+
+if __name__ == "__main__":
+    main()
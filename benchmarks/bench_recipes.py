@@ -0,0 +1,98 @@
+"""Compares a dish in a menu with a plain product and with its ingredients added one by one,
+and times an ingredient change recalculating only the dishes depending on it.
+Run from the repository root: python benchmarks/bench_recipes.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food
+from tables import Food, Menu
+
+PRODUCTS = 100000
+RECIPE_COUNTS = [1000, 10000]
+INGREDIENTS = 8
+NESTED = 0.3  # share of dishes with one dish made before among the ingredients
+ROWS = 5000
+EDITS = 1000
+
+
+def make_recipes(food, count, rng):
+    recipes = []
+    for i in range(count):
+        ingredients = [["Product %d" % rng.integers(PRODUCTS), int(rng.integers(10, 300))]
+                       for _ in range(INGREDIENTS)]
+        if recipes and rng.random() < NESTED:
+            ingredients[0][0] = recipes[rng.integers(len(recipes))]
+        recipe = "Dish %d" % i
+        food.set_recipe(recipe, ingredients)
+        recipes.append(recipe)
+    return recipes
+
+
+def expand(food, product, grams):
+    """Plain products of the dish with grams, as they would be added to the menu without dishes"""
+
+    ingredients = food.get_recipe(product)
+    if ingredients is None:
+        return [[product, grams]]
+
+    total = sum(amount for ingredient, amount in ingredients)
+    return [item for ingredient, amount in ingredients for item in expand(food, ingredient, grams * amount / total)]
+
+
+def per_row(add_rows, count):
+    start = time.perf_counter()
+    add_rows()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("%8s %12s %12s %16s %14s %16s %16s" % (
+        "dishes", "product, us", "dish, us", "ingredients, us", "ingredients", "edit, us", "all dishes, ms"))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in RECIPE_COUNTS:
+            filename = os.path.join(directory, "Food%d.csv" % count)
+            make_food(PRODUCTS).to_csv(filename, index=False)
+            food = Food(filename)
+            recipes = make_recipes(food, count, rng)
+
+            products = ["Product %d" % i for i in rng.integers(0, PRODUCTS, ROWS)]
+            dishes = [recipes[i] for i in rng.integers(0, count, ROWS)]
+            expanded = [expand(food, dish, 100) for dish in dishes]
+
+            menu = Menu(food)
+            product_us = per_row(lambda: [menu.add_row(product, 100) for product in products], ROWS)
+            menu = Menu(food)
+            dish_us = per_row(lambda: [menu.add_row(dish, 100) for dish in dishes], ROWS)
+            menu = Menu(food)
+            expanded_us = per_row(lambda: [menu.add_row(product, int(grams)) for items in expanded
+                                           for product, grams in items], ROWS)
+
+            # Edits of ingredients recalculate only the dishes depending on them
+            ingredients = [ingredient for recipe in recipes for ingredient, grams in food.get_recipe(recipe)
+                           if not food.is_recipe(ingredient)]
+            edited = [ingredients[i] for i in rng.integers(0, len(ingredients), EDITS)]
+
+            def edit():
+                for product in edited:
+                    food.get_product(product)
+                    food.update_current_product_data([10, 10, 10, 170])
+            edit_us = per_row(edit, EDITS)
+
+            start = time.perf_counter()
+            food.refresh_recipes(recipes, include_changed=True)
+            all_ms = (time.perf_counter() - start) * 1000
+
+            print("%8d %12.1f %12.1f %16.1f %14.1f %16.1f %16.1f" % (
+                count, product_us, dish_us, expanded_us, sum(len(items) for items in expanded) / ROWS,
+                edit_us, all_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measures product search latency for catalogues from 1000 to 1M products.
+First checks that the same name comes first when more than SCAN_LIMIT names begin with the query.
+Run from the repository root: python benchmarks/bench_search.py"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search import SCAN_LIMIT, ProductSearch
+
+SIZES = [1000, 100000, 1000000]
+QUERIES = 1000
+SYLLABLES = ["ba", "ko", "ri", "mel", "san", "to", "vi", "chu", "ler", "pa", "din", "os", "ga", "ne", "tru"]
+FOODS = ["bread", "milk", "cheese", "yogurt", "chicken", "beef", "rice", "pasta", "apple", "banana",
+         "juice", "soup", "salad", "cookies", "chocolate", "butter", "sausage", "pizza", "cereal", "tea"]
+KINDS = ["whole", "light", "organic", "smoked", "fresh", "frozen", "sweet", "spicy", "classic", "baked"]
+
+
+def make_names(size, seed=0):
+    rng = random.Random(seed)
+    brands = ["".join(rng.choice(SYLLABLES) for _ in range(4)).capitalize() for _ in range(size // 50 + 10)]
+    names = set()
+    while len(names) < size:
+        name = "%s %s %s %dg" % (rng.choice(brands), rng.choice(KINDS), rng.choice(FOODS), rng.randrange(50, 1000))
+        names.add(name)
+    return sorted(names)
+
+
+def make_typo(word, rng):
+    i = rng.randrange(1, len(word))
+    return word[:i] + word[i + 1:]
+
+
+def make_queries(names, seed=0):
+    """Typed beginnings of names, single short prefixes and queries with a typo"""
+
+    rng = random.Random(seed)
+    queries = {"prefix": [], "short": [], "typo": []}
+    for _ in range(QUERIES):
+        words = rng.choice(names).split()
+        queries["prefix"].append(words[0] + " " + words[2][:3])
+        queries["short"].append(words[2][:2])
+        queries["typo"].append(words[0] + " " + make_typo(words[2], rng))
+    return queries
+
+
+def time_queries(search, queries):
+    start = time.perf_counter()
+    for query in queries:
+        search.find(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def check_ranking():
+    """More names begin with "milk" than are ranked, and more contain it. The same name and
+    the shortest names beginning with the query must come first, whatever the order of the sets"""
+
+    names = (["Milk chocolate %d" % i for i in range(SCAN_LIMIT * 2)] + ["Milk"] +
+             ["Brand milk %d" % i for i in range(SCAN_LIMIT * 2)])
+    best = sorted(name for name in names if name.lower().startswith("milk"))
+    expected = sorted(best[:SCAN_LIMIT], key=lambda name: (len(name), name.lower()))[:5]
+    return ProductSearch(names).find("milk", 5) == expected and expected[0] == "Milk"
+
+
+def main():
+    if not check_ranking():
+        sys.exit("Search doesn't rank the same name and names beginning with the query first")
+
+    print("%10s %10s %16s %16s %16s" % ("products", "build, s", "prefix, us", "short, us", "typo, us"))
+    for size in SIZES:
+        names = make_names(size)
+        start = time.perf_counter()
+        search = ProductSearch(names)
+        build = time.perf_counter() - start
+
+        queries = make_queries(names)
+        print("%10d %10.2f %16.1f %16.1f %16.1f" % (
+            size, build, time_queries(search, queries["prefix"]),
+            time_queries(search, queries["short"]), time_queries(search, queries["typo"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Load test of server.py: starts a local instance on a copy of the data and reports
+p50/p99 latency and requests per second for every endpoint.
+First checks that infinite and too large menu volumes get 400.
+Run from the repository root: python benchmarks/bench_server.py [connections] [seconds]"""
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_storage import make_users
+
+USERS = 100000
+PORT = 8765
+
+
+class Client:
+    """Keep-alive HTTP connection"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.token = ""
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        return cls(reader, writer)
+
+    async def request(self, method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        head = "%s %s HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer %s\r\nContent-Length: %d\r\n\r\n" % (
+            method, path, self.token, len(body))
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        response = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(response.split(b" ", 2)[1])
+        length = 0
+        for line in response.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        return status, json.loads(await self.reader.readexactly(length))
+
+
+async def run_client(port, deadline, products, latencies):
+    client = await Client.connect(port)
+    user = "User" + str(random.randrange(USERS))
+    status, result = await client.request("POST", "/login", {"userName": user, "password": "password"})
+    client.token = result["token"]
+
+    requests = [
+        ("login", "POST", "/login", {"userName": user, "password": "password"}),
+        ("target", "GET", "/target", None),
+        ("parameters", "PUT", "/parameters", {"sex": 1, "age": 30, "w": 80, "h": 180, "activity": 1, "goal": 1}),
+        ("menu", "POST", "/menu", {"items": [[random.choice(products), 150] for _ in range(20)]})]
+
+    while time.perf_counter() < deadline:
+        name, method, path, data = random.choice(requests)
+        start = time.perf_counter()
+        status, result = await client.request(method, path, data)
+        latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if status != 200:
+            latencies.setdefault("errors", []).append(0)
+    client.writer.close()
+
+
+def percentile(values, part):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * part))] * 1000
+
+
+async def load_test(port, connections, seconds, products):
+    latencies = {}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[run_client(port, deadline, products, latencies) for _ in range(connections)])
+    return latencies
+
+
+async def check_bad_volumes(port, product):
+    """Returns statuses of menus with volumes which are not finite numbers"""
+
+    client = await Client.connect(port)
+    statuses = []
+    for volume in [float("inf"), float("nan"), 10 ** 400]:
+        status, result = await client.request("POST", "/menu", {"items": [[product, volume]]})
+        statuses.append(status)
+    client.writer.close()
+    return statuses
+
+
+def wait_for_port(port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        food = os.path.join(tmp, "Food.csv")
+        users = os.path.join(tmp, "users.csv")
+        shutil.copy(os.path.join(ROOT, "Food.csv"), food)
+        make_users(USERS).to_csv(users, index=False)
+        products = [line.split(",")[0] for line in open(food).read().splitlines()[1:]]
+
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(PORT),
+                                   "--food", food, "--users", users], cwd=ROOT)
+        try:
+            wait_for_port(PORT)
+            statuses = asyncio.run(check_bad_volumes(PORT, products[0]))
+            if statuses != [400] * len(statuses):
+                sys.exit("Menu volumes which are not finite numbers got %s instead of 400" % statuses)
+            latencies = asyncio.run(load_test(PORT, connections, seconds, products))
+        finally:
+            server.terminate()
+            server.wait()
+
+    errors = len(latencies.pop("errors", []))
+    total = sum(len(values) for values in latencies.values())
+    print("%d connections, %.0f s, %d errors" % (connections, seconds, errors))
+    print("%12s %10s %10s %10s %10s" % ("endpoint", "requests", "p50, ms", "p99, ms", "req/s"))
+    for name, values in sorted(latencies.items()):
+        print("%12s %10d %10.2f %10.2f %10.0f" % (name, len(values), percentile(values, 0.5),
+                                                 percentile(values, 0.99), len(values) / seconds))
+    everything = [value for values in latencies.values() for value in values]
+    print("%12s %10d %10.2f %10.2f %10.0f" % ("all", total, percentile(everything, 0.5),
+                                             percentile(everything, 0.99), total / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Serves users from 1 to 4 shards in worker processes and reports load time, memory of a worker,
+and logins and parameter updates per second from many threads, against one Users table in the process.
+Logins hash the password in the worker of the user's shard, so they scale with the CPU cores.
+Run from the repository root: python benchmarks/bench_shards.py"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_users
+from passwords import hash_password
+from shards import ShardedUsers, split_users
+from tables import Users
+
+USERS = 1000000
+WORKERS = [1, 2, 4]
+THREADS = 8
+COST = 10000  # hash iterations, lower than the default to make more logins in the time
+SECONDS = 3.0
+
+
+def rss_mb(pid):
+    """Resident memory of the process in MB from /proc, Linux only"""
+
+    with open("/proc/%d/statm" % pid) as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def login(users, lock, user_name):
+    with lock:
+        users.find(user_name, False)
+        stored = users.get_current_user_data()["password"]
+    return users.verify_user_password(user_name, stored, "password")
+
+
+def update(users, lock, user_name):
+    with lock:
+        users.find(user_name, False)
+        users.set_current_user_data("age", random.randrange(18, 80))
+
+
+def per_second(operation, users, get_lock):
+    """Runs the operation for random users from THREADS threads, returns operations per second"""
+
+    counts = [0] * THREADS
+    deadline = time.perf_counter() + SECONDS
+
+    def run(thread):
+        while time.perf_counter() < deadline:
+            user_name = "User" + str(random.randrange(USERS))
+            operation(users, get_lock(user_name), user_name)
+            counts[thread] += 1
+
+    threads = [threading.Thread(target=run, args=(thread,)) for thread in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    print("CPU cores: %d, %d users, %d threads" % (os.cpu_count(), USERS, THREADS))
+    print("%10s %10s %14s %12s %12s" % ("workers", "load, s", "worker, MB", "logins/s", "updates/s"))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "users.csv")
+        users = make_users(USERS)
+        users["password"] = hash_password("password", COST)
+        users.to_csv(filename, index=False)
+        del users
+
+        # One table in this process, every call holds one lock
+        start = time.perf_counter()
+        users = Users(filename, hash_iterations=COST)
+        load_seconds = time.perf_counter() - start
+        lock = threading.Lock()
+        print("%10s %10.1f %14s %12.0f %12.0f" % (
+            "none", load_seconds, "-", per_second(login, users, lambda user_name: lock),
+            per_second(update, users, lambda user_name: lock)))
+        del users
+
+        for workers in WORKERS:
+            split_users(filename, workers)
+            start = time.perf_counter()
+            users = ShardedUsers(filename, workers, hash_iterations=COST, processes=True)
+            load_seconds = time.perf_counter() - start
+            worker_mb = max(rss_mb(shard.process.pid) for shard in users.shards)
+            print("%10d %10.1f %14.0f %12.0f %12.0f" % (
+                workers, load_seconds, worker_mb, per_second(login, users, users.get_lock),
+                per_second(update, users, users.get_lock)))
+            users.close()
+
+
+if __name__ == "__main__":
+    main()
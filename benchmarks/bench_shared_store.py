@@ -0,0 +1,155 @@
+"""Stress test of several processes editing the same Food file.
+Every process adds, edits and deletes its own products and edits one product shared by all,
+saving often, with a short journal so compactions happen during the run.
+Processes also rename products which others edit or add under the new name at the same time.
+As in the window, a save writes in a background thread while the table is edited and synced.
+Checks that no edit of own products is lost and that every process ends with the same table as a fresh load.
+Throughput is edits and saves of all processes per second of the edit phase.
+Run from the repository root: python benchmarks/bench_shared_store.py"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food
+from schema import exact_float
+from tables import Food
+
+SIZE = 10000
+PROCESSES = [1, 2, 4, 8]
+EDITS = 300
+SAVE_EVERY = 10
+COMPACT_AFTER = 500
+SHARED_PRODUCT = "Product 0"
+CONFLICT_EVERY = 5  # every few edits a product is renamed while others edit it or add its new name
+CONFLICT_START = 5000
+
+
+def table_rows(food):
+    """Rows sorted by product, instances add products of others in another order"""
+
+    return sorted([product] + [exact_float(value) for value in nutrients] for product, *nutrients in food.df.values.tolist())
+
+
+def make_conflict(food, worker, edit):
+    """Renames a product in even processes, edits it or adds its new name in odd ones.
+    Which of them wins depends on the order of the journal, every instance must come to the same"""
+
+    conflict = edit // CONFLICT_EVERY
+    product = "Product %d" % (CONFLICT_START + conflict)
+    new_name = "Renamed %d" % conflict
+    if worker % 2 == 0:
+        food.update_key(product, new_name)
+    elif worker % 4 == 1:
+        if food.get_product(product) is not None:
+            food.update_current_product_data([worker, edit, 3, worker * 4 + edit * 9 + 12])
+    else:
+        food.add_new_to_object(new_name)
+
+
+def save_in_background(food, previous):
+    """Starts a save in a thread as the window does. Saves write one after another,
+    but the next one is prepared while the previous one may still be writing"""
+
+    save = food.prepare_save()
+    if previous is not None:
+        previous.join()
+    if save is None:
+        return None
+    thread = threading.Thread(target=save)
+    thread.start()
+    return thread
+
+
+def edit_food(filename, worker, barrier, results):
+    food = Food(filename)
+    food.journal.compactAfter = COMPACT_AFTER
+    expected = {}
+    saves = 0
+    saving = None
+
+    # Processes start together, so they edit the same conflicting products at about the same time
+    barrier.wait()
+    start = time.perf_counter()
+    for edit in range(EDITS):
+        if edit % 3 == 0:
+            product = "New %d-%d" % (worker, edit)
+            food.add_new_to_object(product)
+            food.update_current_product_data([worker, edit, 0, worker * 4 + edit * 9])
+        elif edit % 3 == 1:
+            product = "Product %d" % (1 + worker * 100 + edit % 100)
+            food.get_product(product)
+            food.update_current_product_data([edit, worker, 1, edit * 4 + worker * 9 + 4])
+        else:
+            product = "New %d-%d" % (worker, edit - 2)
+            food.delete_by_name(product)
+            food.get_product(SHARED_PRODUCT)
+            food.update_current_product_data([worker, edit, 2, worker * 4 + edit * 9 + 8])
+        expected[product] = food.get_row_data(food.productIndex[product]) if product in food.productIndex else None
+        if edit % CONFLICT_EVERY == 0:
+            make_conflict(food, worker, edit)
+
+        if edit % SAVE_EVERY == SAVE_EVERY - 1:
+            saving = save_in_background(food, saving)
+            saves += 1
+        else:
+            food.sync()  # the window syncs by a timer, also while a save is writing
+    if saving is not None:
+        saving.join()
+    food.save_to_csv()
+    seconds = time.perf_counter() - start
+
+    # Everybody has saved, every instance must see the same table
+    barrier.wait()
+    food.sync()
+    results.put((worker, expected, table_rows(food), seconds, saves + 1))
+
+
+def run(directory, processes):
+    filename = os.path.join(directory, "Food%d.csv" % processes)
+    make_food(SIZE).to_csv(filename, index=False)
+
+    barrier = multiprocessing.Barrier(processes)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=edit_food, args=(filename, worker, barrier, results))
+               for worker in range(processes)]
+    for process in workers:
+        process.start()
+    reports = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+
+    food = Food(filename)
+    rows = table_rows(food)
+    lost = 0
+    for worker, expected, worker_rows, worker_seconds, saves in reports:
+        for product, data in expected.items():
+            if product == SHARED_PRODUCT:
+                continue
+            row = food.productIndex.get(product)
+            lost += (food.get_row_data(row) if row is not None else None) != data
+    shared = food.get_product_nutrients(SHARED_PRODUCT)
+    shared_ok = shared is not None and shared[2] == 2
+    same = all(worker_rows == rows for worker, expected, worker_rows, worker_seconds, saves in reports)
+    seconds = max(report[3] for report in reports)
+    return processes * EDITS / seconds, sum(report[4] for report in reports) / seconds, lost, same and shared_ok
+
+
+def main():
+    print("%10s %10s %10s %12s %16s" % ("processes", "edits/s", "saves/s", "lost edits", "same everywhere"))
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for processes in PROCESSES:
+            edits, saves, lost, same = run(directory, processes)
+            failed |= bool(lost) or not same
+            print("%10d %10.0f %10.1f %12d %16s" % (processes, edits, saves, lost, "yes" if same else "NO"))
+    if failed:
+        sys.exit("Edits were lost or instances differ")
+
+
+if __name__ == "__main__":
+    main()
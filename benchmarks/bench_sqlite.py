@@ -0,0 +1,94 @@
+"""Compares DataFrame tables with SQLite tables: opening, lookups, edits with saving,
+adding many rows, and lookups from several threads through the connection pool.
+Run from the repository root: python benchmarks/bench_sqlite.py"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food, make_users
+from sqlite_tables import SqliteFood, SqliteUsers
+from storage import get_storage
+from tables import Food, Users
+
+SIZES = [100000, 1000000]
+LOOKUPS = 20000
+EDITS = 2000
+NEW_ROWS = 10000
+THREADS = 4
+
+
+def per_call(function, count):
+    """Microseconds per call"""
+
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def measure(food, users, size, open_seconds, rng):
+    products = ["Product %d" % i for i in rng.integers(0, size, LOOKUPS)]
+    user_names = ["User%d" % i for i in rng.integers(0, size, LOOKUPS)]
+
+    def edit_food():
+        for product in products[:EDITS]:
+            food.get_product(product)
+            food.update_current_product_data([1.5, 2.5, 3.5, 40.5])
+        food.save_to_csv()
+
+    def edit_users():
+        for user_name in user_names[:EDITS]:
+            users.find(user_name, False)
+            users.set_current_user_data("w", 70)
+        users.save_to_csv()
+
+    def threaded_lookups():
+        def lookups(part):
+            for product in part:
+                food.get_product_nutrients(product)
+        threads = [threading.Thread(target=lookups, args=(products[i::THREADS],)) for i in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return [
+        open_seconds,
+        per_call(lambda: [food.get_product_nutrients(product) for product in products], LOOKUPS),
+        per_call(lambda: [users.find(user_name, False) for user_name in user_names], LOOKUPS),
+        per_call(edit_food, EDITS),
+        per_call(edit_users, EDITS),
+        per_call(lambda: food.add_many_to_object([["New %d" % i, 1, 2, 3, 35] for i in range(NEW_ROWS)]), NEW_ROWS),
+        per_call(threaded_lookups, LOOKUPS)]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("%8s %10s %8s %12s %12s %12s %12s %12s %14s" % (
+        "rows", "tables", "open, s", "product, us", "user, us", "food edit,us", "user edit,us",
+        "add row, us", "%d threads, us" % THREADS))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            for kind in ["csv", "db"]:
+                food_file = os.path.join(directory, "Food%d.%s" % (size, kind))
+                users_file = os.path.join(directory, "users%d.%s" % (size, kind))
+                get_storage(food_file).save(make_food(size), food_file)
+                get_storage(users_file).save(make_users(size), users_file)
+
+                start = time.perf_counter()
+                if kind == "csv":
+                    food, users = Food(food_file), Users(users_file)
+                else:
+                    food, users = SqliteFood(food_file, THREADS), SqliteUsers(users_file, pool_size=THREADS)
+                results = measure(food, users, size, time.perf_counter() - start, rng)
+                print("%8d %10s %8.2f %12.1f %12.1f %12.1f %12.1f %12.1f %14.1f" % (
+                    size, "DataFrame" if kind == "csv" else "SQLite", *results))
+
+
+if __name__ == "__main__":
+    main()
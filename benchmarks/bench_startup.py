@@ -0,0 +1,48 @@
+"""Measures cold start of the application by stages: imports, window, data loading.
+Every run is a new process, with the repository data and with generated catalogues.
+Run from the repository root: python benchmarks/bench_startup.py"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food, make_users
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [None, 100000, 1000000]  # None is the data of the repository
+RUNS = 5
+STAGES = ["imports", "application", "window", "shown", "data", "total"]
+
+
+def start_once(directory):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--startup-report"],
+                            cwd=directory, env=env, capture_output=True, text=True, timeout=300)
+    report = re.search(r"^Startup: .*$", result.stdout, re.MULTILINE)
+    if report is None:
+        raise RuntimeError("No startup report:\n" + result.stdout + result.stderr)
+    return {stage: float(ms) for stage, ms in re.findall(r"(\w+) (\d+) ms", report.group(0))}
+
+
+def main():
+    print("%10s" % "products" + "".join("%16s" % (stage + ", ms") for stage in STAGES))
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            if size is None:
+                data_directory = ROOT
+            else:
+                data_directory = directory
+                make_food(size).to_csv(os.path.join(directory, "Food.csv"), index=False)
+                make_users(1000).to_csv(os.path.join(directory, "users.csv"), index=False)
+
+            runs = [start_once(data_directory) for _ in range(RUNS)]
+            print("%10s" % (size or "repo") + "".join(
+                "%16.0f" % statistics.median(run[stage] for run in runs) for stage in STAGES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compares load and save time of the storage formats with CSV.
+Tables are saved with the types of their schema, as the tables save them, and numeric columns
+of mmap must stay memory-mapped after loading.
+Run from the repository root: python benchmarks/bench_storage.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import FOOD_SCHEMA, USERS_SCHEMA, apply_schema
+from tables import Food, Users
+from storage import get_storage
+
+SIZE = 1000000
+FORMATS = ["csv", "parquet", "feather", "mmap"]
+
+
+def make_food(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "product": ["Product " + str(i) for i in range(size)],
+        "proteins": rng.uniform(0, 40, size).round(1),
+        "fats": rng.uniform(0, 40, size).round(1),
+        "carbohydrates": rng.uniform(0, 80, size).round(1),
+        "calories": rng.integers(0, 900, size)})
+
+
+def make_users(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "userName": ["User" + str(i) for i in range(size)],
+        "password": "password",
+        "sex": rng.integers(0, 2, size),
+        "age": rng.integers(7, 90, size),
+        "w": rng.integers(40, 160, size),
+        "h": rng.integers(140, 210, size),
+        "activity": rng.integers(0, 4, size),
+        "goal": rng.integers(0, 3, size)})
+
+
+def mapped_columns(df):
+    """Returns numbers of memory-mapped and of numeric columns"""
+
+    numeric = [column for column in df.columns if isinstance(df[column].dtype, np.dtype)
+               and np.issubdtype(df[column].dtype, np.number)]
+    return sum(isinstance(df[column].values, np.memmap) for column in numeric), len(numeric)
+
+
+def measure(table_class, df, filename):
+    get_storage(filename).save(df, filename)
+
+    start = time.perf_counter()
+    table = table_class(filename)
+    load = time.perf_counter() - start
+    mapped = mapped_columns(table.df)
+
+    table.hasChanges = True
+    start = time.perf_counter()
+    table.save_to_csv()
+    save = time.perf_counter() - start
+    return load, save, mapped
+
+
+def main():
+    try:
+        import pyarrow
+    except ImportError:
+        print("pyarrow is not installed, parquet and feather are skipped")
+        FORMATS.remove("parquet")
+        FORMATS.remove("feather")
+
+    print("%8s %8s %10s %10s %8s" % ("table", "format", "load, s", "save, s", "mapped"))
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, table_class, df in [("Food", Food, apply_schema(make_food(SIZE), FOOD_SCHEMA)),
+                                      ("users", Users, apply_schema(make_users(SIZE), USERS_SCHEMA))]:
+            for storage_format in FORMATS:
+                load, save, (mapped, numeric) = measure(table_class, df, os.path.join(tmp, name + "." + storage_format))
+                print("%8s %8s %10.3f %10.3f %8s" % (name, storage_format, load, save, "%d/%d" % (mapped, numeric)))
+                failed |= storage_format == "mmap" and mapped < numeric
+    if failed:
+        sys.exit("Numeric columns of mmap are not memory-mapped after loading")
+
+
+if __name__ == "__main__":
+    main()
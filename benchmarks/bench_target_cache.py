@@ -0,0 +1,66 @@
+"""Measures hit ratio and cost of TargetCache on a synthetic population.
+Every user asks for targets once, then logins repeat with a Zipf distribution over users.
+Run from the repository root: python benchmarks/bench_target_cache.py"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculator import TargetCache, calculate_target
+
+POPULATIONS = [10000, 100000]
+CACHE_SIZES = [1000, 10000, 100000]
+LOGINS = 200000
+UNCACHED_CALLS = 2000
+
+
+def make_population(size, seed=0):
+    """Parameters with realistic spread: most users are adults of usual height and weight"""
+
+    rng = np.random.default_rng(seed)
+    sex = rng.integers(0, 2, size)
+    age = np.clip(rng.normal(38, 14, size), 14, 90).astype(int)
+    height = np.clip(rng.normal(np.where(sex == 1, 177, 164), 7), 140, 210).astype(int)
+    bmi = np.clip(rng.normal(26, 4.5, size), 16, 50)
+    weight = (bmi * (height / 100) ** 2).astype(int)
+    activity = rng.choice(4, size, p=[0.4, 0.35, 0.2, 0.05])
+    goal = rng.choice(3, size, p=[0.5, 0.35, 0.15])
+    return list(zip(sex, age, weight, height, activity, goal))
+
+
+def make_logins(size, count, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.minimum(rng.zipf(1.2, count) - 1, size - 1)
+
+
+def main():
+    print("%10s %10s %10s %14s %14s" % ("users", "cache", "distinct", "first pass, %", "logins, %"))
+    for size in POPULATIONS:
+        population = make_population(size)
+        logins = make_logins(size, LOGINS)
+        for cache_size in CACHE_SIZES:
+            cache = TargetCache(cache_size)
+            for parameters in population:
+                cache.get(parameters)
+            first_pass = cache.hit_ratio()
+
+            cache.hits = cache.misses = 0
+            start = time.perf_counter()
+            for user in logins:
+                cache.get(population[user])
+            cached = (time.perf_counter() - start) / len(logins) * 1e6
+            print("%10d %10d %10d %14.1f %14.1f" % (
+                size, cache_size, len(set(population)), first_pass * 100, cache.hit_ratio() * 100))
+
+    start = time.perf_counter()
+    for parameters in population[:UNCACHED_CALLS]:
+        calculate_target(parameters)
+    uncached = (time.perf_counter() - start) / UNCACHED_CALLS * 1e6
+    print("\nus per request: %.1f from the cache (last row), %.1f calculated" % (cached, uncached))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compares calculate_targets with the old per-user calculation in a loop.
+Also checks that users without parameters get no BMI category.
+Run from the repository root: python benchmarks/bench_targets.py"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculator import NO_BMI_CATEGORY, calculate_targets
+
+SIZES = [1000, 10000, 100000, 1000000]
+LOOP_LIMIT = 100000
+
+
+def make_users(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "userName": ["User" + str(i) for i in range(size)],
+        "password": "password",
+        "sex": rng.integers(0, 2, size),
+        "age": rng.integers(7, 90, size),
+        "w": rng.integers(40, 160, size),
+        "h": rng.integers(140, 210, size),
+        "activity": rng.integers(0, 4, size),
+        "goal": rng.integers(0, 3, size)})
+
+
+def calculate_row(age, height, weight, male, activity, goal):
+    """The calculation from MainWindow.calculate_calories before it used calculate_targets"""
+
+    calories = float()
+    what_to_do_with_weight = float()
+    if goal == 0:
+        what_to_do_with_weight = 0.85
+    if goal == 1:
+        what_to_do_with_weight = 1
+    if goal == 2:
+        what_to_do_with_weight = 1.15
+
+    if male:
+        bmr = 88.362 + (13.397 * weight) + (4.799 * height) + (5.677 * age)
+    else:
+        bmr = 447.593 + (9.247 * weight) + (3.097 * height) + (4.33 * age)
+
+    if activity == 0:
+        calories = bmr * 1.375
+    elif activity == 1:
+        calories = bmr * 1.55
+    elif activity == 2:
+        calories = bmr * 1.725
+    elif activity == 3:
+        calories = bmr * 1.9
+
+    calories *= what_to_do_with_weight
+
+    if goal == 2:
+        return [int(calories * 0.15 / 4), int(calories * 0.20 / 9), int(calories * 0.65 / 4), int(calories)]
+    return [int(calories * 0.15 / 4), int(calories * 0.25 / 9), int(calories * 0.6 / 4), int(calories)]
+
+
+def calculate_loop(users):
+    return [calculate_row(row.age, row.h, row.w, row.sex, row.activity, row.goal)
+            for row in users.itertuples(index=False)]
+
+
+def check_unfilled():
+    """A new user has zero parameters, the BMI is not a number and must not give a category"""
+
+    users = make_users(3)
+    users.loc[0, ["age", "w", "h"]] = 0
+    users.loc[1, ["h"]] = 0
+    targets = calculate_targets(users)
+    expected = [NO_BMI_CATEGORY, NO_BMI_CATEGORY]
+    return targets["bmiCategory"].tolist()[:2] == expected and not targets["valid"].iloc[:2].any()
+
+
+def main():
+    if not check_unfilled():
+        print("Users without parameters get a BMI category")
+        return
+
+    print("%10s %14s %14s %10s" % ("users", "vectorized, s", "loop, s", "speedup"))
+    for size in SIZES:
+        users = make_users(size)
+
+        start = time.perf_counter()
+        targets = calculate_targets(users)
+        vectorized = time.perf_counter() - start
+
+        if size > LOOP_LIMIT:
+            print("%10d %14.4f %14s %10s" % (size, vectorized, "-", "-"))
+            continue
+
+        start = time.perf_counter()
+        expected = calculate_loop(users)
+        loop = time.perf_counter() - start
+
+        columns = ["proteins", "fats", "carbohydrates", "calories"]
+        if targets[columns].values.tolist() != expected:
+            print("Results differ from the loop for %d users" % size)
+            return
+
+        print("%10d %14.4f %14.4f %9.1fx" % (size, vectorized, loop, loop / vectorized))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Memory kept for undo over 10k edits of a 1M-row catalogue: the undo stack holds only
+the changes of every edit, against a copy of the table per edit. Also times undo and redo of all edits
+and checks that undoing them gives the catalogue back.
+Run from the repository root: python benchmarks/bench_undo.py"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_storage import make_food
+from tables import Food
+
+PRODUCTS = 1000000
+EDITS = 10000
+RENAMES = 80  # a rename and a delete renumber the 1M rows, they are much slower than a nutrients change
+DELETES = 20
+CHECKPOINTS = [1000, 2500, 5000, 10000]
+
+
+def deep_size(value):
+    """Bytes of the lists, strings and numbers of the undo stack"""
+
+    size = sys.getsizeof(value)
+    if isinstance(value, list):
+        size += sum(deep_size(item) for item in value)
+    return size
+
+
+def make_edits(rng):
+    kinds = np.array(["set"] * (EDITS - RENAMES - DELETES) + ["rename"] * RENAMES + ["delete"] * DELETES)
+    rng.shuffle(kinds)
+    rows = rng.choice(PRODUCTS, EDITS, replace=False)
+    return [(kind, "Product %d" % row) for kind, row in zip(kinds.tolist(), rows.tolist())]
+
+
+def edit(food, kind, product, rng):
+    if kind == "set":
+        food.get_product(product)
+        food.update_current_product_data(rng.uniform(0, 40, 4).round(1).tolist())
+    elif kind == "rename":
+        food.update_key(product, product + " renamed")
+    else:
+        food.delete_by_name(product)
+
+
+def sorted_table(food):
+    return food.df.sort_values("product").reset_index(drop=True)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "Food.csv")
+        make_food(PRODUCTS).to_csv(filename, index=False)
+        food = Food(filename)
+        before = sorted_table(food)
+        copy_mb = food.df.memory_usage(deep=True).sum() / 1024 / 1024
+
+        print("%8s %12s %14s %16s" % ("edits", "undo, MB", "bytes/edit", "copies, MB"))
+        start = time.perf_counter()
+        for count, (kind, product) in enumerate(make_edits(rng), 1):
+            edit(food, kind, product, rng)
+            if count in CHECKPOINTS:
+                stack_mb = deep_size(food.undoStack.undoItems) / 1024 / 1024
+                print("%8d %12.2f %14.0f %16.0f" % (
+                    count, stack_mb, stack_mb * 1024 * 1024 / count, copy_mb * count))
+        edit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        undone = 0
+        while food.undo():
+            undone += 1
+        undo_seconds = time.perf_counter() - start
+        same = sorted_table(food).equals(before)
+
+        start = time.perf_counter()
+        redone = 0
+        while food.redo():
+            redone += 1
+        redo_seconds = time.perf_counter() - start
+
+        print("Edits: %.1f s, undo of %d: %.1f s, redo of %d: %.1f s" % (
+            edit_seconds, undone, undo_seconds, redone, redo_seconds))
+        print("Catalogue after undo is the original:", same)
+
+
+if __name__ == "__main__":
+    main()
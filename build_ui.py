@@ -0,0 +1,70 @@
+"""Compiles .ui files of the application into Python modules, so startup doesn't parse XML.
+Run after changing a .ui file: python build_ui.py
+
+A compiled module keeps the hash of its .ui file. The application uses the .ui file
+itself when the hash differs, so a forgotten rebuild is slower but never wrong."""
+
+import hashlib
+import importlib
+import io
+import os
+import re
+
+UI_FILES = {
+    "MainWindow.ui": "ui_mainwindow",
+    "Login.ui": "ui_login",
+    "Parameters.ui": "ui_parameters"}
+UI_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def ui_hash(ui_path):
+    """Hash of the .ui file which doesn't depend on line endings of the checkout"""
+
+    with open(ui_path, "rb") as file:
+        return hashlib.sha1(file.read().replace(b"\r\n", b"\n")).hexdigest()
+
+
+def setup_ui(widget, ui_file):
+    """Builds widgets of the .ui file into the widget, children become its attributes.
+    Returns False if the .ui file was parsed because the compiled module is missing or out of date"""
+
+    ui_path = os.path.join(UI_DIRECTORY, ui_file)
+    try:
+        module = importlib.import_module(UI_FILES[ui_file])
+    except ImportError:
+        module = None
+
+    if module is None or (os.path.exists(ui_path) and module.UI_HASH != ui_hash(ui_path)):
+        from PyQt5 import uic  # only needed without compiled modules
+        uic.loadUi(ui_path, widget)
+        return False
+
+    form = module.UI_FORM()
+    form.setupUi(widget)
+    widget.__dict__.update(form.__dict__)
+    return True
+
+
+def build(ui_file, module_name):
+    from PyQt5 import uic
+
+    ui_path = os.path.join(UI_DIRECTORY, ui_file)
+    code = io.StringIO()
+    with open(ui_path, encoding="utf-8") as file:
+        uic.compileUi(file, code)
+    code = code.getvalue().replace(ui_path, ui_file)
+    form = re.search(r"^class (\w+)", code, re.MULTILINE).group(1)
+
+    with open(os.path.join(UI_DIRECTORY, module_name + ".py"), "w", encoding="utf-8", newline="\r\n") as file:
+        file.write(code)
+        file.write("\n\nUI_FORM = %s\nUI_HASH = %r\n" % (form, ui_hash(ui_path)))
+
+
+def main():
+    for ui_file, module_name in UI_FILES.items():
+        build(ui_file, module_name)
+        print("%s -> %s.py" % (ui_file, module_name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PARAMETERS = ["sex", "age", "w", "h", "activity", "goal"]
+TARGET_CACHE_SIZE = 10000
+
+ACTIVITY_COEFFICIENTS = [1.375, 1.55, 1.725, 1.9]
+GOAL_COEFFICIENTS = [0.85, 1, 1.15]
+BMI_BOUNDS = [18.5, 25, 30, 35, 40]
+NO_BMI_CATEGORY = -1  # users without real parameters, their BMI is NaN or inf
+BMI_ADVICE = [
+    "Your weight is small.\nYou should gain some weight",
+    "Your weight is normal.\nYou should maintain it",
+    "You have an excess weight.\nYou should lose some weight",
+    "You have a grade 1 obesity!\nYou need to lose weight!",
+    "You have a grade 2 obesity!\nYou need to lose weight!",
+    "You have a grade 3 obesity!\nYou need to lose weight!"]
+
+
+def real_parameters_mask(age, height, weight):
+    """Same check as Users.is_real_parameters for whole columns"""
+
+    return (6 < age) & (age < 120) & (60 < height) & (height < 250) & (20 < weight) & (weight < 600)
+
+
+def calculate_targets(users):
+    """Calculates calories and other parameters per day for every user in the table.
+    Returns DataFrame with proteins, fats, carbohydrates, calories, bmi and bmiCategory.
+    Users with unreal parameters get zero targets, bmiCategory NO_BMI_CATEGORY and "valid" False"""
+
+    return pd.DataFrame(calculate_target_arrays(
+        users["sex"].to_numpy(), users["age"].to_numpy(dtype=np.float64), users["w"].to_numpy(dtype=np.float64),
+        users["h"].to_numpy(dtype=np.float64), users["activity"].to_numpy(), users["goal"].to_numpy()),
+        index=users.index)
+
+
+def calculate_target_arrays(sex, age, weight, height, activity, goal):
+    """The calculate_targets math on numpy arrays, returns dictionary of arrays"""
+
+    male = sex != 0
+    valid = real_parameters_mask(age, height, weight)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = weight / ((height * 0.01) ** 2)
+
+    what_to_do_with_weight = np.select([goal == i for i in range(len(GOAL_COEFFICIENTS))], GOAL_COEFFICIENTS, 0.0)
+    activity_coefficient = np.select([activity == i for i in range(len(ACTIVITY_COEFFICIENTS))],
+                                     ACTIVITY_COEFFICIENTS, 0.0)
+
+    bmr = np.where(male,
+                   88.362 + (13.397 * weight) + (4.799 * height) + (5.677 * age),
+                   447.593 + (9.247 * weight) + (3.097 * height) + (4.33 * age))
+    calories = bmr * activity_coefficient
+    calories *= what_to_do_with_weight
+    calories = np.where(valid, calories, 0.0)
+
+    gain = goal == 2
+    proteins = calories * 0.15 / 4
+    fats = np.where(gain, calories * 0.20 / 9, calories * 0.25 / 9)
+    carbohydrates = np.where(gain, calories * 0.65 / 4, calories * 0.6 / 4)
+
+    return {
+        "proteins": proteins.astype(np.int64),
+        "fats": fats.astype(np.int64),
+        "carbohydrates": carbohydrates.astype(np.int64),
+        "calories": calories.astype(np.int64),
+        "bmi": bmi,
+        "bmiCategory": np.where(valid, np.digitize(bmi, BMI_BOUNDS), NO_BMI_CATEGORY),
+        "valid": valid}
+
+
+def calculate_target(parameters):
+    """Targets of one user as a dictionary. Parameters are (sex, age, w, h, activity, goal)"""
+
+    sex, age, weight, height, activity, goal = (np.array([value]) for value in parameters)
+    targets = calculate_target_arrays(sex, age.astype(np.float64), weight.astype(np.float64),
+                                      height.astype(np.float64), activity, goal)
+    return {name: values[0].item() for name, values in targets.items()}
+
+
+class TargetCache:
+    """Remembers targets of recently used parameters. Users with the same parameters
+    share one entry, the least recently used entry is dropped when the cache is full"""
+
+    def __init__(self, size=TARGET_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, parameters):
+        parameters = tuple(int(value) for value in parameters)
+        with self.lock:
+            targets = self.entries.get(parameters)
+            if targets is not None:
+                self.entries.move_to_end(parameters)
+                self.hits += 1
+                return dict(targets)
+            self.misses += 1
+
+        targets = calculate_target(parameters)
+        with self.lock:
+            self.entries[parameters] = targets
+            self.entries.move_to_end(parameters)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return dict(targets)
+
+    def hit_ratio(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,188 @@
+"""Nightly report of every user: daily targets, BMI category and totals of the menu of the day.
+Run: python export.py report.csv.gz --users users.csv --history history --day 2024-05-01
+
+Users are read by chunks and every chunk is written before the next one is read,
+so memory doesn't grow with the number of users. Only text files of Users are read by chunks.
+The report is CSV, or JSON Lines if the name ends with .jsonl, compressed if it ends with .gz, .bz2 or .xz"""
+
+import argparse
+import bz2
+import datetime
+import gzip
+import lzma
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculator import PARAMETERS, calculate_targets
+from history import MealHistory
+from importer import peak_memory
+from journal import Journal
+from schema import USERS_SCHEMA, apply_schema, text_dtypes
+from storage import CHUNK_ROWS, get_storage, replace_file
+
+# gzip.open compresses at level 9 by default, level 6 is twice as fast for a few percent of size
+COMPRESSORS = {".gz": (gzip.open, {"compresslevel": 6}), ".bz2": (bz2.open, {}), ".xz": (lzma.open, {})}
+JSON_ROWS = 10000  # to_json makes the text of all rows at once
+TARGET_COLUMNS = ["proteins", "fats", "carbohydrates", "calories", "bmi", "bmiCategory", "valid"]
+MENU_COLUMNS = ["menuProteins", "menuFats", "menuCarbohydrates", "menuCalories", "meals"]
+REPORT_COLUMNS = ["userName"] + PARAMETERS + TARGET_COLUMNS + MENU_COLUMNS
+BMI_DECIMALS = 2
+PARAMETERS_SCHEMA = {column: USERS_SCHEMA[column] for column in ["userName"] + PARAMETERS}
+
+
+def journal_changes(filename):
+    """Returns changes of the journal which are not in the file yet: user name -> changed parameters
+    and names of added users. The journal is compacted when it grows, so this is small whatever the user count"""
+
+    changes = {}
+    added = {}
+    for change in Journal(filename).read():
+        if change[0] == "add":
+            added[change[1]] = True
+        elif change[0] == "set" and change[2] in PARAMETERS:
+            changes.setdefault(change[1], {})[change[2]] = change[3]
+    return changes, list(added)
+
+
+def apply_changes(users, changes):
+    """Sets changed parameters in the chunk of the file"""
+
+    for row in np.flatnonzero(users["userName"].isin(list(changes)).to_numpy()):
+        for column, value in changes[users["userName"].iat[row]].items():
+            users.iat[row, users.columns.get_loc(column)] = value
+
+
+def read_users(filename, chunk_rows=CHUNK_ROWS):
+    """Yields tables of user names and parameters with the schema types, as Users would have them"""
+
+    storage = get_storage(filename)
+    dtypes = text_dtypes(PARAMETERS_SCHEMA)
+    changes, added = journal_changes(filename)
+    not_found = set(added)
+
+    def raw_chunks():
+        if hasattr(storage, "load_chunks"):
+            with storage.load_chunks(filename, dtypes, chunk_rows) as reader:
+                yield from reader
+        else:
+            users = storage.load(filename, dtypes)
+            for start in range(0, len(users), chunk_rows):
+                yield users.iloc[start:start + chunk_rows]
+
+    for users in raw_chunks():
+        users = users[["userName"] + PARAMETERS].reset_index(drop=True)
+        if changes:
+            apply_changes(users, changes)
+        if not_found:
+            not_found.difference_update(users["userName"].tolist())
+        yield apply_schema(users, PARAMETERS_SCHEMA)
+
+    # Users registered since the last compaction start with zero parameters
+    new_users = pd.DataFrame([[user_name] + [0] * len(PARAMETERS) for user_name in added if user_name in not_found],
+                             columns=["userName"] + PARAMETERS)
+    if not new_users.empty:
+        apply_changes(new_users, changes)
+        yield apply_schema(new_users, PARAMETERS_SCHEMA)
+
+
+def make_report(users, history, day):
+    """Returns report rows of the users: parameters, targets and totals of the day from the history"""
+
+    report = users[["userName"] + PARAMETERS].astype({column: np.int64 for column in PARAMETERS})
+    targets = calculate_targets(users)
+    for column in TARGET_COLUMNS:
+        report[column] = targets[column].to_numpy()
+    report["bmi"] = report["bmi"].replace([np.inf, -np.inf], np.nan).round(BMI_DECIMALS)
+
+    totals = np.zeros((len(users), len(MENU_COLUMNS)), dtype=np.int64)
+    if history is not None:
+        for row, user_name in enumerate(users["userName"].tolist()):
+            day_totals = history.read_day_totals(user_name, day)
+            if day_totals is not None:
+                totals[row] = day_totals
+    for i, column in enumerate(MENU_COLUMNS):
+        report[column] = totals[:, i]
+    return report
+
+
+def export_users(users_filename, history, day, chunk_rows=CHUNK_ROWS):
+    """Yields report chunks, a chunk of users is read only when the previous report chunk is taken"""
+
+    for users in read_users(users_filename, chunk_rows):
+        yield make_report(users, history, day)
+
+
+def split_extension(filename):
+    """Returns the report format and the compression extension of the file name"""
+
+    base, extension = os.path.splitext(filename.lower())
+    if extension not in COMPRESSORS:
+        base, extension = filename.lower(), None
+    return ("jsonl" if base.endswith((".jsonl", ".json")) else "csv"), extension
+
+
+def open_output(filename, compression):
+    if compression is None:
+        return open(filename, "w", newline="", encoding="utf-8")
+    open_compressed, options = COMPRESSORS[compression]
+    return open_compressed(filename, "wt", newline="", encoding="utf-8", **options)
+
+
+def write_report(chunks, filename):
+    """Writes chunks as they come into a temporary file, which replaces the report at the end.
+    Returns number of written rows"""
+
+    report_format, compression = split_extension(filename)
+    rows = 0
+
+    def write(path):
+        nonlocal rows
+        with open_output(path, compression) as file:
+            for chunk in chunks:
+                if report_format == "jsonl":
+                    for start in range(0, len(chunk), JSON_ROWS):
+                        file.write(chunk.iloc[start:start + JSON_ROWS].to_json(orient="records", lines=True))
+                else:
+                    chunk.to_csv(file, header=rows == 0, index=False)
+                rows += len(chunk)
+            if rows == 0 and report_format == "csv":
+                file.write(",".join(REPORT_COLUMNS) + "\n")
+
+    replace_file(write, filename)
+    return rows
+
+
+def main():
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    parser = argparse.ArgumentParser(description="Writes targets and menu totals of every user")
+    parser.add_argument("output", help="report file: .csv or .jsonl, may end with .gz, .bz2 or .xz")
+    parser.add_argument("--users", default="users.csv")
+    parser.add_argument("--history", default="history", help="directory of the meal history")
+    parser.add_argument("--day", default=yesterday, help="day of the menu totals, YYYY-MM-DD, yesterday by default")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS, help="users per chunk")
+    args = parser.parse_args()
+
+    try:
+        day = datetime.date.fromisoformat(args.day).isoformat()
+    except ValueError as error:
+        parser.error(str(error))
+    history = MealHistory(args.history) if os.path.isdir(args.history) else None
+
+    start = time.perf_counter()
+    try:
+        rows = write_report(export_users(args.users, history, day, args.chunk_size), args.output)
+    except ValueError as error:
+        parser.error(str(error))
+    seconds = time.perf_counter() - start
+    print("Exported %d users in %.1f s (%d users/s)" % (rows, seconds, rows / max(seconds, 1e-9)))
+
+    own, children = peak_memory()
+    if own is not None:
+        print("Peak memory: %.0f MB" % own)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import csv
+import os
+from urllib.parse import quote
+
+import pandas as pd
+
+from storage import replace_file
+
+MEAL_COLUMNS = ["day", "product", "volume", "proteins", "fats", "carbohydrates", "calories"]
+NUTRIENT_COLUMNS = ["proteins", "fats", "carbohydrates", "calories"]
+ROLLUP_FILE = "daily.csv"
+
+
+class MealHistory:
+    """Meals of users by days. Meals are kept in one file per user and month,
+    daily totals of the user in one more file, so range queries never read the meals"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.months = {}    # (user name, "YYYY-MM") -> meals of the month
+        self.rollups = {}   # user name -> daily totals indexed by day
+        self.changedMonths = set()
+        self.changedRollups = set()
+
+    def user_directory(self, user_name):
+        return os.path.join(self.directory, quote(str(user_name), safe=""))
+
+    def month_filename(self, user_name, month):
+        return os.path.join(self.user_directory(user_name), month + ".csv")
+
+    @staticmethod
+    def to_day(day):
+        return pd.Timestamp(day).normalize()
+
+    def get_month(self, user_name, month):
+        key = (user_name, month)
+        if key not in self.months:
+            filename = self.month_filename(user_name, month)
+            if os.path.exists(filename):
+                meals = pd.read_csv(filename, parse_dates=["day"])
+            else:
+                meals = pd.DataFrame(data=[], columns=MEAL_COLUMNS)
+            self.months[key] = meals
+        return self.months[key]
+
+    def get_rollup(self, user_name):
+        """Returns daily totals of the user: nutrients and number of meals per day"""
+
+        if user_name not in self.rollups:
+            filename = os.path.join(self.user_directory(user_name), ROLLUP_FILE)
+            if os.path.exists(filename):
+                rollup = pd.read_csv(filename, index_col="day", parse_dates=["day"])
+            else:
+                rollup = pd.DataFrame({column: pd.Series(dtype=float) for column in NUTRIENT_COLUMNS + ["meals"]},
+                                      index=pd.DatetimeIndex([], name="day"))
+            self.rollups[user_name] = rollup
+        return self.rollups[user_name]
+
+    def set_day(self, user_name, day, meals):
+        """Replaces meals of the day. Meal is [product, volume, proteins, fats, carbohydrates, calories]"""
+
+        day = self.to_day(day)
+        month = day.strftime("%Y-%m")
+        month_meals = self.get_month(user_name, month)
+        same_day = month_meals["day"] == day
+        if month_meals.loc[same_day, MEAL_COLUMNS[1:]].values.tolist() == [list(meal) for meal in meals]:
+            return True
+
+        month_meals = month_meals[~same_day].reset_index(drop=True)
+        day_meals = pd.DataFrame([[day, *meal] for meal in meals], columns=MEAL_COLUMNS)
+        if month_meals.empty:
+            month_meals = day_meals
+        elif not day_meals.empty:
+            month_meals = pd.concat([month_meals, day_meals], ignore_index=True)
+        self.months[(user_name, month)] = month_meals
+        self.changedMonths.add((user_name, month))
+
+        rollup = self.get_rollup(user_name)
+        if day_meals.empty:
+            rollup = rollup.drop(day, errors="ignore")
+        else:
+            totals = day_meals[NUTRIENT_COLUMNS].sum().tolist()
+            in_order = rollup.empty or day >= rollup.index[-1]
+            rollup.loc[day] = totals + [len(day_meals)]
+            if not in_order:
+                rollup = rollup.sort_index()
+        self.rollups[user_name] = rollup
+        self.changedRollups.add(user_name)
+        return True
+
+    def get_day(self, user_name, day):
+        """Returns [product, volume] rows of the day"""
+
+        day = self.to_day(day)
+        meals = self.get_month(user_name, day.strftime("%Y-%m"))
+        return meals.loc[meals["day"] == day, ["product", "volume"]].values.tolist()
+
+    def daily_totals(self, user_name, start, end):
+        """Returns totals of days from start to end inclusive, only days with meals"""
+
+        return self.get_rollup(user_name).loc[self.to_day(start):self.to_day(end)]
+
+    def average(self, user_name, start, end):
+        """Returns average nutrients per day with meals, None if there are no such days"""
+
+        totals = self.daily_totals(user_name, start, end)
+        if totals.empty:
+            return None
+        return totals[NUTRIENT_COLUMNS].mean()
+
+    def read_day_totals(self, user_name, day):
+        """Returns proteins, fats, carbohydrates, calories and number of meals of the day,
+        None if the user has no meals that day. Reads the file of daily totals without keeping it,
+        for passes over all users. The day is a YYYY-MM-DD string"""
+
+        if user_name in self.rollups:
+            rollup = self.rollups[user_name]
+            day = self.to_day(day)
+            return rollup.loc[day].tolist() if day in rollup.index else None
+
+        try:
+            with open(os.path.join(self.user_directory(user_name), ROLLUP_FILE), newline="") as file:
+                reader = csv.reader(file)
+                header = next(reader)
+                for row in reader:
+                    if row[0] == day:
+                        values = dict(zip(header, row))
+                        return [float(values[column]) for column in NUTRIENT_COLUMNS + ["meals"]]
+        except (OSError, StopIteration):
+            pass
+        return None
+
+    def period_totals(self, user_name, start, end, period="W"):
+        """Returns nutrients summed by weeks ("W") or months ("MS")"""
+
+        return self.daily_totals(user_name, start, end)[NUTRIENT_COLUMNS].resample(period).sum()
+
+    def save(self):
+        save = self.prepare_save()
+        if save is not None:
+            save()
+
+    def prepare_save(self):
+        """Takes snapshots of changed months and totals and returns function writing them"""
+
+        if not (self.changedMonths or self.changedRollups):
+            return None
+
+        months = {key: self.months[key].copy() for key in self.changedMonths}
+        rollups = {user_name: self.rollups[user_name].copy() for user_name in self.changedRollups}
+        self.changedMonths = set()
+        self.changedRollups = set()
+
+        def save():
+            try:
+                for (user_name, month), meals in months.items():
+                    os.makedirs(self.user_directory(user_name), exist_ok=True)
+                    replace_file(lambda filename: meals.to_csv(filename, index=False, date_format="%Y-%m-%d"),
+                                 self.month_filename(user_name, month))
+                for user_name, rollup in rollups.items():
+                    os.makedirs(self.user_directory(user_name), exist_ok=True)
+                    replace_file(lambda filename: rollup.to_csv(filename, date_format="%Y-%m-%d"),
+                                 os.path.join(self.user_directory(user_name), ROLLUP_FILE))
+            except Exception:
+                self.changedMonths.update(months)
+                self.changedRollups.update(rollups)
+                raise
+        return save
@@ -0,0 +1,173 @@
+"""Bulk import of nutrition databases into Food.
+Run: python importer.py dump.csv --food Food.csv --columns product=name,proteins=protein_g
+
+Reads CSV or JSON Lines in chunks of lines, which are parsed and checked in a process pool.
+A JSON file with one array is read at once. Rows must not have line breaks inside values."""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from sqlite_tables import SqliteFood, is_sqlite
+from tables import Food
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+FOOD_COLUMNS = ["product", "proteins", "fats", "carbohydrates"]
+CHUNK_SIZE = 100000
+
+
+def parse_columns(text):
+    """Parses "product=name,proteins=protein_g" into {"name": "product", "protein_g": "proteins"}"""
+
+    renames = {}
+    for pair in filter(None, text.split(",")):
+        column, source = pair.split("=", 1)
+        if column not in FOOD_COLUMNS:
+            raise ValueError("Unknown column: " + column)
+        renames[source] = column
+    return renames
+
+
+def read_chunks(filename, chunk_size):
+    """Yields (kind, header, lines) without parsing the lines"""
+
+    with open(filename, encoding="utf-8") as file:
+        first = file.read(1)
+        file.seek(0)
+        if first == "[":
+            records = json.load(file)
+            for i in range(0, len(records), chunk_size):
+                yield "records", None, records[i:i + chunk_size]
+            return
+
+        kind = "json" if filename.lower().endswith((".json", ".jsonl")) else "csv"
+        header = file.readline() if kind == "csv" else None
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+            if not lines:
+                break
+            yield kind, header, lines
+
+
+def parse_chunk(kind, header, lines, renames):
+    """Runs in a worker process. Returns valid rows with calories and counts of rejected rows"""
+
+    if kind == "csv":
+        df = pd.read_csv(io.StringIO(header + "".join(lines)), dtype=str, keep_default_na=False)
+    elif kind == "json":
+        df = pd.read_json(io.StringIO("".join(lines)), lines=True, dtype=False)
+    else:
+        df = pd.DataFrame.from_records(lines)
+
+    df = df.rename(columns=renames)
+    missing = [column for column in FOOD_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError("There are no columns: " + ", ".join(missing))
+
+    rejected = Counter()
+    df = df[FOOD_COLUMNS]
+    df["product"] = df["product"].astype(str).str.strip()
+    names = df["product"] != ""
+    rejected["Product has no name!"] += int((~names).sum())
+    df = df[names]
+
+    nutrients = df[FOOD_COLUMNS[1:]].apply(pd.to_numeric, errors="coerce")
+    numbers = nutrients.notna().all(axis=1)
+    rejected["The value must be number!"] += int((~numbers).sum())
+    df = pd.concat([df.loc[numbers, "product"], nutrients[numbers]], axis=1)
+
+    # Rows with negative values get the error text of editing of the food list
+    negative = (df[FOOD_COLUMNS[1:]] < 0).any(axis=1)
+    rejected.update(Food.check_nutrients(p, f, c) for p, f, c in df.loc[negative, FOOD_COLUMNS[1:]].values.tolist())
+    df = df[~negative]
+
+    duplicates = df["product"].duplicated()
+    rejected["Duplicate product"] += int(duplicates.sum())
+    df = df[~duplicates]
+
+    df["calories"] = df["proteins"] * 4 + df["carbohydrates"] * 4 + df["fats"] * 9
+    return df, rejected
+
+
+def parse_chunks(chunks, renames, workers):
+    """Parses chunks in a process pool in the file order. Only a few chunks are in flight,
+    so the whole file is never in memory"""
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        for kind, header, lines in chunks:
+            futures.append(executor.submit(parse_chunk, kind, header, lines, renames))
+            if len(futures) >= workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def import_food(food_table, filename, renames=None, chunk_size=CHUNK_SIZE, workers=None):
+    """Adds products from the file to the table and returns counts of read, added and rejected rows.
+    Products which are already in the table are skipped"""
+
+    workers = workers or os.cpu_count() or 1
+    report = {"read": 0, "added": 0, "rejected": Counter()}
+    for df, rejected in parse_chunks(read_chunks(filename, chunk_size), renames or {}, workers):
+        report["read"] += len(df) + sum(rejected.values())
+        report["rejected"].update(rejected)
+        added = food_table.merge_products(df)
+        report["rejected"]["Product is exist"] += len(df) - added
+        report["added"] += added
+    return report
+
+
+def peak_memory():
+    """Returns peak resident memory of this process and of finished workers in MB"""
+
+    if resource is None:
+        return None, None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Imports products from a CSV or JSON file into Food")
+    parser.add_argument("source")
+    parser.add_argument("--food", default="Food.csv")
+    parser.add_argument("--columns", default="", help="column names of the source, e.g. product=name,fats=fat_g")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="lines per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="parsing processes")
+    args = parser.parse_args()
+
+    food = SqliteFood(args.food) if is_sqlite(args.food) else Food(args.food)
+    start = time.perf_counter()
+    try:
+        report = import_food(food, args.source, parse_columns(args.columns), args.chunk_size, args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+    seconds = time.perf_counter() - start
+    food.compact()
+    save_seconds = time.perf_counter() - start - seconds
+
+    print("Read %d rows, added %d products in %.1f s (%d rows/s), saved in %.1f s" % (
+        report["read"], report["added"], seconds, report["read"] / max(seconds, 1e-9), save_seconds))
+    for reason, count in report["rejected"].most_common():
+        if count:
+            print("  skipped %d: %s" % (count, reason))
+
+    own, children = peak_memory()
+    if own is not None:
+        print("Peak memory: %.0f MB, workers %.0f MB" % (own, children))
+
+
+if __name__ == "__main__":
+    main()
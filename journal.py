@@ -0,0 +1,308 @@
+import json
+import os
+import threading
+
+from metrics import timed
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows
+    import msvcrt
+
+COMPACT_AFTER = 10000
+
+
+def to_json(value):
+    """Converts numpy numbers which json doesn't know"""
+
+    return value.item()
+
+
+def base_signature(filename):
+    """Changes every time the base file is replaced, so a journal left from before
+    the last compaction is not replayed twice"""
+
+    stat = os.stat(filename)
+    return [stat.st_ino, stat.st_mtime_ns]
+
+
+class FileLock:
+    """Exclusive lock shared by processes. Every use opens its own descriptor,
+    so threads of one process wait for each other too. Not reentrant"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.filename, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after 10 seconds
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class Journal:
+    """Append-only log of changes of a table file, shared by all instances using the file.
+    Saving writes only the changes, the base file is rewritten when the log grows.
+    Every instance remembers how much of the log its table has, so it reads only
+    changes appended by others since then. Writes hold a file lock.
+    A save may write in another thread while the table syncs, both hold stateLock
+    while they change the offset, the undo and the batches being written"""
+
+    def __init__(self, filename, compact_after=COMPACT_AFTER):
+        self.baseFilename = filename
+        self.filename = filename + ".journal"
+        self.lockFilename = filename + ".lock"
+        self.compactAfter = compact_after
+        self.pending = []
+        self.writing = []   # batches taken by saves and not written yet
+        self.savedCount = 0
+        self.replaying = False
+        self.undo = []          # for every change of this instance after the offset, the changes undoing it
+        self.collecting = None  # undo of the change being applied again, see replay_local
+        self.ownWritten = 0     # changes of this instance written after changes of others which are not read yet
+        self.base = None    # signature of the base file the table was loaded from
+        self.offset = 0     # bytes of the journal which are applied to the table
+        # Reentrant, as compact calls write and sync of a table may load it again
+        self.stateLock = threading.RLock()
+
+    def lock(self):
+        return FileLock(self.lockFilename)
+
+    def base_signature(self):
+        return base_signature(self.baseFilename)
+
+    def record(self, *change, undo=()):
+        """Remembers the change of the table and the changes undoing it, which roll it back
+        when changes of others have to be applied first"""
+
+        if not self.replaying:
+            self.pending.append(list(change))
+            self.undo.append([list(item) for item in undo])
+        elif self.collecting is not None:
+            self.collecting[:0] = [list(item) for item in undo]
+
+    def journal_size(self, base):
+        """Returns size of the journal of the base, None if there is no journal or it is left from another base"""
+
+        try:
+            with open(self.filename, "rb") as file:
+                header = json.loads(file.readline())
+                return os.fstat(file.fileno()).st_size if header.get("base") == base else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def read_from(self, offset, base):
+        """Returns complete changes after the offset and the offset after them.
+        None if the journal is shorter than the offset, i.e. it was replaced"""
+
+        size = self.journal_size(base)
+        if size is None:
+            return ([], 0) if offset == 0 else None
+        if size < offset:
+            return None
+
+        with open(self.filename, "rb") as file:
+            file.seek(offset)
+            data = file.read(size - offset)
+
+        changes = []
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # The last line is not written to the end
+            if offset > 0:  # the first line is the header
+                try:
+                    changes.append(json.loads(line))
+                except ValueError:
+                    break
+            offset += len(line)
+        return changes, offset
+
+    def read(self):
+        """Returns changes saved after the last compaction"""
+
+        if not os.path.exists(self.baseFilename):
+            return []
+        result = self.read_from(0, self.base_signature())
+        return result[0] if result is not None else []
+
+    def replay(self, apply_change, base):
+        """Applies saved changes to the table which has just been loaded from the base file with the signature.
+        Returns None if another instance replaced the base file meanwhile, so the table must be loaded again"""
+
+        with self.lock():
+            if self.base_signature() != base:
+                return None
+            changes, offset = self.read_from(0, base)
+
+        self.replay_changes(changes, apply_change)
+        self.base = base
+        self.offset = offset
+        self.savedCount = len(changes)
+        self.ownWritten = 0
+        return len(changes)
+
+    def replay_changes(self, changes, apply_change):
+        self.replaying = True
+        try:
+            for change in changes:
+                apply_change(change)
+        finally:
+            self.replaying = False
+
+    def read_new(self):
+        """Returns changes written since the last read, by other instances and the changes of this instance
+        written after them. None if the base file was replaced by another instance, so the table must be loaded again"""
+
+        # Most of the time nothing has changed, it is seen without the lock
+        if self.base_signature() == self.base:
+            try:
+                size = os.path.getsize(self.filename)
+            except OSError:
+                size = 0
+            if size == self.offset:
+                return []
+
+        with self.lock():
+            if self.base_signature() != self.base:
+                return None
+            result = self.read_from(self.offset, self.base)
+        if result is None:
+            return None
+
+        changes, self.offset = result
+        self.savedCount += len(changes)
+        self.ownWritten = 0
+        return changes
+
+    def rollback_changes(self):
+        """Changes undoing everything this instance did after the offset, the last change first"""
+
+        return [change for undo in reversed(self.undo) for change in undo]
+
+    def replay_local(self, apply_change):
+        """Applies changes of this instance which are not in the journal yet again,
+        after the table got changes of others, and remembers how to undo them in the new state"""
+
+        undo = []
+        self.replaying = True
+        try:
+            for change in self.local_changes():
+                self.collecting = []
+                apply_change(change)
+                undo.append(self.collecting)
+        finally:
+            self.replaying = False
+            self.collecting = None
+        self.undo = undo
+
+    def local_changes(self):
+        """Changes of this instance which are not in the journal yet"""
+
+        return [change for batch in self.writing for change in batch] + self.pending
+
+    def position(self):
+        """Base and offset of what the table has now, for a snapshot taken for compaction"""
+
+        return self.base, self.offset
+
+    def take_pending(self):
+        """Returns changes made since the last save. New changes are collected separately,
+        so the returned ones can be written in another thread"""
+
+        with self.stateLock:
+            changes = self.pending
+            self.pending = []
+            self.writing.append(changes)
+        return changes
+
+    def written(self, changes):
+        if any(batch is changes for batch in self.writing):
+            self.writing = [batch for batch in self.writing if batch is not changes]
+
+    def restore_pending(self, changes):
+        """Puts back changes which could not be written"""
+
+        with self.stateLock:
+            self.written(changes)
+            self.pending[:0] = changes
+
+    def needs_compaction(self, count):
+        return self.savedCount + count > self.compactAfter
+
+    @timed("Journal.write")
+    def write(self, changes):
+        """Appends changes to the journal"""
+
+        with self.stateLock:
+            if not changes:
+                self.written(changes)
+                return 0
+
+            lines = [json.dumps(change, default=to_json) for change in changes]
+            with self.lock():
+                base = self.base_signature()
+                size = self.journal_size(base)
+                if size is None:
+                    lines.insert(0, json.dumps({"base": base}))
+                with open(self.filename, "a" if size is not None else "w") as file:
+                    file.write("\n".join(lines) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+                    end = file.tell()
+
+                # If nobody wrote since the last read, the table has everything up to the end
+                if base == self.base and (size or 0) == self.offset:
+                    self.offset = end
+                    self.savedCount += len(changes)
+                    del self.undo[:len(changes)]
+                else:
+                    self.ownWritten += len(changes)
+            self.written(changes)
+            return len(changes)
+
+    @timed("Journal.compact")
+    def compact(self, write_base, changes, base, offset):
+        """Rewrites the base file by write_base, which writes a snapshot taken at the base and offset.
+        If another instance has written changes since the snapshot, they are not in it,
+        so the changes are appended to the journal instead. Returns True if the base was rewritten"""
+
+        with self.stateLock:
+            with self.lock():
+                current_base = self.base_signature()
+                if current_base == base and (self.journal_size(base) or 0) == offset:
+                    write_base()
+                    self.offset = 0
+                    self.base = self.base_signature()
+                    self.savedCount = 0
+                    del self.undo[:len(changes)]
+                    self.written(changes)
+                    return True
+
+            self.write(changes)
+            return False
+
+    def clear(self):
+        """Removes the journal after its changes are written into the base file"""
+
+        self.savedCount = 0
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
@@ -1,199 +1,249 @@
+import time
+STARTED = time.perf_counter()
+
 import sys
-import pandas as pd
-from PyQt5 import uic
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt
-from PyQt5.QtWidgets import *
+from datetime import date, timedelta
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt5.QtWidgets import QApplication, QDialog, QInputDialog, QLineEdit, QMainWindow, QMessageBox, QTableWidgetItem
 
+from build_ui import setup_ui
+import metrics
+from metrics import timed
+from workers import TaskQueue
 
-class Food:
+# Modules with pandas (tables, history, calculator, optimizer) are imported by the loading task,
+# after the window is shown. Methods import them when the tables are loaded already
 
-    def __init__(self, filename):
-        self.filename = filename
-        self.loaded = False
-        self.hasChanges = False
-        self.currentProductIndex = None
+FILTER_LIMIT = 100
+SYNC_INTERVAL = 2000  # ms between checks for changes saved by other instances
+HISTORY_PERIODS = [7, 30, 90]
 
-        self.df = pd.DataFrame(data=[], columns=["product", "proteins", "fats", "carbohydrates", "calories"])
-        self.load()
 
-    def load(self):
-        """Loads products from csv file in object"""
+def load_food(filename):
+    from tables import Food
+    return Food(filename)
 
-        self.df = pd.read_csv(self.filename, index_col=False)
-        self.loaded = True
-        self.hasChanges = False
 
-    def get_data_from_object(self):
-        return self.df
+def load_users(filename):
+    from tables import Users
+    return Users(filename)
 
-    def update_key(self, old_key_data, new_key_data):
-        """Updates key of the current selected product"""
 
-        new = self.get_product(new_key_data)
-        if new is not None:
-            return False
+class StartupTimes:
+    """Durations of startup stages, so a slower start is visible"""
 
-        old = self.get_product(old_key_data)
-        if old is None:
-            return False
+    def __init__(self):
+        self.stages = []
+        self.last = STARTED
 
-        self.df.iloc[self.currentProductIndex, 0] = new_key_data
-        self.hasChanges = True
-        return True
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
 
-    def save_to_csv(self):
-        if self.loaded and self.hasChanges:
-            self.df.to_csv(self.filename, index=False)
-            self.hasChanges = False
+    def total(self):
+        return self.last - STARTED
 
-    def get_product(self, product):
-        """Finds product and returns its index"""
+    def report(self):
+        return "Startup: " + ", ".join("%s %.0f ms" % (stage, seconds * 1000) for stage, seconds in self.stages) + \
+            ", total %.0f ms" % (self.total() * 1000)
 
-        find = self.df[self.df["product"] == product]
-        if find.empty:
-            return None
 
-        self.currentProductIndex = find.index
-        return self.currentProductIndex
+class FoodTableModel(QAbstractTableModel):
+    """Shows products straight from the Food table. The view asks only for visible cells"""
 
-    def __add__(self, product):
-        current_product = pd.Series(data={
-            "product": product,
-            "proteins": 0,
-            "fats": 0,
-            "carbohydrates": 0,
-            "calories": 0})
+    editRejected = pyqtSignal(str)
+    productChanged = pyqtSignal(str)
+    productRemoved = pyqtSignal(str)
+    productRenamed = pyqtSignal(str, str)
 
-        self.df = self.df.append(current_product, ignore_index=True)
-        self.hasChanges = True
-        return True
+    def __init__(self, food_table):
+        super().__init__()
+        self.foodTable = food_table
+        self.filterRows = None  # rows of Food shown while the list is filtered
 
-    def add_new_to_object(self, product_name):
-        """Adds new product with zero default parameters"""
+    def table_row(self, row):
+        """Returns row of Food shown in the row of the view"""
 
-        product = self.get_product(product_name)
-        if product is not None:
-            return False
+        if self.filterRows is None:
+            return row
+        return self.filterRows[row]
 
-        self.__add__(product_name)
-        self.currentProductIndex = self.df[self.df["product"] == product_name]
-        return True
+    def set_filter(self, rows):
+        """Shows only the given rows of Food, None shows all"""
 
-    def delete_by_name(self, product):
-        founded_products = self.df[self.df["product"] == product]
-        if founded_products is None:
-            return False
+        self.beginResetModel()
+        self.filterRows = rows
+        self.endResetModel()
 
-        self.df = self.df.drop(founded_products.index)
-        return True
+    def view_rows(self, products):
+        """Returns rows of the view showing the products, None for products which are not shown"""
 
-    def get_current_product_data(self):
-        if self.currentProductIndex is not None:
-            return self.df.iloc[self.currentProductIndex, :]
+        rows = [self.foodTable.productIndex.get(product) for product in products]
+        if self.filterRows is None:
+            return rows
+        positions = {row: position for position, row in enumerate(self.filterRows)}
+        return [positions.get(row) for row in rows]
 
-    def update_current_product_data(self, array_data):
-        self.df.loc[self.currentProductIndex, "proteins"] = array_data[0]
-        self.df.loc[self.currentProductIndex, "fats"] = array_data[1]
-        self.df.loc[self.currentProductIndex, "carbohydrates"] = array_data[2]
-        self.df.loc[self.currentProductIndex, "calories"] = array_data[3]
-        self.hasChanges = True
-        return True
+    def sync(self, find_rows):
+        """Applies changes saved by other instances. Changed rows are repainted; if rows were added or deleted,
+        the selection and open editors stay on their products. Only a full reload resets the view.
+        find_rows returns rows of Food shown by the filter. Returns True if Food has changed"""
+
+        persistent = self.persistentIndexList()
+        products = [self.product_name(index.row()) for index in persistent]
+        if not self.foodTable.sync():
+            return False
 
+        changes = self.foodTable.lastSync
+        if changes["reloaded"]:
+            self.set_filter(find_rows())
+            return True
 
-class Users:
+        if changes["rows"]:
+            self.layoutAboutToBeChanged.emit()
+            self.filterRows = find_rows()
+            new_indexes = [self.index(row, index.column()) if row is not None else QModelIndex()
+                           for row, index in zip(self.view_rows(products), persistent)]
+            self.changePersistentIndexList(persistent, new_indexes)
+            self.layoutChanged.emit()
+            return True
 
-    def __init__(self, filename):
-        self.filename = filename
-        self.loaded = False
-        self.hasChanges = False
-        self.currentUser = None
+        # A range of cells doesn't touch an open editor, unlike a change of the edited cell
+        changed = list(changes["products"]) + self.foodTable.recipes.dependents(changes["products"])
+        rows = [row for row in self.view_rows(changed) if row is not None]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), self.columnCount() - 1))
+        return True
 
-        self.df = pd.DataFrame(data=[], columns=["userName", "password", "sex", "age", "w", "h", "activity", "goal"])
-        self.load()
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.filterRows is not None:
+            return len(self.filterRows)
+        return len(self.foodTable.df)
 
-    def load(self):
-        """Loads users from csv file into virtual object"""
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.foodTable.df.columns)
 
-        self.df = pd.read_csv(self.filename, index_col=False)
-        self.loaded = True
-        self.hasChanges = False
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self.foodTable.df.columns[section])
+        return str(section + 1)
 
-    def save_to_csv(self):
-        if not self.hasChanges:
-            return True
-        self.df.to_csv(self.filename, index=False)
-        self.hasChanges = False
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
 
-    def find(self, user_name, add_user):
-        """Finds the user in object"""
+        value = self.foodTable.df.iat[self.table_row(index.row()), index.column()]
+        if index.column() == 4:
+            return str(int(value))
+        return str(value)
 
-        self.currentUser = self.df[self.df["userName"] == user_name]
-        if self.currentUser.empty:
-            if not add_user:
-                return None
+    def flags(self, index):
+        if index.column() == 0 or index.column() == 4 or self.foodTable.is_recipe(self.product_name(index.row())):
+            return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
 
-        return self.currentUser
+    def setData(self, index, value, role=Qt.EditRole):
+        """Checks if parameters have been changed correctly and writes them into Food"""
 
-    def add_new_to_object(self, user_name, password):
-        """Adds new user with zero parameters"""
+        if role != Qt.EditRole or not index.isValid():
+            return False
 
-        self.currentUser = self.df[self.df["userName"] == user_name]
-        if self.currentUser.empty:
-            self.__add__(user_name, password)
+        n_row = index.row()
+        n_col = index.column()
+        if n_col == 0 or n_col == 4:
+            return False
 
-        self.currentUser = self.df[self.df["userName"] == user_name]
-        return self.currentUser
+        product_data = self.foodTable.get_row_data(self.table_row(n_row))
+        try:
+            product_data[n_col] = float(value)
+        except ValueError:
+            self.editRejected.emit("The value must be number!")
+            return False
 
-    def __add__(self, user_name, password):
-        self.currentUser = pd.Series(data={
-            "userName": user_name,
-            "password": password,
-            "sex": 0,
-            "age": 0,
-            "w": 0, "h": 0,
-            "activity": 0, "goal": 0})
+        p, f, c = product_data[1:4]
+        error = self.foodTable.check_nutrients(p, f, c)
+        if error is not None:
+            self.editRejected.emit(error)
+            return False
 
-        self.df = self.df.append(self.currentUser, ignore_index=True)
-        self.hasChanges = True
+        self.foodTable.get_product(product_data[0])
+        self.foodTable.update_current_product_data([p, f, c, p * 4 + c * 4 + f * 9])
+        self.dataChanged.emit(self.index(n_row, 1), self.index(n_row, 4))
+        self.products_changed([product_data[0]])
         return True
 
-    def get_current_user(self):
-        if self.currentUser is None:
-            return None
-        if self.currentUser.empty:
-            return None
-        return self.currentUser
+    def products_changed(self, products):
+        """Tells about changed products and dishes which were recalculated with them"""
 
-    def get_current_user_data(self):
-        if self.currentUser.empty:
-            return None
-        return self.currentUser.iloc[0]
+        recipes = self.foodTable.recipes.dependents(products)
+        if recipes:
+            self.dataChanged.emit(self.index(0, 1), self.index(self.rowCount() - 1, 4))
+        for product in list(products) + recipes:
+            self.productChanged.emit(product)
 
-    def set_current_user_data(self, col_index, int_value):
-        index = self.currentUser.index
-        self.df.loc[index, col_index] = int_value
-        self.currentUser[col_index] = int_value
-        self.hasChanges = True
+    def product_name(self, row):
+        return self.foodTable.df.iat[self.table_row(row), 0]
 
-    def is_unfilled_parameters(self):
-        if self.currentUser.empty:
+    def add_product(self, product_name):
+        if self.foodTable.get_product(product_name) is not None:
             return False
-        if self.currentUser.iloc[0]["age"] == 0:
-            return True
 
-        return False
+        # The new product is added to the end of the whole list
+        self.set_filter(None)
 
-    def is_real_parameters(self):
-        if self.currentUser.empty:
-            return False
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.foodTable.add_new_to_object(product_name)
+        self.endInsertRows()
+        return True
+
+    def remove_product(self, row):
+        table_row = self.table_row(row)
+        product = self.product_name(row)
+        recipes = self.foodTable.recipes.dependents([product])
+        self.beginRemoveRows(QModelIndex(), row, row)
+        removed = self.foodTable.delete_by_name(product)
+        if self.filterRows is not None:
+            # Rows after the deleted one move up
+            self.filterRows = [r - (r > table_row) for r in self.filterRows if r != table_row]
+        self.endRemoveRows()
+        if removed:
+            # Dishes with the product are recalculated without it
+            self.productRemoved.emit(product)
+            for recipe in recipes:
+                self.productChanged.emit(recipe)
+        return removed
+
+    def save_recipe(self, recipe, ingredients):
+        """Makes the product a dish of the ingredients, a new product is added to the end of the list"""
+
+        if self.foodTable.get_product(recipe) is not None:
+            if not self.foodTable.set_recipe(recipe, ingredients):
+                return False
+            self.products_changed([recipe])
+            return True
 
-        age = self.currentUser.iloc[0]["age"]
-        height = self.currentUser.iloc[0]["h"]
-        weight = self.currentUser.iloc[0]["w"]
+        self.set_filter(None)
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        saved = self.foodTable.set_recipe(recipe, ingredients)
+        self.endInsertRows()
+        return saved
 
-        if not (6 < age < 120 and 60 < height < 250 and 20 < weight < 600):
+    def rename_product(self, row, new_product_name):
+        product = self.product_name(row)
+        if not self.foodTable.update_key(product, new_product_name):
             return False
 
+        self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+        self.productRenamed.emit(product, new_product_name)
         return True
 
 
@@ -201,12 +251,22 @@ class MainWindow(QMainWindow):
 
     actionUser_is_Enable_signal = pyqtSignal(str, str)
 
-    def __init__(self):
+    def __init__(self, startup_times=None, startup_report=False):
         super().__init__()
-        uic.loadUi('MainWindow.ui', self)
-
-        self.FoodsTable = Food("Food.csv")
-        self.UsersTable = Users("users.csv")
+        self.startupTimes = startup_times or StartupTimes()
+        self.startupReport = startup_report
+        setup_ui(self, "MainWindow.ui")
+
+        self.FoodsTable = None
+        self.UsersTable = None
+        self.userMenu = None
+        self.foodsModel = None
+        self.history = None
+        self.dialogLogin = None
+        self.dialogParameters = None
+        self.taskQueue = TaskQueue()
+        self.syncTimer = QTimer(self)
+        self.syncTimer.timeout.connect(self.poll_changes)
         self.user_max_calories = [0, 0, 0, 0]
         self.Username_Button.setText("None")
         self.menuUser.setEnabled(False)
@@ -223,9 +283,15 @@ class MainWindow(QMainWindow):
         self.actionExit.triggered.connect(self.exit)
 
         self.actionChangeUserParametersMenu.triggered.connect(self.change_user_parameters)
+        self.actionSaveUserMenu.triggered.connect(self.user_menu_save_day)
+        self.actionHistory.triggered.connect(self.user_history)
+        self.actionGenerateMenu.triggered.connect(self.user_menu_generate)
         self.UserChangeParameters_Button.clicked.connect(self.change_user_parameters)
 
         self.actionChangeFoodName.triggered.connect(self.food_list_change_food_name)
+        self.actionSaveRecipe.triggered.connect(self.food_list_save_recipe)
+        self.actionUndo.triggered.connect(self.food_list_undo)
+        self.actionRedo.triggered.connect(self.food_list_redo)
         self.actionUser_is_Enable_signal.connect(self.user_is_enable)
 
         self.AddFoodToUserMenu_Button.clicked.connect(self.user_menu_add_food_from_food_list)
@@ -235,17 +301,109 @@ class MainWindow(QMainWindow):
         self.actionAddFood.triggered.connect(self.food_list_add_food)
         self.RemoveFoodButton.clicked.connect(self.food_list_remove_food)
         self.actionRemoveFood.triggered.connect(self.food_list_remove_food)
+        self.FoodFilterLine.textChanged.connect(self.food_list_filter)
+
+        self.startupTimes.mark("window")
 
-        self.dialogLogin = Login(self)
-        self.dialogParameters = ChangeParameters(self)
+        # Runs when the event loop starts, so the window is shown before loading
+        QTimer.singleShot(0, self.load_all)
+
+    def set_data_enabled(self, enabled):
+        """Disables everything what needs tables while they are loading"""
+
+        self.centralwidget.setEnabled(enabled)
+        self.menuFood.setEnabled(enabled)
+        self.actionLogin.setEnabled(enabled)
+        self.actionSave_all.setEnabled(enabled)
+
+    def load_all(self):
+        """Loads tables in background thread"""
+
+        self.startupTimes.mark("shown")
+        self.set_data_enabled(False)
+        self.taskQueue.start([("Food.csv", lambda: load_food("Food.csv")),
+                              ("users.csv", lambda: load_users("users.csv"))],
+                             self.data_loaded, self.load_failed, self.task_progress)
+
+    def data_loaded(self, tables):
+        from history import MealHistory
+        from tables import Menu
+
+        self.FoodsTable, self.UsersTable = tables
+        self.userMenu = Menu(self.FoodsTable)
+        self.foodsModel = FoodTableModel(self.FoodsTable)
+        self.history = MealHistory("history")
+        self.food_list_load_all()
+
+        self.set_data_enabled(True)
+        self.syncTimer.start(SYNC_INTERVAL)
+        self.startupTimes.mark("data")
+        self.statusbar.showMessage("Loaded in %.1f s" % self.startupTimes.total(), 3000)
+        if self.startupReport:
+            print(self.startupTimes.report())
+            QApplication.quit()
+
+    def load_failed(self, error):
+        self.statusbar.clearMessage()
+        QMessageBox.information(self, "Error", "Cannot load data!\n" + error)
+
+    def task_progress(self, done, count, title):
+        if done < count:
+            self.statusbar.showMessage("%s (%d/%d)..." % (title, done + 1, count))
 
     def login(self):
+        if self.dialogLogin is None:
+            self.dialogLogin = Login(self)
         self.dialogLogin.init_parameters()
         self.dialogLogin.show()
 
+    def poll_changes(self):
+        """Syncs by the timer. Skipped while a save is writing, sync would wait for it,
+        the next tick brings the changes"""
+
+        if self.taskQueue.is_busy():
+            return False
+        return self.sync_tables()
+
+    def sync_tables(self):
+        """Shows changes of food and users saved by other instances of the application"""
+
+        if self.FoodsTable is None:
+            return False
+
+        food_changed = self.foodsModel.sync(lambda: self.food_list_filter_rows(self.FoodFilterLine.text()))
+        users_changed = self.UsersTable.sync()
+        if food_changed:
+            self.user_menu_refresh_all()
+        if food_changed or users_changed:
+            self.statusbar.showMessage("Changes of other users are loaded", 3000)
+        return food_changed or users_changed
+
     def save_all(self):
-        self.UsersTable.save_to_csv()
-        self.FoodsTable.save_to_csv()
+        """Saves snapshots of tables in background thread, tables can be edited meanwhile"""
+
+        self.sync_tables()
+        self.user_menu_save_day()
+        steps = []
+        for title, table in ((self.UsersTable.filename, self.UsersTable),
+                             (self.FoodsTable.filename, self.FoodsTable),
+                             ("meal history", self.history)):
+            save = table.prepare_save()
+            if save is not None:
+                steps.append(("Saving " + title, save))
+
+        if not steps:
+            return False
+
+        self.taskQueue.start(steps, self.save_finished, self.save_failed, self.task_progress)
+        return True
+
+    def save_finished(self, results):
+        self.statusbar.showMessage("Saved", 3000)
+
+    def save_failed(self, error):
+        self.statusbar.clearMessage()
+        QMessageBox.information(self, "Error", "Cannot save data!\n" + error)
 
     def change_user_parameters(self):
         user = self.UsersTable.get_current_user()
@@ -253,14 +411,19 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Error", "There is no user loaded!")
             return False
 
+        if self.dialogParameters is None:
+            self.dialogParameters = ChangeParameters(self)
         if self.dialogParameters.load_user_parameters():
             self.dialogParameters.show()
 
+    @timed("MainWindow.calculate_calories")
     def calculate_calories(self):
         """Saves parameters and writes it into main window.
         Calculates calories and other parameters per day.
         Writes it into labels. Gives suggestions about healthy weight"""
 
+        from calculator import BMI_ADVICE
+
         user = self.UsersTable.get_current_user()
         if user is None:
             return False
@@ -271,67 +434,16 @@ class MainWindow(QMainWindow):
         if not self.UsersTable.is_real_parameters():
             return False
 
-        calories = float()
-        what_to_do_with_weight = float()
-        age = user.iloc[0]['age']
+        targets = self.UsersTable.get_current_user_targets()
         height = user.iloc[0]['h']
         weight = user.iloc[0]['w']
-        male = user.iloc[0]['sex']
-        activity = user.iloc[0]['activity']
-        goal = user.iloc[0]['goal']
-
-        imt = weight / ((height * 0.01) ** 2)
-        if imt < 18.5:
-            QMessageBox.information(self, "Advice", "Your weight is small.\n"
-                                                    "You should gain some weight")
-        elif 18.5 <= imt < 25:
-            QMessageBox.information(self, "Advice", "Your weight is normal.\n"
-                                                    "You should maintain it")
-        elif 25 <= imt < 30:
-            QMessageBox.information(self, "Advice", "You have an excess weight.\n"
-                                                    "You should lose some weight")
-        elif 30 <= imt < 35:
-            QMessageBox.information(self, "Advice", "You have a grade 1 obesity!\n"
-                                                    "You need to lose weight!")
-        elif 35 <= imt < 40:
-            QMessageBox.information(self, "Advice", "You have a grade 2 obesity!\n"
-                                                    "You need to lose weight!")
-        elif imt >= 40:
-            QMessageBox.information(self, "Advice", "You have a grade 3 obesity!\n"
-                                                    "You need to lose weight!")
-
-        if goal == 0:
-            what_to_do_with_weight = 0.85
-        if goal == 1:
-            what_to_do_with_weight = 1
-        if goal == 2:
-            what_to_do_with_weight = 1.15
-
-        if male:
-            bmr = 88.362 + (13.397 * weight) + (4.799 * height) + (5.677 * age)
-        else:
-            bmr = 447.593 + (9.247 * weight) + (3.097 * height) + (4.33 * age)
-
-        if activity == 0:
-            calories = bmr * 1.375
-        elif activity == 1:
-            calories = bmr * 1.55
-        elif activity == 2:
-            calories = bmr * 1.725
-        elif activity == 3:
-            calories = bmr * 1.9
-
-        calories *= what_to_do_with_weight
-
-        if goal == 2:
-            proteins = int(calories * 0.15 / 4)
-            fats = int(calories * 0.20 / 9)
-            carbohydrates = int(calories * 0.65 / 4)
-        else:
-            proteins = int(calories * 0.15 / 4)
-            fats = int(calories * 0.25 / 9)
-            carbohydrates = int(calories * 0.6 / 4)
-        calories = int(calories)
+
+        QMessageBox.information(self, "Advice", BMI_ADVICE[targets["bmiCategory"]])
+
+        proteins = targets["proteins"]
+        fats = targets["fats"]
+        carbohydrates = targets["carbohydrates"]
+        calories = targets["calories"]
 
         self.user_max_calories = [proteins, fats, carbohydrates, calories]
         self.MaxProteinValue.setText(str(proteins))
@@ -376,6 +488,7 @@ class MainWindow(QMainWindow):
 
         self.user_menu_init()
         self.calculate_calories()
+        self.user_menu_load_day()
         self.user_menu_calculate()
 
         self.Username_Button.setText(login)
@@ -385,123 +498,125 @@ class MainWindow(QMainWindow):
 
         action = QMessageBox.question(self, "Question", "Do you want to save all before exit?",
                                       QMessageBox.Yes | QMessageBox.No)
-        if action == QMessageBox.Yes:
-            self.UsersTable.save_to_csv()
-            self.FoodsTable.save_to_csv()
-            sys.exit()
+        if action == QMessageBox.Yes and self.FoodsTable is not None:
+            self.save_all()
 
+        self.taskQueue.wait()
         sys.exit()
 
+    @timed("MainWindow.food_list_load_all")
     def food_list_load_all(self):
-        df = self.FoodsTable.get_data_from_object()
-        headers = df.columns.values.tolist()
-
-        self.tableFoods.setColumnCount(len(headers))
+        self.tableFoods.setModel(self.foodsModel)
         self.tableFoods.setColumnWidth(0, 85)
         self.tableFoods.setColumnWidth(1, 20)
         self.tableFoods.setColumnWidth(2, 20)
         self.tableFoods.setColumnWidth(3, 20)
         self.tableFoods.setColumnWidth(4, 20)
-        self.tableFoods.setHorizontalHeaderLabels(headers)
 
-        for i, row in df.iterrows():
-            self.tableFoods.setRowCount(self.tableFoods.rowCount() + 1)
+        self.foodsModel.editRejected.connect(self.food_list_edit_rejected)
+        self.foodsModel.productChanged.connect(self.user_menu_refresh_product)
+        self.foodsModel.productRemoved.connect(self.user_menu_remove_product)
+        self.foodsModel.productRenamed.connect(self.user_menu_rename_product)
+        for signal in [self.foodsModel.dataChanged, self.foodsModel.rowsInserted,
+                       self.foodsModel.rowsRemoved, self.foodsModel.modelReset]:
+            signal.connect(self.food_list_update_undo)
+        self.food_list_update_undo()
 
-            for j in range(self.tableFoods.columnCount()):
-                self.tableFoods.setItem(i, j, QTableWidgetItem(str(row[j])))
-                if j == 0 or j == 4:
-                    self.tableFoods.item(i, j).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+    def food_list_refresh(self):
+        """Shows the food list and the menu again after changes anywhere in Food"""
 
-        self.tableFoods.cellChanged.connect(self.food_list_change_nutrients)
+        self.food_list_filter(self.FoodFilterLine.text())
+        self.user_menu_refresh_all()
 
-    def food_list_add_food(self):
-        new_row = self.tableFoods.rowCount() + 1
-        product = self.FoodsTable.add_new_to_object("New Product " + str(new_row))
-        if product is None:
-            QMessageBox.information(self, "Error", "Product is exist")
+    def food_list_update_undo(self):
+        self.actionUndo.setEnabled(self.FoodsTable.undoStack.can_undo())
+        self.actionRedo.setEnabled(self.FoodsTable.undoStack.can_redo())
+
+    def food_list_undo(self):
+        """Undoes the last change of the food list"""
+
+        if not self.FoodsTable.undo():
+            return False
+        self.food_list_refresh()
+        self.food_list_update_undo()
+        return True
+
+    def food_list_redo(self):
+        if not self.FoodsTable.redo():
             return False
+        self.food_list_refresh()
+        self.food_list_update_undo()
+        return True
+
+    def food_list_filter(self, text):
+        """Shows only products found by the search line"""
+
+        self.foodsModel.set_filter(self.food_list_filter_rows(text))
 
-        self.tableFoods.cellChanged.disconnect(self.food_list_change_nutrients)
+    def food_list_filter_rows(self, text):
+        """Returns rows of Food found by the search line, None for an empty line"""
 
-        self.tableFoods.setRowCount(new_row)
-        self.tableFoods.setItem(new_row - 1, 0, QTableWidgetItem("New Product " + str(new_row)))
-        self.tableFoods.item(new_row - 1, 0).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        if text.strip() == "":
+            return None
 
-        self.tableFoods.setItem(new_row - 1, 1, QTableWidgetItem("0.0"))
-        self.tableFoods.setItem(new_row - 1, 2, QTableWidgetItem("0.0"))
-        self.tableFoods.setItem(new_row - 1, 3, QTableWidgetItem("0.0"))
-        self.tableFoods.setItem(new_row - 1, 4, QTableWidgetItem("0.0"))
+        products = self.FoodsTable.find_products(text, FILTER_LIMIT)
+        return [self.FoodsTable.productIndex[product] for product in products]
 
-        self.tableFoods.cellChanged.connect(self.food_list_change_nutrients)
+    def food_list_add_food(self):
+        self.FoodFilterLine.clear()
+        new_row = self.foodsModel.rowCount() + 1
+        if not self.foodsModel.add_product("New Product " + str(new_row)):
+            QMessageBox.information(self, "Error", "Product is exist")
+            return False
 
     def food_list_remove_food(self):
-        selected_row = self.tableFoods.currentRow()
+        selected_row = self.tableFoods.currentIndex().row()
         if selected_row < 0:
             return False
 
-        product_name = self.tableFoods.item(selected_row, 0).text()
-        if self.FoodsTable.delete_by_name(product_name):
-            self.tableFoods.removeRow(selected_row)
+        self.foodsModel.remove_product(selected_row)
 
     def food_list_change_food_name(self):
-        selected_row = self.tableFoods.currentRow()
+        selected_row = self.tableFoods.currentIndex().row()
         if selected_row < 0:
             QMessageBox.information(self, "Error", "You haven't selected any food!")
             return False
 
-        product_name = self.tableFoods.item(selected_row, 0).text()
+        product_name = self.foodsModel.product_name(selected_row)
         new_product, ok_is_pressed = QInputDialog.getText(self, "Input new product name",
                                                           "Product name:", QLineEdit.Normal, product_name)
         if ok_is_pressed and new_product != '':
-            if not self.FoodsTable.update_key(product_name, str(new_product)):
+            if not self.foodsModel.rename_product(selected_row, str(new_product)):
                 QMessageBox.information(self, "Error", "Product is not changed", QMessageBox.Ok)
                 return False
 
-            self.tableFoods.setItem(selected_row, 0, QTableWidgetItem(new_product))
-
-    def food_list_change_nutrients(self, n_row, n_col):
-        """Checks if parameters have been changed correctly"""
+    def food_list_save_recipe(self):
+        """Saves products and volumes of the menu as a dish, which can be added to menus as one product"""
 
-        if n_col == 0 or n_col == 4:
-            return False
-        elif self.tableFoods.item(n_row, 0) is None:
+        if self.userMenu is None or not self.userMenu.rows:
+            QMessageBox.information(self, "Error", "The menu is empty!")
             return False
 
-        food_name = self.tableFoods.item(n_row, 0).text()
-        product = self.FoodsTable.get_product(food_name)
-        if product is None:
+        recipe, ok_is_pressed = QInputDialog.getText(self, "Save menu as recipe",
+                                                     "Recipe name:", QLineEdit.Normal, "")
+        if not ok_is_pressed or recipe == '':
             return False
 
-        product_data = self.FoodsTable.get_current_product_data()
-        if product_data.empty:
+        recipe = str(recipe)
+        if self.FoodsTable.get_product(recipe) is not None and not self.FoodsTable.is_recipe(recipe):
+            QMessageBox.information(self, "Error", "Product is exist")
             return False
 
-        old_value = product_data.iloc[0, n_col]
-        try:
-            p = float(self.tableFoods.item(n_row, 1).text())
-            f = float(self.tableFoods.item(n_row, 2).text())
-            c = float(self.tableFoods.item(n_row, 3).text())
-        except ValueError:
-            QMessageBox.information(self, "Error", "The value must be number!")
-            self.tableFoods.setItem(n_row, n_col, QTableWidgetItem(str(old_value)))
+        ingredients = [[product, volume] for product, volume, contribution, calories in self.userMenu.rows]
+        error = self.FoodsTable.check_recipe(recipe, ingredients)
+        if error is not None:
+            QMessageBox.information(self, "Error", error)
             return False
 
-        if p < 0:
-            QMessageBox.information(self, "Error", "Proteins cannot be negative!")
-            self.tableFoods.setItem(n_row, n_col, QTableWidgetItem(str(old_value)))
-            return False
-        if f < 0:
-            QMessageBox.information(self, "Error", "Fats cannot be negative!")
-            self.tableFoods.setItem(n_row, n_col, QTableWidgetItem(str(old_value)))
-            return False
-        if c < 0:
-            QMessageBox.information(self, "Error", "Carbohydrates cannot be negative!")
-            self.tableFoods.setItem(n_row, n_col, QTableWidgetItem(str(old_value)))
-            return False
+        return self.foodsModel.save_recipe(recipe, ingredients)
 
-        self.FoodsTable.update_current_product_data([p, f, c, p * 4 + c * 4 + f * 9])
-        self.tableFoods.setItem(n_row, 4, QTableWidgetItem(str(int(p * 4 + c * 4 + f * 9))))
-        self.user_menu_calculate()
+    def food_list_edit_rejected(self, message):
+        QMessageBox.information(self, "Error", message)
 
     def user_menu_add_food_from_food_list(self):
         user = self.UsersTable.get_current_user()
@@ -509,15 +624,11 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Error", "There is no user loaded!")
             return False
 
-        row = self.tableFoods.currentRow()
-        col = 0
-        item = self.tableFoods.item(row, col)
-
-        try:
-            food_name = item.text()     # Catching this helps when trying to add food with no user loaded
-        except:
+        row = self.tableFoods.currentIndex().row()
+        if row < 0:
             QMessageBox.information(self, "Error", "You have not choose the product!")
             return False
+        food_name = self.foodsModel.product_name(row)
 
         if self.MaxProteinValue.text() == "":
             QMessageBox.information(self, "Error", "You have not entered the parameters!")
@@ -539,6 +650,7 @@ class MainWindow(QMainWindow):
 
     def user_menu_remove_food(self, selected_row):
         self.tableMenu.removeRow(selected_row)
+        self.userMenu.remove_row(selected_row)
 
     def user_menu_init(self):
         self.tableMenu.setRowCount(0)
@@ -548,13 +660,144 @@ class MainWindow(QMainWindow):
         self.tableMenu.setColumnWidth(2, 65)
 
         self.tableMenu.setHorizontalHeaderLabels(["Product", "Volume, g", "Calories"])
+        self.userMenu.clear()
 
-    def user_menu_create_new_row(self, product):
+    def user_menu_create_new_row(self, product, volume=100):
         new_row = self.tableMenu.rowCount() + 1
+        self.tableMenu.blockSignals(True)
         self.tableMenu.setRowCount(new_row)
         self.tableMenu.setItem(new_row - 1, 0, QTableWidgetItem(product))
-        self.tableMenu.setItem(new_row - 1, 1, QTableWidgetItem("100"))
+        self.tableMenu.setItem(new_row - 1, 1, QTableWidgetItem(str(volume)))
         self.tableMenu.setItem(new_row - 1, 2, QTableWidgetItem("0"))
+        self.tableMenu.blockSignals(False)
+
+        self.userMenu.add_row(product, volume)
+        self.user_menu_show_row(new_row - 1)
+
+    def get_user_name(self):
+        user = self.UsersTable.get_current_user() if self.UsersTable is not None else None
+        if user is None:
+            return None
+        return user.iloc[0]["userName"]
+
+    def user_menu_load_day(self):
+        """Fills the menu with meals of today saved in the history"""
+
+        user_name = self.get_user_name()
+        if user_name is None:
+            return False
+
+        for product, volume in self.history.get_day(user_name, date.today()):
+            self.user_menu_create_new_row(product, int(volume))
+        return True
+
+    def user_menu_save_day(self):
+        """Saves the menu as meals of today into the history"""
+
+        user_name = self.get_user_name()
+        if user_name is None:
+            return False
+
+        return self.history.set_day(user_name, date.today(), self.userMenu.get_meals())
+
+    def user_history(self):
+        """Shows average nutrients per day over the last days compared with the daily target"""
+
+        user_name = self.get_user_name()
+        if user_name is None:
+            QMessageBox.information(self, "Error", "There is no user loaded!")
+            return False
+
+        self.user_menu_save_day()
+        today = date.today()
+        lines = []
+        for days in HISTORY_PERIODS:
+            average = self.history.average(user_name, today - timedelta(days=days - 1), today)
+            if average is None:
+                lines.append("Last %d days: no meals" % days)
+                continue
+            lines.append("Last %d days: %d/%d proteins, %d/%d fats, %d/%d carbohydrates, %d/%d calories" % (
+                days, average["proteins"], self.user_max_calories[0], average["fats"], self.user_max_calories[1],
+                average["carbohydrates"], self.user_max_calories[2],
+                average["calories"], self.user_max_calories[3]))
+
+        QMessageBox.information(self, "History", "Average per day / daily target\n" + "\n".join(lines))
+        return True
+
+    def user_menu_generate(self):
+        """Replaces the menu by products and volumes hitting the daily target.
+        Products of the menu are kept, the user can exclude other products"""
+
+        from optimizer import plan_menu, TOLERANCE
+
+        if self.get_user_name() is None:
+            QMessageBox.information(self, "Error", "There is no user loaded!")
+            return False
+
+        text, ok_is_pressed = QInputDialog.getText(self, "Generate menu",
+                                                   "Products to exclude, separated by commas:", QLineEdit.Normal, "")
+        if not ok_is_pressed:
+            return False
+
+        include = [row[0] for row in self.userMenu.rows]
+        exclude = [product.strip() for product in text.split(",") if product.strip()]
+        try:
+            plan = plan_menu(self.FoodsTable, self.user_max_calories, include, exclude)
+        except ValueError as error:
+            QMessageBox.information(self, "Error", str(error))
+            return False
+
+        self.user_menu_init()
+        for product, volume in plan["items"]:
+            self.user_menu_create_new_row(product, volume)
+        self.user_menu_calculate()
+
+        if not plan["withinTolerance"]:
+            QMessageBox.information(self, "Generate menu",
+                                    "The menu differs from the daily target by more than %d%%" % (TOLERANCE * 100))
+        return True
+
+    def user_menu_show_row(self, n_row):
+        """Writes calories of the menu row into the table"""
+
+        calories = self.userMenu.get_row_calories(n_row)
+        if calories is None:
+            return False
+
+        self.tableMenu.blockSignals(True)
+        self.tableMenu.setItem(n_row, 2, QTableWidgetItem(str(calories)))
+        self.tableMenu.item(n_row, 2).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        self.tableMenu.item(n_row, 0).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        self.tableMenu.blockSignals(False)
+        return True
+
+    def user_menu_refresh_all(self):
+        for product in {row[0] for row in self.userMenu.rows}:
+            self.user_menu_refresh_product(product)
+
+    def user_menu_refresh_product(self, product):
+        """Recalculates only menu rows with the changed product"""
+
+        for n_row in self.userMenu.refresh_product(product):
+            self.user_menu_show_row(n_row)
+        self.user_menu_calculate()
+
+    def user_menu_remove_product(self, product):
+        """Removes menu rows of the deleted product, so the totals lose what it added"""
+
+        for n_row in reversed(self.userMenu.remove_product(product)):
+            self.tableMenu.removeRow(n_row)
+        self.user_menu_calculate()
+
+    def user_menu_rename_product(self, old_product, new_product):
+        """Shows the new name in menu rows of the renamed product"""
+
+        for n_row in self.userMenu.rename_product(old_product, new_product):
+            self.tableMenu.blockSignals(True)
+            self.tableMenu.item(n_row, 0).setText(new_product)
+            self.tableMenu.blockSignals(False)
+            self.user_menu_show_row(n_row)
+        self.user_menu_calculate()
 
     def user_menu_change_food_volume(self, n_row, n_col):
         """Removes food if value in volume column is zero"""
@@ -563,41 +806,17 @@ class MainWindow(QMainWindow):
             value = self.tableMenu.item(n_row, 1).text()
             if value == "0":
                 self.user_menu_remove_food(n_row)
+            else:
+                self.userMenu.set_volume(n_row, value)
+                self.user_menu_show_row(n_row)
 
             self.user_menu_calculate()
 
+    @timed("MainWindow.user_menu_calculate")
     def user_menu_calculate(self):
-        """Calculates calories and other parameters from user's menu"""
-
-        row_count = self.tableMenu.rowCount()
-        sum_cal = [0, 0, 0, 0]
-        for i in range(row_count):
-            if self.tableMenu.item(i, 0) is None:
-                continue
-            try:
-                coefficient = round(int(self.tableMenu.item(i, 1).text()) / 100, 6)
-            except:
-                coefficient = 0
-
-            food_name = self.tableMenu.item(i, 0).text()
-            product = self.FoodsTable.get_product(food_name)
-            if product is None:
-                continue
-            product_data = self.FoodsTable.get_current_product_data()
-            if product_data.empty:
-                continue
-
-            sum_cal[0] += int(coefficient * product_data["proteins"])
-            sum_cal[1] += int(coefficient * product_data["fats"])
-            sum_cal[2] += int(coefficient * product_data["carbohydrates"])
-            sum_cal[3] += int(coefficient * product_data["calories"])
-
-            coefficient_calories = float(product_data["calories"] / 100)
-            menu_calories = str(int((coefficient_calories * int(self.tableMenu.item(i, 1).text()))))
-            self.tableMenu.setItem(i, 2, QTableWidgetItem(menu_calories))
+        """Writes calories and other parameters from user's menu into labels"""
 
-            self.tableMenu.item(i, 2).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.tableMenu.item(i, 0).setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        sum_cal = list(self.userMenu.sum_cal)
 
         self.summary_proteins = sum_cal[0]
         self.summary_fats = sum_cal[1]
@@ -618,7 +837,7 @@ class Login(QDialog):
     def __init__(self, parent):
         self.parent = parent
         super().__init__()
-        uic.loadUi('Login.ui', self)
+        setup_ui(self, "Login.ui")
 
         self.PasswordLine.setEchoMode(QLineEdit.Password)
         self.LoginButton.clicked.connect(self.login_clicked)
@@ -635,6 +854,9 @@ class Login(QDialog):
             QMessageBox.information(self, 'Error', "You have not entered\n  login or password!")
             return False
 
+        # Menu of the previous user goes into the history before it is cleared
+        self.parent.user_menu_save_day()
+        self.parent.sync_tables()
         user = self.parent.UsersTable.find(login, False)
         if user is None:
             action = QMessageBox.question(self, "Error", "There is no user with this login.\n"
@@ -648,8 +870,7 @@ class Login(QDialog):
             else:
                 return False
         else:
-            user_data = self.parent.UsersTable.get_current_user_data()
-            if not (user_data["password"] == password):
+            if not self.parent.UsersTable.check_password(password):
                 QMessageBox.information(self, "Error", "Wrong password!")
                 return False
 
@@ -662,7 +883,7 @@ class ChangeParameters(QDialog):
     def __init__(self, parent):
         self.parent = parent
         super().__init__()
-        uic.loadUi('Parameters.ui', self)
+        setup_ui(self, "Parameters.ui")
 
         self.SaveButton.clicked.connect(self.save)
         self.CloseButton.clicked.connect(self.close_window)
@@ -710,14 +931,9 @@ class ChangeParameters(QDialog):
             QMessageBox.information(self, 'Error', "The parameters are not numbers!")
             return False
 
-        if not 6 < age < 120:
-            QMessageBox.information(self, "Error", "The age is not real! \n (should be from 6 to 120)")
-            return False
-        if not 60 < height < 250:
-            QMessageBox.information(self, "Error", "The height is not real! \n (should be from 60 to 250)")
-            return False
-        if not 20 < weight < 600:
-            QMessageBox.information(self, "Error", "The weight is not real! \n (should be from 20 to 600)")
+        error = self.parent.UsersTable.check_parameters(age, weight, height)
+        if error is not None:
+            QMessageBox.information(self, "Error", error)
             return False
 
         self.parent.UsersTable.set_current_user_data("age", age)
@@ -736,8 +952,11 @@ class ChangeParameters(QDialog):
 
 
 if __name__ == "__main__":
+    metrics.start()
+    startup_times = StartupTimes()
+    startup_times.mark("imports")
     app = QApplication(sys.argv)
-    calc = MainWindow()
-    calc.food_list_load_all()
+    startup_times.mark("application")
+    calc = MainWindow(startup_times, "--startup-report" in sys.argv)
     calc.show()
     sys.exit(app.exec_())
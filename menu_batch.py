@@ -0,0 +1,74 @@
+"""Totals of many menus at once, without Qt and without a lookup per row.
+Menus are encoded as a sparse menu x product matrix of grams in coordinate form
+(menu numbers, product rows, grams), the nutrients of the products are taken for all rows at once.
+
+Menu truncates the contribution of every row to int before adding it to the totals,
+so the totals are sums of truncated rows, not the truncated product of the matrices.
+The same is done here: rows are multiplied and truncated together, then summed by menus"""
+
+import numpy as np
+import pandas as pd
+
+from schema import exact_floats
+from tables import Menu
+
+NUTRIENT_COLUMNS = ["proteins", "fats", "carbohydrates", "calories"]
+
+
+def encode_menus(food_table, menus):
+    """Encodes menus, lists of [product, volume] rows as Menu.rows and the server take them.
+    Returns menu numbers, product rows and grams of every row. Row -1 is a product missing in Food"""
+
+    product_index = food_table.productIndex
+    menu_numbers = np.repeat(np.arange(len(menus)), [len(menu) for menu in menus])
+    product_rows = np.fromiter((product_index.get(row[0], -1) for menu in menus for row in menu),
+                               dtype=np.int64, count=len(menu_numbers))
+    grams = np.fromiter((Menu.parse_volume(row[1]) for menu in menus for row in menu),
+                        dtype=np.int64, count=len(menu_numbers))
+    return menu_numbers, product_rows, grams
+
+
+def evaluate_encoded(food_table, menu_numbers, product_rows, grams, count):
+    """Returns count x 4 array of proteins, fats, carbohydrates and calories of the encoded menus"""
+
+    totals = np.zeros((count, 4), dtype=np.int64)
+    found = product_rows >= 0
+    if not found.any():
+        return totals
+
+    menu_numbers = menu_numbers[found]
+    product_rows = product_rows[found]
+    coefficients = np.round(grams[found] / 100, 6)
+
+    df = food_table.df
+    for i, column in enumerate(NUTRIENT_COLUMNS):
+        # Only nutrients of the products in the menus are read, as they were written
+        values = exact_floats(df[column].to_numpy()[product_rows])
+        contributions = np.trunc(coefficients * values)
+        totals[:, i] = np.bincount(menu_numbers, weights=contributions, minlength=count)
+    return totals
+
+
+def evaluate_menus(food_table, menus):
+    """Returns totals of the menus as Menu.sum_cal gives them, an array with a row per menu"""
+
+    return evaluate_encoded(food_table, *encode_menus(food_table, menus), len(menus))
+
+
+def evaluate_meals(food_table, meals, keys):
+    """Returns totals of meals grouped by the key columns, e.g. meals of the history by ["day"].
+    meals has product and volume columns, the totals are calculated with the current Food"""
+
+    if meals.empty:
+        return pd.DataFrame(columns=list(keys) + NUTRIENT_COLUMNS)
+
+    groups = meals.groupby(list(keys), sort=True)
+    menu_numbers = groups.ngroup().to_numpy()
+    product_rows = meals["product"].map(food_table.productIndex).fillna(-1).to_numpy(dtype=np.int64)
+    grams = np.trunc(pd.to_numeric(meals["volume"], errors="coerce").fillna(0).to_numpy()).astype(np.int64)
+
+    totals = evaluate_encoded(food_table, menu_numbers, product_rows, grams, groups.ngroups)
+    result = groups.size().reset_index()[list(keys)]
+    for i, column in enumerate(NUTRIENT_COLUMNS):
+        result[column] = totals[:, i]
+    return result
@@ -0,0 +1,181 @@
+"""Timing of hot paths, off by default.
+Turn on with CALORIES_METRICS=1 or --metrics, the summary is printed to stderr on exit.
+CALORIES_METRICS=file or --metrics=file writes it into the file.
+CALORIES_PROFILE=file or --profile=file captures the session with cProfile, threads of tasks too.
+Both are read at import, so functions are wrapped only when timing is on."""
+
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def option(env_name, flag):
+    """Returns value of the flag (--flag or --flag=value) or of the environment variable, None if not set"""
+
+    for arg in sys.argv[1:]:
+        if arg == flag:
+            return "1"
+        if arg.startswith(flag + "="):
+            return arg[len(flag) + 1:]
+    return os.environ.get(env_name) or None
+
+
+METRICS_OUTPUT = option("CALORIES_METRICS", "--metrics")
+PROFILE_FILE = option("CALORIES_PROFILE", "--profile")
+# Since Python 3.12 cProfile works through sys.monitoring: there is one profiler for the process,
+# it sees all threads, and a profiler enabled in another thread raises ValueError
+THREAD_PROFILES = sys.version_info < (3, 12)
+ENABLED = METRICS_OUTPUT is not None
+
+
+class Histogram:
+    """Count of calls by latency. Bucket i holds calls shorter than 2**i microseconds"""
+
+    def __init__(self):
+        self.buckets = []
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, failed=False):
+        bucket = int(seconds * 1e6).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket with the percentile, in microseconds"""
+
+        needed = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= needed:
+                return 2 ** bucket
+        return 2 ** len(self.buckets)
+
+
+class Metrics:
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, failed=False):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds, failed)
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        lines = ["%-36s %8s %6s %10s %10s %10s %10s %10s" % (
+            "timer", "calls", "errors", "total, ms", "mean, us", "p50, us", "p99, us", "max, us")]
+        with self.lock:
+            for name, histogram in sorted(self.histograms.items(), key=lambda item: -item[1].total):
+                lines.append("%-36s %8d %6d %10.1f %10.1f %10s %10s %10.0f" % (
+                    name, histogram.count, histogram.errors, histogram.total * 1000,
+                    histogram.total / histogram.count * 1e6, "<%d" % histogram.percentile(0.5),
+                    "<%d" % histogram.percentile(0.99), histogram.max * 1e6))
+            for name, value in sorted(self.counters.items()):
+                lines.append("%-36s %8d" % (name, value))
+        return "\n".join(lines)
+
+
+metrics = Metrics()
+profiles = []
+
+
+def timed(name):
+    """Decorator recording latency of every call under the name. Returns the function as is when timing is off"""
+
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                metrics.record(name, time.perf_counter() - start, failed)
+        return wrapper
+    return decorator
+
+
+def increment(name, value=1):
+    if ENABLED:
+        metrics.increment(name, value)
+
+
+@contextmanager
+def profile_thread():
+    """Profiles the code of the block, for threads which are not profiled by start().
+    Does nothing on Python 3.12 and later, where the profile of start() covers the threads"""
+
+    if PROFILE_FILE is None or not THREAD_PROFILES:
+        yield
+        return
+
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiling tool is active, the block runs without a profile
+        profile = None
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.disable()
+            with metrics.lock:
+                profiles.append(profile)
+
+
+def start():
+    """Starts profiling of the main thread and writes the summary and the profile on exit"""
+
+    if PROFILE_FILE is not None:
+        profile = cProfile.Profile()
+        profile.enable()
+        profiles.append(profile)
+    if ENABLED or PROFILE_FILE is not None:
+        atexit.register(dump)
+
+
+def dump():
+    if METRICS_OUTPUT == "1":
+        print(metrics.summary(), file=sys.stderr)
+    elif METRICS_OUTPUT is not None:
+        with open(METRICS_OUTPUT, "w") as file:
+            file.write(metrics.summary() + "\n")
+
+    if PROFILE_FILE is not None and profiles:
+        for profile in profiles:
+            profile.disable()
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(PROFILE_FILE)
+        print("Profile is written to %s, view it with: python -m pstats %s" % (PROFILE_FILE, PROFILE_FILE),
+              file=sys.stderr)
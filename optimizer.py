@@ -0,0 +1,116 @@
+import numpy as np
+
+from tables import Menu
+
+NUTRIENTS = ["proteins", "fats", "carbohydrates", "calories"]
+MENU_SIZE = 6
+CANDIDATES = 20
+TOLERANCE = 0.05
+MIN_VOLUME = 10
+MAX_VOLUME = 500
+VOLUME_STEP = 5
+
+
+def solve_volumes(matrix, lower, upper):
+    """Least squares volumes of products (rows of the matrix, weighted nutrients per gram)
+    to hit the target 1 of every nutrient. Volumes out of bounds are fixed at the bound"""
+
+    count = len(matrix)
+    volumes = np.zeros(count)
+    free = np.ones(count, dtype=bool)
+    for _ in range(count + 1):
+        rest = np.ones(matrix.shape[1]) - volumes[~free] @ matrix[~free]
+        volumes[free] = np.linalg.lstsq(matrix[free].T, rest, rcond=None)[0]
+
+        below = free & (volumes < lower)
+        above = free & (volumes > upper)
+        if not (below.any() or above.any()):
+            break
+        volumes[below] = lower
+        volumes[above] = upper
+        free &= ~(below | above)
+        if not free.any():
+            break
+
+    error = volumes @ matrix - 1
+    return volumes, float(error @ error)
+
+
+def choose_candidates(weighted, usable, count=CANDIDATES):
+    """Rows rich in each of proteins, fats and carbohydrates and rows whose nutrients
+    are closest to the proportions of the target. Only a few rows of the catalogue are looked at later"""
+
+    rows = np.flatnonzero(usable)
+    values = weighted[rows]
+    at_max_volume = np.minimum(values * MAX_VOLUME, 1)
+    calories = values[:, 3]
+    scores = [values[:, j] / calories * at_max_volume[:, j] for j in range(3)]
+    scores.append(values.sum(axis=1) / (np.linalg.norm(values, axis=1) * 2))
+
+    found = set()
+    for score in scores:
+        if len(score) > count:
+            found.update(rows[np.argpartition(-score, count)[:count]].tolist())
+        else:
+            found.update(rows.tolist())
+    return sorted(found)
+
+
+def plan_menu(food_table, targets, include=(), exclude=(), size=MENU_SIZE, tolerance=TOLERANCE):
+    """Chooses products and volumes in grams so the menu totals are close to the targets
+    [proteins, fats, carbohydrates, calories]. Products of include are always in the menu,
+    products of exclude never. Raises ValueError if there is nothing to plan"""
+
+    targets = np.asarray(targets, dtype=np.float64)
+    if not (targets > 0).all():
+        raise ValueError("You have not entered the parameters!")
+
+    df = food_table.df
+    include_rows = []
+    for product in include:
+        row = food_table.productIndex.get(product)
+        if row is None:
+            raise ValueError("Product %s is not found!" % product)
+        include_rows.append(row)
+
+    # Nutrients per gram relative to the target, so every nutrient counts the same
+    weighted = df[NUTRIENTS].to_numpy(dtype=np.float64) / 100 / targets
+    usable = weighted[:, 3] > 0
+    if exclude:
+        usable &= ~df["product"].isin(list(exclude)).to_numpy()
+    usable[include_rows] = False
+    candidates = choose_candidates(weighted, usable)
+
+    selected = list(dict.fromkeys(include_rows))
+    volumes, error = solve_volumes(weighted[selected], MIN_VOLUME, MAX_VOLUME)
+    while len(selected) < size and candidates:
+        if selected and np.abs(volumes @ weighted[selected] - 1).max() <= tolerance:
+            break
+
+        best = None
+        for row in candidates:
+            new_volumes, new_error = solve_volumes(weighted[selected + [row]], MIN_VOLUME, MAX_VOLUME)
+            if best is None or new_error < best[2]:
+                best = row, new_volumes, new_error
+        if best is None or best[2] >= error:
+            break
+
+        selected.append(best[0])
+        candidates.remove(best[0])
+        volumes, error = best[1], best[2]
+
+    if not selected:
+        raise ValueError("There are no products to plan the menu!")
+
+    # The same calculation as the user's menu
+    menu = Menu(food_table)
+    for row, volume in zip(selected, volumes):
+        volume = int(round(volume / VOLUME_STEP) * VOLUME_STEP)
+        menu.add_row(df["product"].iat[row], max(volume, MIN_VOLUME))
+
+    deviation = [float((total - target) / target) for total, target in zip(menu.sum_cal, targets)]
+    return {
+        "items": [[product, volume] for product, volume, contribution, calories in menu.rows],
+        "totals": list(menu.sum_cal),
+        "deviation": deviation,
+        "withinTolerance": bool(max(abs(value) for value in deviation) <= tolerance)}
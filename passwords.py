@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+
+HASH_ITERATIONS = 200000
+HASH_PREFIX = "pbkdf2_sha256"
+CACHE_SIZE = 10000
+
+
+def hash_password(password, iterations=HASH_ITERATIONS):
+    """Returns salted hash in the form pbkdf2_sha256$iterations$salt$hash"""
+
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "%s$%d$%s$%s" % (HASH_PREFIX, iterations, salt.hex(), digest.hex())
+
+
+def is_hashed(stored):
+    return str(stored).startswith(HASH_PREFIX + "$")
+
+
+def verify_password(password, stored):
+    """Checks password against stored hash. Plain text passwords from old files are compared as is"""
+
+    stored = str(stored)
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+
+    prefix, iterations, salt, digest = stored.split("$")
+    new_digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(new_digest.hex(), digest)
+
+
+def needs_rehash(stored, iterations=HASH_ITERATIONS):
+    """True for plain text passwords and hashes made with another cost"""
+
+    if not is_hashed(stored):
+        return True
+    return int(str(stored).split("$")[1]) != iterations
+
+
+class PasswordCache:
+    """Remembers recent successful logins, so repeated logins don't pay the hash cost.
+    Keeps only a keyed fast digest of the password, the key lives in memory of this process"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.key = os.urandom(32)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, stored, password):
+        return hmac.new(self.key, (str(stored) + "\0" + password).encode(), hashlib.sha256).digest()
+
+    def check(self, user_name, stored, password):
+        digest = self.digest(stored, password)
+        with self.lock:
+            entry = self.entries.get(user_name)
+            if entry is None or not hmac.compare_digest(entry, digest):
+                self.misses += 1
+                return False
+
+            self.entries.move_to_end(user_name)
+            self.hits += 1
+            return True
+
+    def add(self, user_name, stored, password):
+        digest = self.digest(stored, password)
+        with self.lock:
+            self.entries[user_name] = digest
+            self.entries.move_to_end(user_name)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,170 @@
+import os
+
+import pandas as pd
+
+from storage import replace_file
+
+RECIPE_COLUMNS = ["recipe", "ingredient", "grams"]
+NUTRIENT_DECIMALS = 2  # rolled up values fit the float32 columns of Food
+
+
+def recipes_filename(food_filename):
+    return os.path.splitext(food_filename)[0] + ".recipes.csv"
+
+
+class Recipes:
+    """Dishes made of products of Food, other dishes included, with grams of every ingredient.
+    A dish is a row of Food too, its nutrients per 100 g are kept rolled up in the row,
+    so a menu looks it up as any product. Ingredients know the dishes using them,
+    so a change of a product recalculates only the dishes depending on it"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.ingredients = {}   # dish -> [[product, grams], ...]
+        self.usedIn = {}        # product -> dishes with the product as an ingredient
+
+    def load(self):
+        self.ingredients = {}
+        self.usedIn = {}
+        if not os.path.exists(self.filename):
+            return
+
+        rows = pd.read_csv(self.filename, dtype={"recipe": str, "ingredient": str})
+        recipes = {}
+        for recipe, ingredient, grams in rows[RECIPE_COLUMNS].values.tolist():
+            recipes.setdefault(recipe, []).append([ingredient, grams])
+        for recipe, ingredients in recipes.items():
+            self.set(recipe, ingredients)
+
+    def get_rows(self):
+        """Returns [dish, ingredient, grams] rows, a snapshot which can be saved in another thread"""
+
+        return [[recipe, ingredient, grams] for recipe, ingredients in self.ingredients.items()
+                for ingredient, grams in ingredients]
+
+    def save(self, rows):
+        if not rows and not os.path.exists(self.filename):
+            return
+
+        df = pd.DataFrame(rows, columns=RECIPE_COLUMNS)
+        replace_file(lambda filename: df.to_csv(filename, index=False), self.filename)
+
+    def is_recipe(self, product):
+        return product in self.ingredients
+
+    def get(self, recipe):
+        return self.ingredients.get(recipe)
+
+    @staticmethod
+    def merge_ingredients(ingredients):
+        """Sums grams of repeated ingredients, keeping the order of the first ones"""
+
+        merged = {}
+        for ingredient, grams in ingredients:
+            merged[ingredient] = merged.get(ingredient, 0) + float(grams)
+        return [[ingredient, grams] for ingredient, grams in merged.items()]
+
+    def check(self, recipe, ingredients, is_product):
+        """Returns error text if the dish can't be made of the ingredients, otherwise None"""
+
+        if not ingredients:
+            return "The recipe has no ingredients!"
+
+        total = 0
+        for ingredient, grams in ingredients:
+            if not is_product(ingredient):
+                return "Product %s is not found!" % ingredient
+            if grams < 0:
+                return "Grams cannot be negative!"
+            total += grams
+        if total <= 0:
+            return "The recipe weighs nothing!"
+
+        # A dish can't include itself, also through other dishes
+        included = {ingredient for ingredient, grams in ingredients}
+        if recipe in included or included & set(self.dependents([recipe])):
+            return "The recipe includes itself!"
+        return None
+
+    def set(self, recipe, ingredients):
+        self.remove(recipe)
+        self.ingredients[recipe] = self.merge_ingredients(ingredients)
+        for ingredient, grams in self.ingredients[recipe]:
+            self.usedIn.setdefault(ingredient, set()).add(recipe)
+
+    def remove(self, recipe):
+        """Makes the dish a plain product. Dishes including it keep it as an ingredient"""
+
+        for ingredient, grams in self.ingredients.pop(recipe, []):
+            self.usedIn[ingredient].discard(recipe)
+            if not self.usedIn[ingredient]:
+                del self.usedIn[ingredient]
+
+    def remove_product(self, product):
+        """Removes the deleted product from everywhere. Returns the dishes which have lost it"""
+
+        self.remove(product)
+        recipes = sorted(self.usedIn.pop(product, ()))
+        for recipe in recipes:
+            self.ingredients[recipe] = [item for item in self.ingredients[recipe] if item[0] != product]
+        return recipes
+
+    def rename(self, old_name, new_name):
+        if old_name in self.ingredients:
+            self.ingredients[new_name] = self.ingredients.pop(old_name)
+            for ingredient, grams in self.ingredients[new_name]:
+                self.usedIn[ingredient].discard(old_name)
+                self.usedIn[ingredient].add(new_name)
+
+        if old_name in self.usedIn:
+            self.usedIn[new_name] = self.usedIn.pop(old_name)
+            for recipe in self.usedIn[new_name]:
+                for item in self.ingredients[recipe]:
+                    if item[0] == old_name:
+                        item[0] = new_name
+
+    def dependents(self, products, include_products=False):
+        """Returns dishes depending on the products directly or through other dishes,
+        with include_products also the products which are dishes.
+        A dish comes after the dishes it includes, so they can be recalculated in this order"""
+
+        affected = {product for product in products if product in self.ingredients} if include_products else set()
+        stack = list(products)
+        while stack:
+            for recipe in self.usedIn.get(stack.pop(), ()):
+                if recipe not in affected:
+                    affected.add(recipe)
+                    stack.append(recipe)
+
+        # Only paths inside the affected dishes are walked
+        waiting = {recipe: sum(ingredient in affected for ingredient, grams in self.ingredients[recipe])
+                   for recipe in affected}
+        ready = sorted(recipe for recipe, count in waiting.items() if count == 0)
+        order = []
+        while ready:
+            recipe = ready.pop()
+            order.append(recipe)
+            for dependent in self.usedIn.get(recipe, ()):
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+        return order
+
+    def rollup(self, recipe, get_nutrients):
+        """Returns proteins, fats, carbohydrates and calories per 100 g of the dish.
+        get_nutrients takes the ingredients and gives nutrients per 100 g of each, None for a missing one"""
+
+        ingredients = self.ingredients[recipe]
+        total_grams = sum(grams for ingredient, grams in ingredients)
+        totals = [0.0, 0.0, 0.0, 0.0]
+        all_nutrients = get_nutrients([ingredient for ingredient, grams in ingredients])
+        for (ingredient, grams), nutrients in zip(ingredients, all_nutrients):
+            if nutrients is None:
+                continue
+            for i in range(4):
+                totals[i] += nutrients[i] * grams
+
+        if total_grams <= 0:
+            return [0.0, 0.0, 0.0, 0.0]
+        return [round(value / total_grams, NUTRIENT_DECIMALS) for value in totals]
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = "string[pyarrow]"  # one buffer for all names instead of a Python object per name
+except ImportError:
+    STRING = object
+
+# float32 keeps any number with 6 significant digits, so macros with 2 decimals below
+# FLOAT32_LIMIT are read back exactly. Other columns stay float64
+FLOAT32_LIMIT = 10000
+FLOAT32_DECIMALS = 2
+
+FOOD_SCHEMA = {
+    "product": STRING,
+    "proteins": np.float32,
+    "fats": np.float32,
+    "carbohydrates": np.float32,
+    "calories": np.float32}
+
+USERS_SCHEMA = {
+    "userName": STRING,
+    "password": STRING,
+    "sex": pd.CategoricalDtype([0, 1]),
+    "age": np.int16,
+    "w": np.int16,
+    "h": np.int16,
+    "activity": pd.CategoricalDtype([0, 1, 2, 3]),
+    "goal": pd.CategoricalDtype([0, 1, 2])}
+
+
+def fits_float32(values):
+    values = np.asarray(values, dtype=np.float64)
+    return bool(np.all(np.abs(values) < FLOAT32_LIMIT) and np.array_equal(np.round(values, FLOAT32_DECIMALS), values))
+
+
+def exact_float(value):
+    """Returns float32 value as the number which was stored, e.g. 1.1 instead of 1.100000023841858"""
+
+    return float(str(value))
+
+
+def exact_floats(values):
+    """Returns an array as exact_float does for one value. float32 columns only keep numbers
+    with FLOAT32_DECIMALS decimals, so rounding gives them back without a string per value"""
+
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        return np.round(values.astype(np.float64), FLOAT32_DECIMALS)
+    return values.astype(np.float64)
+
+
+def to_numbers(df, column):
+    values = pd.to_numeric(df[column], errors="coerce")
+    if values.isna().any():
+        raise ValueError("Column %s has %d values which are not numbers" % (column, values.isna().sum()))
+    return values
+
+
+def is_integer(dtype):
+    return isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.integer)
+
+
+def convert_column(df, column, dtype):
+    if dtype is STRING:
+        if df[column].isna().any():
+            raise ValueError("Column %s has empty values" % column)
+        if df[column].dtype == dtype:
+            return df[column]
+        return df[column].astype(str).astype(dtype)
+
+    if df[column].dtype == dtype:
+        return df[column]
+
+    values = to_numbers(df, column)
+    if isinstance(dtype, pd.CategoricalDtype):
+        unknown = ~values.isin(dtype.categories)
+        if unknown.any():
+            raise ValueError("Column %s has unknown values: %s" % (column, sorted(set(values[unknown]))[:10]))
+        return values.astype(np.int64).astype(dtype)
+
+    if dtype is np.float32:
+        return values.astype(np.float32 if fits_float32(values) else np.float64)
+
+    limits = np.iinfo(dtype)
+    if not ((values % 1 == 0) & (values >= limits.min) & (values <= limits.max)).all():
+        raise ValueError("Column %s must have integers from %d to %d" % (column, limits.min, limits.max))
+    return values.astype(dtype)
+
+
+def text_dtypes(schema):
+    """Types which readers of text formats can parse into at once, the rest is converted after checks"""
+
+    return {column: dtype for column, dtype in schema.items() if dtype is STRING}
+
+
+def apply_schema(df, schema):
+    """Checks the loaded table and converts its columns to the compact types of the schema.
+    Raises ValueError if a column is missing or has wrong values"""
+
+    missing = [column for column in schema if column not in df.columns]
+    if missing:
+        raise ValueError("There are no columns: " + ", ".join(missing))
+
+    # Columns of the right type are taken as they are, so memory-mapped columns stay mapped
+    return pd.DataFrame({column: convert_column(df, column, schema[column]) if column in schema else df[column]
+                         for column in df.columns}, copy=False)
+
+
+def load_table(storage, filename, schema):
+    """Loads the table with the schema types. Text files are converted by chunks,
+    so the whole table with plain types is never in memory"""
+
+    if not hasattr(storage, "load_chunks"):
+        return apply_schema(storage.load(filename, text_dtypes(schema)), schema)
+
+    with storage.load_chunks(filename, text_dtypes(schema)) as reader:
+        chunks = [apply_schema(chunk, schema) for chunk in reader]
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def cast_like(new_rows, df):
+    """Converts new rows to the types of the table before concat, so the table keeps compact types.
+    A column which can't keep its type with the new values gets the type pandas chooses"""
+
+    dtypes = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        values = new_rows[column]
+        if dtype == np.float32 and not fits_float32(values):
+            continue
+        if isinstance(dtype, pd.CategoricalDtype) and not values.isin(dtype.categories).all():
+            continue
+        if is_integer(dtype):
+            limits = np.iinfo(dtype)
+            if not ((values >= limits.min) & (values <= limits.max)).all():
+                continue
+        dtypes[column] = dtype
+    return new_rows.astype(dtypes)
+
+
+def fit_value(df, column, value):
+    """Makes float32 column float64 if the value can't be kept exactly, before the value is set"""
+
+    if df[column].dtype == np.float32 and not fits_float32([value]):
+        df[column] = df[column].astype(np.float64)
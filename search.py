@@ -0,0 +1,188 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain, islice
+
+SCAN_LIMIT = 500
+FUZZY_SIMILARITY = 0.5
+CHECK_POSTINGS = 8
+
+
+def split_words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def bigrams(word):
+    word = " " + word + " "
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+class ProductSearch:
+    """Word index over product names. Every word of the query must be the beginning of
+    some word of the product. A query word which begins no word is matched with
+    similar words beginning with the same letter (bigram similarity), so small typos still find products.
+    Names beginning with the query are found in the sorted names, they rank first"""
+
+    def __init__(self, products=()):
+        self.postings = {}      # word -> set of product names
+        self.vocabulary = []    # sorted words, for prefix ranges
+        self.names = []         # sorted (lower case name, product), for names beginning with the query
+        self.wordBigrams = {}   # first letter + bigram -> set of words, for typos
+        self.bigramCounts = {}  # word -> number of its bigrams
+
+        # Whole catalogue is indexed at once, the vocabulary and the names are sorted one time
+        for product in products:
+            for word in set(split_words(str(product))):
+                self.postings.setdefault(word, set()).add(product)
+            self.names.append((str(product).lower(), product))
+        self.names.sort()
+        self.vocabulary = sorted(self.postings)
+        for word in self.vocabulary:
+            self.add_bigrams(word)
+
+    def add(self, product):
+        insort(self.names, (str(product).lower(), product))
+        for word in set(split_words(str(product))):
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = set()
+                insort(self.vocabulary, word)
+                self.add_bigrams(word)
+            posting.add(product)
+
+    def add_bigrams(self, word):
+        word_bigrams = bigrams(word)
+        self.bigramCounts[word] = len(word_bigrams)
+        for bigram in word_bigrams:
+            self.wordBigrams.setdefault(word[0] + bigram, set()).add(word)
+
+    def remove(self, product):
+        name = (str(product).lower(), product)
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            del self.names[i]
+
+        for word in set(split_words(str(product))):
+            posting = self.postings.get(word)
+            if posting is None:
+                continue
+
+            posting.discard(product)
+            if not posting:
+                del self.postings[word]
+                del self.vocabulary[bisect_left(self.vocabulary, word)]
+                del self.bigramCounts[word]
+                for bigram in bigrams(word):
+                    self.wordBigrams[word[0] + bigram].discard(word)
+
+    def rename(self, old_product, new_product):
+        self.remove(old_product)
+        self.add(new_product)
+
+    def prefix_names(self, prefix):
+        """Products with names beginning with the prefix, in alphabetical order, so the same name is the first"""
+
+        i = bisect_left(self.names, (prefix,))
+        while i < len(self.names) and self.names[i][0].startswith(prefix):
+            yield self.names[i][1]
+            i += 1
+
+    def prefix_words(self, prefix):
+        """Words beginning with the prefix, in alphabetical order"""
+
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            yield self.vocabulary[i]
+            i += 1
+
+    def similar_words(self, word):
+        query = bigrams(word)
+        counts = Counter(chain.from_iterable(self.wordBigrams.get(word[0] + bigram, ()) for bigram in query))
+
+        # Similarity can reach the threshold only if the word has enough common bigrams,
+        # so candidates are checked from the most common ones and the rest are skipped
+        minimum = FUZZY_SIMILARITY * len(query)
+        similar = []
+        for candidate, count in counts.most_common():
+            if count < minimum:
+                break
+            similarity = count / (len(query) + self.bigramCounts[candidate] - count)
+            if similarity >= FUZZY_SIMILARITY:
+                similar.append((-similarity, candidate))
+        return [candidate for similarity, candidate in sorted(similar)]
+
+    def matching_words(self, word):
+        """Returns words matching one word of the query and True if they are only similar"""
+
+        words = list(self.prefix_words(word))
+        if words:
+            return words, False
+        return self.similar_words(word), True
+
+    def candidates(self, words):
+        """Yields products having any of the words, each product once"""
+
+        if len(words) == 1:
+            yield from self.postings[words[0]]
+            return
+
+        seen = set()
+        for word in words:
+            for product in self.postings[word]:
+                if product not in seen:
+                    seen.add(product)
+                    yield product
+
+    def word_check(self, query_word, words, fuzzy):
+        """Returns function checking that the product has one of the words matching the query word"""
+
+        if len(words) <= CHECK_POSTINGS:
+            postings = [self.postings[word] for word in words]
+            return lambda product: any(product in posting for posting in postings)
+        if fuzzy:
+            words = set(words)
+            return lambda product: any(word in words for word in split_words(str(product)))
+        return lambda product: any(word.startswith(query_word) for word in split_words(str(product)))
+
+    def find(self, query, count=10):
+        """Returns up to count product names matching the query, best first:
+        the same name, names beginning with the query, not fuzzy matches, then shorter names.
+        Up to SCAN_LIMIT names beginning with the query are ranked, in alphabetical order,
+        so the same name is always among them. If they are fewer than count, up to SCAN_LIMIT other
+        matching products are ranked too, products of the shortest matching words first"""
+
+        matches = []
+        for query_word in split_words(query):
+            words, fuzzy = self.matching_words(query_word)
+            if not words:
+                return []
+            matches.append((query_word, words, fuzzy))
+        if not matches:
+            return []
+
+        query_text = query.strip().lower()
+        found = list(islice(self.prefix_names(query_text), SCAN_LIMIT))
+        if len(found) < count:
+            # Scan products of the query word with the fewest products and check the other words on them
+            matches.sort(key=lambda match: sum(len(self.postings[word]) for word in match[1][:SCAN_LIMIT]))
+            checks = [self.word_check(*match) for match in matches[1:]]
+            query_word, words, fuzzy = matches[0]
+            if not fuzzy:
+                words = sorted(words, key=len)  # the same word first, its products rank before longer words
+            prefixed = set(found)
+            scanned = 0
+            for product in self.candidates(words):
+                if product not in prefixed and all(check(product) for check in checks):
+                    found.append(product)
+                    scanned += 1
+                    if scanned >= SCAN_LIMIT:
+                        break
+
+        fuzzy_query = any(fuzzy for query_word, words, fuzzy in matches)
+
+        def rank(product):
+            name = str(product).lower()
+            return name != query_text, not name.startswith(query_text), fuzzy_query, len(name), name
+
+        return heapq.nsmallest(count, found, key=rank)
@@ -0,0 +1,378 @@
+"""Headless HTTP/JSON service over Food and Users.
+Run: python server.py --port 8080 --food Food.csv --users users.csv
+Tables in .db or .sqlite files are used through SQLite without loading them, see sqlite_tables.py
+With --user-shards N users are kept in N shard files made by shards.py, with --shard-processes
+every shard is served by its own worker process
+
+POST /register    {"userName", "password"}  -> {"token", "userName"}
+POST /login       {"userName", "password"}  -> {"token", "userName"}
+PUT  /parameters  {"sex", "age", "w", "h", "activity", "goal"}  -> daily target
+GET  /target      -> daily target of the logged user
+POST /menu        {"items": [[product, volume], ...]}  -> menu totals
+Requests after login need header "Authorization: Bearer <token>".
+A token unused for SESSION_SECONDS is logged out."""
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+import secrets
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import metrics
+from calculator import BMI_ADVICE, PARAMETERS
+from metrics import timed
+from passwords import HASH_ITERATIONS, needs_rehash
+from schema import USERS_SCHEMA
+from shards import ShardedUsers
+from sqlite_tables import SqliteFood, SqliteUsers, is_sqlite
+from tables import Food, Users, Menu
+
+MAX_BODY = 1024 * 1024
+SESSION_SECONDS = 7 * 24 * 3600
+MAX_SESSIONS = 100000  # the least recently used session is dropped above it
+
+
+def is_finite_number(value):
+    """False for infinity, NaN and integers too large for a float, which JSON numbers may be"""
+
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+class HttpError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class CalculatorService:
+    """The calculator without Qt. Methods are called from worker threads,
+    so every access to a table holds its lock. Sharded users have a lock per shard"""
+
+    def __init__(self, food_table, users_table):
+        self.foodTable = food_table
+        self.usersTable = users_table
+        self.foodLock = threading.Lock()
+        self.usersLock = threading.Lock()
+        self.sessions = OrderedDict()  # token -> [user name, time of the last use], the least recently used first
+        self.sessionsLock = threading.Lock()
+
+    def users_lock(self, user_name):
+        if hasattr(self.usersTable, "get_lock"):
+            return self.usersTable.get_lock(user_name)
+        return self.usersLock
+
+    def open_session(self, user_name):
+        token = secrets.token_hex(16)
+        now = time.monotonic()
+        with self.sessionsLock:
+            self.sessions[token] = [user_name, now]
+            # Sessions are ordered by the last use, so expired ones are at the start
+            while self.sessions and (len(self.sessions) > MAX_SESSIONS or
+                                     now - next(iter(self.sessions.values()))[1] > SESSION_SECONDS):
+                self.sessions.popitem(last=False)
+        return {"token": token, "userName": user_name}
+
+    def get_session_user(self, token):
+        now = time.monotonic()
+        with self.sessionsLock:
+            session = self.sessions.get(token)
+            if session is not None and now - session[1] > SESSION_SECONDS:
+                del self.sessions[token]
+                session = None
+            if session is None:
+                raise HttpError(HTTPStatus.UNAUTHORIZED, "You are not logged in!")
+            session[1] = now
+            self.sessions.move_to_end(token)
+            return session[0]
+
+    @staticmethod
+    def get_login_data(data):
+        user_name = str(data.get("userName", ""))
+        password = str(data.get("password", ""))
+        if user_name == "" or password == "":
+            raise HttpError(HTTPStatus.BAD_REQUEST, "You have not entered login or password!")
+        return user_name, password
+
+    @timed("CalculatorService.login")
+    def login(self, data):
+        user_name, password = self.get_login_data(data)
+        with self.users_lock(user_name):
+            if self.usersTable.find(user_name, False) is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, "There is no user with this login.")
+            stored = self.usersTable.get_current_user_data()["password"]
+
+        # The slow hash runs without the lock, so logins of different users don't wait for each other
+        if not self.usersTable.verify_user_password(user_name, stored, password):
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Wrong password!")
+
+        if needs_rehash(stored, self.usersTable.hashIterations):
+            with self.users_lock(user_name):
+                self.usersTable.find(user_name, False)
+                self.usersTable.check_password(password)
+
+        return self.open_session(user_name)
+
+    @timed("CalculatorService.register")
+    def register(self, data):
+        user_name, password = self.get_login_data(data)
+        with self.users_lock(user_name):
+            if self.usersTable.find(user_name, False) is not None:
+                raise HttpError(HTTPStatus.CONFLICT, "User already exists!")
+            self.usersTable.add_new_to_object(user_name, password)
+
+        return self.open_session(user_name)
+
+    @timed("CalculatorService.update_parameters")
+    def update_parameters(self, token, data):
+        user_name = self.get_session_user(token)
+        try:
+            parameters = {column: int(data[column]) for column in PARAMETERS}
+        except (KeyError, TypeError, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "The parameters are not numbers!")
+
+        error = Users.check_parameters(parameters["age"], parameters["w"], parameters["h"])
+        if error is not None:
+            raise HttpError(HTTPStatus.BAD_REQUEST, error)
+        for column in ("sex", "activity", "goal"):
+            if parameters[column] not in USERS_SCHEMA[column].categories:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Unknown value of %s!" % column)
+
+        with self.users_lock(user_name):
+            self.usersTable.find(user_name, False)
+            for column in PARAMETERS:
+                self.usersTable.set_current_user_data(column, parameters[column])
+
+        return self.target(token)
+
+    @timed("CalculatorService.target")
+    def target(self, token):
+        """The calculate_calories math for the logged user"""
+
+        user_name = self.get_session_user(token)
+        with self.users_lock(user_name):
+            self.usersTable.find(user_name, False)
+            parameters = self.usersTable.get_current_user_parameters()
+
+        # Users with the same parameters get the same targets from the cache
+        targets = self.usersTable.targetCache.get(parameters)
+        if not targets.pop("valid"):
+            raise HttpError(HTTPStatus.CONFLICT, "You have not entered the parameters!")
+
+        targets["advice"] = BMI_ADVICE[targets["bmiCategory"]]
+        return targets
+
+    @timed("CalculatorService.menu")
+    def menu(self, data):
+        """The user_menu_calculate math for a list of [product, volume] rows"""
+
+        items = data.get("items")
+        if not isinstance(items, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "There is no menu items!")
+
+        with self.foodLock:
+            menu = Menu(self.foodTable)
+            for item in items:
+                if not isinstance(item, list) or len(item) != 2:
+                    raise HttpError(HTTPStatus.BAD_REQUEST, "Menu item must be [product, volume]!")
+                if isinstance(item[1], (int, float)) and not is_finite_number(item[1]):
+                    raise HttpError(HTTPStatus.BAD_REQUEST, "Volume must be a finite number!")
+                menu.add_row(str(item[0]), item[1])
+
+        return {
+            "rows": [menu.get_row_calories(row) for row in range(len(menu.rows))],
+            "proteins": menu.sum_cal[0],
+            "fats": menu.sum_cal[1],
+            "carbohydrates": menu.sum_cal[2],
+            "calories": menu.sum_cal[3]}
+
+    @timed("CalculatorService.save")
+    def save(self):
+        with self.foodLock:
+            self.foodTable.save_to_csv()
+        with self.usersLock:
+            self.usersTable.save_to_csv()
+
+
+class Server:
+    """Minimal HTTP/1.1 server with keep-alive. The event loop only reads and writes sockets,
+    table work runs in a thread pool"""
+
+    def __init__(self, service, workers=4):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.connections = set()
+        self.routes = {
+            ("POST", "/register"): lambda token, data: service.register(data),
+            ("POST", "/login"): lambda token, data: service.login(data),
+            ("PUT", "/parameters"): service.update_parameters,
+            ("GET", "/target"): lambda token, data: service.target(token),
+            ("POST", "/menu"): lambda token, data: service.menu(data)}
+
+    @staticmethod
+    async def read_request(reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request headers are too large!")
+
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request is too large!")
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], version, headers, body
+
+    async def dispatch(self, method, path, headers, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": "Unknown request"}
+
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise ValueError("JSON object expected")
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON object"}
+
+        token = headers.get("authorization", "").replace("Bearer ", "", 1)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, functools.partial(handler, token, data))
+        except HttpError as error:
+            return error.status, {"error": error.message}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+        return HTTPStatus.OK, result
+
+    async def handle_connection(self, reader, writer):
+        # serve closes connections left open, idle keep-alive ones too
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except (HttpError, ValueError) as error:
+                    status = getattr(error, "status", HTTPStatus.BAD_REQUEST)
+                    writer.write(self.make_response(status, {"error": str(error)}, False))
+                    break
+                if request is None:
+                    break
+
+                method, path, version, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                status, result = await self.dispatch(method, path, headers, body)
+                writer.write(self.make_response(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    def make_response(status, result, keep_alive):
+        body = json.dumps(result).encode()
+        head = "HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n" % (
+            status, status.phrase, len(body), "keep-alive" if keep_alive else "close")
+        return head.encode("latin-1") + body
+
+    async def save_periodically(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(self.executor, self.service.save)
+
+    async def serve(self, host, port, save_interval):
+        """Serves until SIGINT or SIGTERM, then saves tables"""
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stop.set)
+            except NotImplementedError:
+                pass  # Windows, KeyboardInterrupt stops the server there
+
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        saver = asyncio.create_task(self.save_periodically(save_interval))
+        print("Serving on %s:%d" % (host, port), flush=True)
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            saver.cancel()
+            connections = list(self.connections)
+            for task in connections:
+                task.cancel()
+            await asyncio.gather(*connections, return_exceptions=True)
+            self.executor.shutdown()
+            self.service.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calories calculator HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--food", default="Food.csv")
+    parser.add_argument("--users", default="users.csv")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--save-interval", type=float, default=60, help="seconds between saves")
+    parser.add_argument("--hash-iterations", type=int, default=HASH_ITERATIONS, help="password hash cost")
+    parser.add_argument("--user-shards", type=int, default=0, help="number of shard files of --users, see shards.py")
+    parser.add_argument("--shard-processes", action="store_true", help="serve every shard in a worker process")
+    # Read by metrics.py at import, here they are only accepted
+    parser.add_argument("--metrics", nargs="?", const="1", help="print timings on exit, or write them into the file")
+    parser.add_argument("--profile", help="write cProfile of the session into the file")
+    args = parser.parse_args()
+    metrics.start()
+
+    if is_sqlite(args.food):
+        food_table = SqliteFood(args.food, pool_size=args.workers)
+    else:
+        food_table = Food(args.food)
+    if args.user_shards > 0:
+        users_table = ShardedUsers(args.users, args.user_shards, hash_iterations=args.hash_iterations,
+                                   processes=args.shard_processes)
+    elif is_sqlite(args.users):
+        users_table = SqliteUsers(args.users, args.hash_iterations, pool_size=args.workers)
+    else:
+        users_table = Users(args.users, hash_iterations=args.hash_iterations)
+
+    service = CalculatorService(food_table, users_table)
+    try:
+        asyncio.run(Server(service, args.workers).serve(args.host, args.port, args.save_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if isinstance(users_table, ShardedUsers):
+            users_table.close()
+
+
+if __name__ == "__main__":
+    main()
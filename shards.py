@@ -0,0 +1,248 @@
+"""Users split by user name into shard files. Every shard is a Users table of its own with its own
+journal and lock, so it is loaded and saved alone, and it can live in a worker process.
+ShardedUsers routes every user to its shard and has the methods of Users used by the server.
+
+A users file is split by: python shards.py users.csv 4
+then served by: python server.py --users users.csv --user-shards 4 --shard-processes"""
+
+import argparse
+import functools
+import multiprocessing
+import os
+import signal
+import threading
+import zlib
+
+import numpy as np
+
+from calculator import TargetCache
+from journal import Journal
+from passwords import HASH_ITERATIONS
+from storage import get_storage
+from tables import Users
+
+
+def shard_of(user_name, count):
+    """Shard number of the user. crc32 is the same in every process, unlike hash() of a string"""
+
+    return zlib.crc32(user_name.encode()) % count
+
+
+def shard_filename(filename, shard, count):
+    base, extension = os.path.splitext(filename)
+    return "%s.shard%dof%d%s" % (base, shard, count, extension)
+
+
+def split_users(filename, count, storage_format=None):
+    """Writes users of the file, with the changes of its journal, into count shard files.
+    Returns names of the shard files"""
+
+    storage = get_storage(filename, storage_format)
+    users = Users(filename, storage_format).df
+    shards = np.array([shard_of(user_name, count) for user_name in users["userName"].tolist()], dtype=np.int64)
+
+    filenames = []
+    for shard in range(count):
+        shard_file = shard_filename(filename, shard, count)
+        journal = Journal(shard_file)
+        with journal.lock():
+            storage.save(users[shards == shard].reset_index(drop=True), shard_file)
+            journal.clear()
+        filenames.append(shard_file)
+    return filenames
+
+
+def serve_shard(connection, filename, storage_format, hash_iterations):
+    """Worker process: loads one shard and calls its methods for the router until it gets None"""
+
+    # Ctrl+C reaches the whole process group, the router stops the workers after saving
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    users = Users(filename, storage_format, hash_iterations)
+    connection.send(len(users.df))
+    while True:
+        request = connection.recv()
+        if request is None:
+            users.save_to_csv()
+            connection.send(None)
+            return
+
+        name, args = request
+        try:
+            connection.send((True, getattr(users, name)(*args)))
+        except Exception as error:
+            connection.send((False, error))
+
+
+class ShardProcess:
+    """Users of one shard in a worker process. Methods of Users are called through a pipe,
+    one call at a time, their results are copies"""
+
+    def __init__(self, filename, storage_format=None, hash_iterations=HASH_ITERATIONS):
+        self.filename = filename
+        self.callLock = threading.Lock()
+        # spawn doesn't copy threads and locks of the parent, which fork would do
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=serve_shard, daemon=True,
+                                       args=(child_connection, filename, storage_format, hash_iterations))
+        self.process.start()
+        self.size = None
+
+    def wait_loaded(self):
+        """Returns number of users once the worker has loaded the shard"""
+
+        if self.size is None:
+            self.size = self.connection.recv()
+        return self.size
+
+    def call(self, name, *args):
+        with self.callLock:
+            self.wait_loaded()
+            self.connection.send((name, args))
+            ok, result = self.connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def __getattr__(self, name):
+        return functools.partial(self.call, name)
+
+    def close(self):
+        """Saves the shard and stops the worker"""
+
+        with self.callLock:
+            self.wait_loaded()
+            self.connection.send(None)
+            self.connection.recv()
+        self.process.join()
+
+
+class ShardedUsers:
+    """Router over count shards of the users file. find makes the user current
+    as Users.find does, the following calls go to the shard of the current user.
+    The current shard is kept per thread; a thread working with a user holds get_lock(user_name),
+    so users of different shards are served at the same time"""
+
+    def __init__(self, filename, count, storage_format=None, hash_iterations=HASH_ITERATIONS, processes=False):
+        self.filename = filename
+        self.hashIterations = hash_iterations
+        self.targetCache = TargetCache()
+        self.filenames = [shard_filename(filename, shard, count) for shard in range(count)]
+        self.locks = [threading.Lock() for _ in range(count)]
+        self.current = threading.local()
+
+        # Workers load their shards at the same time
+        if processes:
+            self.shards = [ShardProcess(shard_file, storage_format, hash_iterations) for shard_file in self.filenames]
+            for shard in self.shards:
+                shard.wait_loaded()
+        else:
+            self.shards = [Users(shard_file, storage_format, hash_iterations) for shard_file in self.filenames]
+
+    def get_shard(self, user_name):
+        return self.shards[shard_of(user_name, len(self.shards))]
+
+    def get_lock(self, user_name):
+        return self.locks[shard_of(user_name, len(self.shards))]
+
+    def find(self, user_name, add_user):
+        self.current.shard = self.get_shard(user_name)
+        return self.current.shard.find(user_name, add_user)
+
+    def add_new_to_object(self, user_name, password):
+        self.current.shard = self.get_shard(user_name)
+        return self.current.shard.add_new_to_object(user_name, password)
+
+    def add_many_to_object(self, users):
+        """Adds (user name, password) pairs to their shards. Returns number of added users"""
+
+        groups = {}
+        for user_name, password in users:
+            groups.setdefault(shard_of(user_name, len(self.shards)), []).append((user_name, password))
+        added = 0
+        for shard, group in groups.items():
+            with self.locks[shard]:
+                added += self.shards[shard].add_many_to_object(group)
+        return added
+
+    def get_current_shard(self):
+        return getattr(self.current, "shard", None)
+
+    def get_current_user(self):
+        shard = self.get_current_shard()
+        return shard.get_current_user() if shard is not None else None
+
+    def get_current_user_data(self):
+        shard = self.get_current_shard()
+        return shard.get_current_user_data() if shard is not None else None
+
+    def set_current_user_data(self, col_index, int_value):
+        self.current.shard.set_current_user_data(col_index, int_value)
+
+    def get_current_user_parameters(self):
+        return self.current.shard.get_current_user_parameters()
+
+    def get_current_user_targets(self):
+        return self.targetCache.get(self.get_current_user_parameters())
+
+    def check_password(self, password):
+        return self.current.shard.check_password(password)
+
+    def verify_user_password(self, user_name, stored, password):
+        """Checks the password in the shard of the user, so slow hashes of different shards
+        run in different worker processes"""
+
+        return self.get_shard(user_name).verify_user_password(user_name, stored, password)
+
+    def is_unfilled_parameters(self):
+        return self.current.shard.is_unfilled_parameters()
+
+    def is_real_parameters(self):
+        return self.current.shard.is_real_parameters()
+
+    check_parameters = staticmethod(Users.check_parameters)
+
+    def for_each_shard(self, name):
+        """Calls the method of every shard holding its lock, returns the results"""
+
+        results = []
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                results.append(getattr(shard, name)())
+        return results
+
+    def sync(self):
+        return any(self.for_each_shard("sync"))
+
+    def save_to_csv(self):
+        self.for_each_shard("save_to_csv")
+        return True
+
+    def compact(self):
+        return all(self.for_each_shard("compact"))
+
+    def close(self):
+        """Saves the shards and stops the workers"""
+
+        if isinstance(self.shards[0], ShardProcess):
+            for shard, lock in zip(self.shards, self.locks):
+                with lock:
+                    shard.close()
+        else:
+            self.save_to_csv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Splits a users file into shard files by user name")
+    parser.add_argument("users", help="users file, .csv, .parquet, .feather or .db")
+    parser.add_argument("count", type=int, help="number of shards")
+    args = parser.parse_args()
+    if args.count < 1:
+        parser.error("There must be at least one shard")
+
+    for shard_file in split_users(args.users, args.count):
+        print(shard_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Food and Users working on an SQLite database instead of a DataFrame.
+Lookups use the unique index of the key column, nothing is loaded into memory.
+Every change is committed at once in WAL mode, so other connections and processes see it;
+many rows are written in one transaction. For the server and scripts: the window shows DataFrame tables.
+
+A database is made from a table file by: python storage.py Food.csv Food.db"""
+
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from calculator import PARAMETERS, TargetCache
+from passwords import HASH_ITERATIONS, PasswordCache, hash_password
+from storage import SQLITE_TABLE
+from tables import Food, UserAccount, Users
+
+POOL_SIZE = 4
+SQLITE_EXTENSIONS = (".db", ".sqlite")
+FOOD_COLUMNS = ["product", "proteins", "fats", "carbohydrates", "calories"]
+USERS_COLUMNS = ["userName", "password", "sex", "age", "w", "h", "activity", "goal"]
+
+
+def is_sqlite(filename):
+    return os.path.splitext(filename)[1].lower() in SQLITE_EXTENSIONS
+
+
+class ConnectionPool:
+    """Connections to one database for threads. A connection is used by one thread at a time"""
+
+    def __init__(self, filename, size=POOL_SIZE):
+        self.filename = filename
+        self.connections = queue.LifoQueue()
+        for _ in range(size):
+            self.connections.put(None)  # opened on first use
+
+    def open(self):
+        connection = sqlite3.connect(self.filename, check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        connection = self.connections.get()
+        try:
+            if connection is None:
+                connection = self.open()
+            yield connection
+        finally:
+            self.connections.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                connection = self.connections.get_nowait()
+            except queue.Empty:
+                return
+            if connection is not None:
+                connection.close()
+
+
+class SqliteTable:
+    """Queries shared by the tables. The key is the first column"""
+
+    columns = []
+    types = []
+
+    def __init__(self, filename, pool_size=POOL_SIZE):
+        self.filename = filename
+        self.pool = ConnectionPool(filename, pool_size)
+        self.key = self.columns[0]
+        self.loaded = True
+        self.hasChanges = False
+
+        with self.pool.connection() as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS %s (%s)" % (
+                SQLITE_TABLE, ", ".join('"%s" %s' % pair for pair in zip(self.columns, self.types))))
+            connection.execute('CREATE UNIQUE INDEX IF NOT EXISTS %s_key ON %s ("%s")' % (
+                SQLITE_TABLE, SQLITE_TABLE, self.key))
+
+    def select(self, key):
+        """Returns the row with the key as a dictionary, None if there is no such row"""
+
+        with self.pool.connection() as connection:
+            row = connection.execute('SELECT %s FROM %s WHERE "%s" = ?' % (
+                ", ".join('"%s"' % column for column in self.columns), SQLITE_TABLE, self.key), (key,)).fetchone()
+        return dict(zip(self.columns, row)) if row is not None else None
+
+    def insert_many(self, rows):
+        """Adds rows in one transaction, rows with existing keys are skipped. Returns number of added rows"""
+
+        with self.pool.connection() as connection, connection:
+            before = connection.total_changes
+            connection.executemany("INSERT OR IGNORE INTO %s VALUES (%s)" % (
+                SQLITE_TABLE, ", ".join("?" * len(self.columns))), rows)
+            return connection.total_changes - before
+
+    def update(self, key, values):
+        """Sets columns of the row from the dictionary"""
+
+        unknown = [column for column in values if column not in self.columns[1:]]
+        if unknown:
+            raise ValueError("Unknown columns: " + ", ".join(unknown))
+
+        with self.pool.connection() as connection, connection:
+            cursor = connection.execute('UPDATE %s SET %s WHERE "%s" = ?' % (
+                SQLITE_TABLE, ", ".join('"%s" = ?' % column for column in values), self.key),
+                (*values.values(), key))
+            return cursor.rowcount > 0
+
+    def count(self):
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM %s" % SQLITE_TABLE).fetchone()[0]
+
+    def sync(self):
+        """Every query reads the database, changes of others are always seen"""
+
+        return False
+
+    def save_to_csv(self):
+        """Changes are committed already. Moves them from the WAL file into the database"""
+
+        with self.pool.connection() as connection:
+            connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return True
+
+    def prepare_save(self):
+        return self.save_to_csv
+
+    def compact(self):
+        return self.save_to_csv()
+
+    def close(self):
+        self.pool.close()
+
+
+class SqliteFood(SqliteTable):
+    """Food on SQLite with the methods of Food used by the server, Menu and the importer"""
+
+    columns = FOOD_COLUMNS
+    types = ["TEXT", "REAL", "REAL", "REAL", "REAL"]
+
+    check_nutrients = staticmethod(Food.check_nutrients)
+
+    def __init__(self, filename, pool_size=POOL_SIZE):
+        super().__init__(filename, pool_size)
+        self.currentProduct = None
+
+    def get_product(self, product):
+        """Finds product and makes it current. Returns [product] or None"""
+
+        row = self.select(product)
+        if row is None:
+            return None
+
+        self.currentProduct = row
+        return [row["product"]]
+
+    def get_product_nutrients(self, product):
+        """Returns proteins, fats, carbohydrates and calories of the product"""
+
+        if self.get_product(product) is None:
+            return None
+        return [self.currentProduct[column] for column in FOOD_COLUMNS[1:]]
+
+    def get_current_product_data(self):
+        return self.currentProduct
+
+    def add_new_to_object(self, product_name):
+        """Adds new product with zero default parameters"""
+
+        if not self.insert_many([(product_name, 0.0, 0.0, 0.0, 0.0)]):
+            return False
+
+        self.get_product(product_name)
+        return True
+
+    def add_many_to_object(self, products):
+        """Takes product names or [product, proteins, fats, carbohydrates, calories] rows.
+        Existing products are skipped"""
+
+        rows = []
+        for product in products:
+            if isinstance(product, str):
+                product = [product, 0, 0, 0, 0]
+            rows.append((product[0], *[float(value) for value in product[1:5]]))
+        return self.insert_many(rows)
+
+    def merge_products(self, products):
+        """Adds products from a DataFrame with the columns of Food, existing ones are skipped"""
+
+        rows = products[FOOD_COLUMNS].astype({column: float for column in FOOD_COLUMNS[1:]})
+        return self.insert_many(rows.itertuples(index=False, name=None))
+
+    def update_current_product_data(self, array_data):
+        values = dict(zip(FOOD_COLUMNS[1:], [float(value) for value in array_data]))
+        self.update(self.currentProduct["product"], values)
+        self.currentProduct.update(values)
+        return True
+
+    def update_key(self, old_key_data, new_key_data):
+        if self.select(new_key_data) is not None or self.select(old_key_data) is None:
+            return False
+
+        with self.pool.connection() as connection, connection:
+            connection.execute('UPDATE %s SET "product" = ? WHERE "product" = ?' % SQLITE_TABLE,
+                               (new_key_data, old_key_data))
+        return self.get_product(new_key_data) is not None
+
+    def delete_by_name(self, product):
+        with self.pool.connection() as connection, connection:
+            deleted = connection.execute('DELETE FROM %s WHERE "product" = ?' % SQLITE_TABLE, (product,)).rowcount
+        self.currentProduct = None
+        return deleted > 0
+
+
+class SqliteUsers(SqliteTable, UserAccount):
+    """Users on SQLite with the methods of Users used by the server.
+    The current user is a dictionary of columns instead of a one-row DataFrame"""
+
+    columns = USERS_COLUMNS
+    types = ["TEXT", "TEXT", "INTEGER", "INTEGER", "INTEGER", "INTEGER", "INTEGER", "INTEGER"]
+
+    check_parameters = staticmethod(Users.check_parameters)
+
+    def __init__(self, filename, hash_iterations=HASH_ITERATIONS, pool_size=POOL_SIZE):
+        super().__init__(filename, pool_size)
+        self.hashIterations = hash_iterations
+        self.passwordCache = PasswordCache()
+        self.targetCache = TargetCache()
+        self.currentUser = None
+        self.currentTargets = None
+
+    def find(self, user_name, add_user):
+        """Finds the user and makes it current. A missing user gives None,
+        or an empty dictionary if it is going to be added"""
+
+        self.currentTargets = None
+        self.currentUser = self.select(user_name) or {}
+        if not self.currentUser and not add_user:
+            return None
+        return self.currentUser
+
+    def add_new_to_object(self, user_name, password):
+        """Adds new user with zero parameters"""
+
+        self.insert_many([(user_name, hash_password(password, self.hashIterations), 0, 0, 0, 0, 0, 0)])
+        return self.find(user_name, True)
+
+    def add_many_to_object(self, users):
+        """Adds users with zero parameters in one transaction. Takes (user name, password) pairs.
+        Existing users are skipped"""
+
+        return self.insert_many((user_name, hash_password(password, self.hashIterations), 0, 0, 0, 0, 0, 0)
+                                for user_name, password in users)
+
+    def get_current_user(self):
+        return self.currentUser or None
+
+    def get_current_user_data(self):
+        return self.currentUser or None
+
+    def set_current_user_data(self, col_index, int_value):
+        value = int_value if col_index == "password" else int(int_value)
+        self.update(self.currentUser["userName"], {col_index: value})
+        self.currentUser[col_index] = value
+        self.currentTargets = None
+
+    def get_current_user_parameters(self):
+        """Returns (sex, age, w, h, activity, goal) of the current user"""
+
+        return tuple(int(self.currentUser[column]) for column in PARAMETERS)
+
+    def is_unfilled_parameters(self):
+        return bool(self.currentUser) and self.currentUser["age"] == 0
+
+    def is_real_parameters(self):
+        if not self.currentUser:
+            return False
+        return self.check_parameters(self.currentUser["age"], self.currentUser["w"], self.currentUser["h"]) is None
@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from schema import FOOD_SCHEMA, USERS_SCHEMA, apply_schema
+
+CHUNK_ROWS = 100000
+SQLITE_TABLE = "data"
+
+
+def fsync_file(filename):
+    with open(filename, "rb+") as file:
+        os.fsync(file.fileno())
+
+
+def fsync_directory(directory):
+    """Makes a rename in the directory durable. Windows can't open a directory, NTFS journals renames itself"""
+
+    if os.name == "nt":
+        return
+    descriptor = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def replace_file(write, filename):
+    """Writes into a temporary file first, so a failed save doesn't break the old file
+    and memory-mapped columns of the old file stay readable.
+    The data and the rename are on disk when it returns, so the journal may be cleared after it"""
+
+    temp_filename = filename + ".tmp"
+    write(temp_filename)
+    fsync_file(temp_filename)
+    os.replace(temp_filename, filename)
+    fsync_directory(os.path.dirname(filename))
+
+
+def save_array(values, filename):
+    with open(filename, "wb") as file:
+        np.save(file, values)
+
+
+def save_json(data, filename):
+    with open(filename, "w") as file:
+        json.dump(data, file)
+
+
+class CsvStorage:
+    """Text file. Columns of given types are parsed straight into them"""
+
+    def load(self, filename, dtypes=None):
+        return pd.read_csv(filename, index_col=False, dtype=dtypes)
+
+    def load_chunks(self, filename, dtypes=None, chunk_rows=CHUNK_ROWS):
+        """Reads the file by parts, so they can be converted before the next one is read"""
+
+        return pd.read_csv(filename, index_col=False, dtype=dtypes, chunksize=chunk_rows)
+
+    def save(self, df, filename):
+        replace_file(lambda path: df.to_csv(path, index=False), filename)
+
+
+class ParquetStorage:
+    """Columnar binary file. Needs pyarrow"""
+
+    def load(self, filename, dtypes=None):
+        return pd.read_parquet(filename)
+
+    def save(self, df, filename):
+        replace_file(lambda path: df.to_parquet(path, index=False), filename)
+
+
+class FeatherStorage:
+    """Columnar binary file. Needs pyarrow"""
+
+    def load(self, filename, dtypes=None):
+        return pd.read_feather(filename)
+
+    def save(self, df, filename):
+        replace_file(lambda path: df.reset_index(drop=True).to_feather(path), filename)
+
+
+class MmapStorage:
+    """Directory with one .npy file per column. Numeric columns are memory-mapped
+    copy-on-write, so loading doesn't read them and edits don't touch the files until save.
+    Every save writes the columns into new files of the next generation, and columns.json,
+    written last, switches to them at once. Files of the previous generation are kept,
+    as other instances may still map them"""
+
+    def read_columns(self, filename):
+        """Returns the generation and the columns of the directory.
+        Directories saved before generations have a list of columns and generation None"""
+
+        with open(os.path.join(filename, "columns.json")) as file:
+            header = json.load(file)
+        if isinstance(header, list):
+            return None, header
+        return header["generation"], header["columns"]
+
+    @staticmethod
+    def column_path(filename, column, generation):
+        if generation is None:
+            return os.path.join(filename, column + ".npy")
+        return os.path.join(filename, "%s.%d.npy" % (column, generation))
+
+    def load(self, filename, dtypes=None):
+        generation, columns = self.read_columns(filename)
+
+        data = {}
+        for column, numeric in columns:
+            path = self.column_path(filename, column, generation)
+            if numeric:
+                data[column] = np.load(path, mmap_mode="c")
+            else:
+                data[column] = pd.Series(np.load(path)).astype((dtypes or {}).get(column, object))
+        return pd.DataFrame(data, copy=False)
+
+    def save(self, df, filename):
+        os.makedirs(filename, exist_ok=True)
+        generation = 1
+        if os.path.exists(os.path.join(filename, "columns.json")):
+            generation = (self.read_columns(filename)[0] or 0) + 1
+
+        columns = []
+        for column in df.columns:
+            numeric = pd.api.types.is_numeric_dtype(df[column])
+            if numeric:
+                values = df[column].to_numpy()
+            else:
+                values = df[column].astype(str).to_numpy(dtype=str)
+
+            path = self.column_path(filename, column, generation)
+            save_array(values, path)
+            fsync_file(path)
+            columns.append([column, numeric])
+
+        # Until columns.json is replaced, the directory is the old table whatever happens to the new files
+        fsync_directory(filename)
+        replace_file(lambda path: save_json({"generation": generation, "columns": columns}, path),
+                     os.path.join(filename, "columns.json"))
+        self.remove_old(filename, generation)
+
+    def remove_old(self, filename, generation):
+        """Removes column files older than the previous generation"""
+
+        for name in os.listdir(filename):
+            if not name.endswith(".npy"):
+                continue
+            parts = name[:-len(".npy")].rsplit(".", 1)
+            old = parts[1].isdigit() and int(parts[1]) < generation - 1 if len(parts) == 2 else generation > 1
+            if old:
+                try:
+                    os.remove(os.path.join(filename, name))
+                except OSError:
+                    # Windows doesn't remove a mapped file, it goes with a later save
+                    pass
+
+
+def write_sqlite(df, filename):
+    """Writes the table into "data" of a new database. The first column is the key:
+    it gets a unique index, and only the first row of a repeated key is kept, as tables find it"""
+
+    df = df.drop_duplicates(df.columns[0])
+    df = df.astype({column: df[column].cat.categories.dtype for column in df.columns
+                    if isinstance(df[column].dtype, pd.CategoricalDtype)})
+    if os.path.exists(filename):
+        os.remove(filename)
+    with closing(sqlite3.connect(filename)) as connection:
+        df.to_sql(SQLITE_TABLE, connection, index=False)
+        connection.execute('CREATE UNIQUE INDEX %s_key ON %s ("%s")' % (SQLITE_TABLE, SQLITE_TABLE, df.columns[0]))
+        connection.commit()
+
+
+class SqliteStorage:
+    """SQLite database with the table in "data". Loads it whole like other formats,
+    sqlite_tables.py works on the database without loading it"""
+
+    def load(self, filename, dtypes=None):
+        with closing(sqlite3.connect(filename)) as connection:
+            return pd.read_sql_query("SELECT * FROM %s ORDER BY rowid" % SQLITE_TABLE, connection, dtype=dtypes)
+
+    def save(self, df, filename):
+        replace_file(lambda path: write_sqlite(df, path), filename)
+
+
+STORAGES = {
+    "csv": CsvStorage,
+    "parquet": ParquetStorage,
+    "feather": FeatherStorage,
+    "mmap": MmapStorage,
+    "db": SqliteStorage,
+    "sqlite": SqliteStorage}
+
+
+def get_storage(filename, storage_format=None):
+    """Chooses storage by the flag or, if there is no flag, by the file extension"""
+
+    if storage_format is None:
+        storage_format = os.path.splitext(filename)[1].lstrip(".").lower()
+
+    if storage_format not in STORAGES:
+        raise ValueError("Unknown storage format: " + storage_format)
+    return STORAGES[storage_format]()
+
+
+def convert(source, destination):
+    """Converts a table between formats, e.g. imports Food.csv into Food.parquet.
+    Food and Users are written with the types of their schema, so they are loaded without conversion
+    and numeric columns of mmap stay memory-mapped"""
+
+    df = get_storage(source).load(source)
+    for schema in (FOOD_SCHEMA, USERS_SCHEMA):
+        if list(df.columns) == list(schema):
+            df = apply_schema(df, schema)
+    get_storage(destination).save(df, destination)
+    return len(df)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python storage.py <source> <destination>")
+        sys.exit(1)
+
+    print("Converted %d rows" % convert(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,947 @@
+import pandas as pd
+
+from calculator import PARAMETERS, TargetCache
+from journal import Journal
+from metrics import increment, timed
+from passwords import HASH_ITERATIONS, PasswordCache, hash_password, needs_rehash, verify_password
+from recipes import Recipes, recipes_filename
+from schema import FOOD_SCHEMA, USERS_SCHEMA, cast_like, exact_float, fit_value, fits_float32, load_table
+from search import ProductSearch
+from storage import get_storage
+from undo import UndoStack
+
+ROW_CHANGES = ("add", "add_many", "delete", "delete_many")  # changes adding or removing rows
+
+
+class Food:
+
+    def __init__(self, filename, storage_format=None):
+        self.filename = filename
+        self.storage = get_storage(filename, storage_format)
+        self.journal = Journal(filename)
+        self.recipes = Recipes(recipes_filename(filename))
+        self.undoStack = UndoStack()
+        self.loaded = False
+        self.hasChanges = False
+        self.currentProductIndex = None
+        self.productIndex = {}
+        self.newRows = []
+        self.search = None
+        self.lastSync = None  # what the last sync has changed, see sync
+
+        self.df = pd.DataFrame(data=[], columns=["product", "proteins", "fats", "carbohydrates", "calories"])
+        self.load()
+
+    @timed("Food.load")
+    def load(self):
+        """Loads products from file in object. Loads again if another instance replaced the file meanwhile"""
+
+        while True:
+            base = self.journal.base_signature()
+            self.df = load_table(self.storage, self.filename, FOOD_SCHEMA)
+            self.recipes.load()
+            self.search = None
+            self.build_index()
+            if self.journal.replay(self.apply_change, base) is not None:
+                break
+        self.currentProductIndex = None
+        self.loaded = True
+        self.hasChanges = False
+
+    def sync(self):
+        """Applies changes saved by other instances since the last read. Changes of this instance
+        after the last read are undone first, so every change applies to the table it was made on,
+        in the order of the journal. Changes which are not saved yet are applied again after them,
+        as they will follow them in the journal. Returns True if the table has changed.
+        lastSync tells whether the table was loaded again, whether rows were added or deleted
+        and which products were changed, so a view updates only them"""
+
+        if not self.loaded:
+            return False
+
+        # A save writing in another thread changes the offset and the undo of the journal
+        with self.journal.stateLock:
+            changes = self.journal.read_new()
+            if changes == []:
+                return False
+
+            has_changes = self.hasChanges
+            rows = len(self.df)
+            if changes is None:
+                self.load()  # another instance has rewritten the file
+                applied = []
+            else:
+                rollback = self.merge_deletes(self.journal.rollback_changes())
+                self.journal.replay_changes(rollback, self.apply_change)
+                self.journal.replay_changes(changes, self.apply_change)
+                applied = rollback + changes
+            applied += self.journal.local_changes()
+            self.journal.replay_local(self.apply_change)
+            self.currentProductIndex = None
+            self.hasChanges = has_changes
+            self.lastSync = {
+                "reloaded": changes is None,
+                "rows": len(self.df) != rows or any(change[0] in ROW_CHANGES for change in applied),
+                "products": self.changed_products(applied)}
+            return True
+
+    @staticmethod
+    def changed_products(changes):
+        """Returns names of the products the changes are about, old and new names of renamed ones"""
+
+        products = set()
+        for change in changes:
+            if change[0] == "add_many":
+                products.update(change[1][0])
+            elif change[0] == "delete_many":
+                products.update(change[1])
+            elif change[0] == "rename":
+                products.update(change[1:3])
+            else:
+                products.add(change[1])
+        return products
+
+    def build_index(self):
+        """Builds product name -> row dictionary, so lookups don't scan the whole table"""
+
+        # Built from the end, so the first row of a repeated name wins
+        products = self.df["product"].tolist()
+        self.productIndex = dict(zip(reversed(products), range(len(products) - 1, -1, -1)))
+
+    def find_products(self, query, count=10):
+        """Returns names of products matching the query, best first.
+        The search index is built on the first search and then kept up to date"""
+
+        if self.search is None:
+            self.search = ProductSearch(self.productIndex)
+        return self.search.find(query, count)
+
+    @property
+    def df(self):
+        if self.newRows:
+            self.merge_new_rows()
+        return self.dataFrame
+
+    @df.setter
+    def df(self, value):
+        self.newRows = []
+        self.dataFrame = value
+
+    def merge_new_rows(self):
+        """Appends rows added since the last read to the table with one concat"""
+
+        new_rows = cast_like(pd.DataFrame(self.newRows, columns=self.dataFrame.columns), self.dataFrame)
+        self.newRows = []
+        self.dataFrame = pd.concat([self.dataFrame, new_rows], ignore_index=True)
+
+    def get_data_from_object(self):
+        return self.df
+
+    def update_key(self, old_key_data, new_key_data):
+        """Updates key of the current selected product"""
+
+        new = self.get_product(new_key_data)
+        if new is not None:
+            return False
+
+        old = self.get_product(old_key_data)
+        if old is None:
+            return False
+
+        self.df.iloc[self.currentProductIndex, 0] = new_key_data
+        self.productIndex[new_key_data] = self.productIndex.pop(old_key_data)
+        self.recipes.rename(old_key_data, new_key_data)
+        if self.search is not None:
+            self.search.rename(old_key_data, new_key_data)
+        undo_changes = [["rename", new_key_data, old_key_data]]
+        self.journal.record("rename", old_key_data, new_key_data, undo=undo_changes)
+        self.push_undo(undo_changes, [["rename", old_key_data, new_key_data]])
+        self.hasChanges = True
+        return True
+
+    @timed("Food.save_to_csv")
+    def save_to_csv(self):
+        """Appends changes to the journal. Rewrites the whole file only when the journal is long"""
+
+        save = self.prepare_save()
+        if save is not None:
+            save()
+
+    def prepare_save(self):
+        """Takes a snapshot of what has to be saved and returns function writing it.
+        The function may run in another thread while the table is being edited"""
+
+        if not (self.loaded and self.hasChanges):
+            return None
+
+        # A save still writing must not move the position between sync and the snapshot
+        with self.journal.stateLock:
+            self.sync()
+            self.hasChanges = False
+            changes = self.journal.take_pending()
+            compaction = self.journal.needs_compaction(len(changes))
+            if compaction:
+                snapshot = self.df.copy()
+                recipes = self.recipes.get_rows()
+                position = self.journal.position()
+        if compaction:
+            write = lambda: self.journal.compact(lambda: self.write_base(snapshot, recipes), changes, *position)
+        else:
+            write = lambda: self.journal.write(changes)
+
+        @timed("Food.save")
+        def save():
+            try:
+                write()
+            except Exception:
+                self.journal.restore_pending(changes)
+                self.hasChanges = True
+                raise
+        return save
+
+    def compact(self):
+        """Writes the whole table into the file and empties the journal.
+        Only appends the changes if another instance has saved meanwhile"""
+
+        with self.journal.stateLock:
+            self.sync()
+            changes = self.journal.take_pending()
+            recipes = self.recipes.get_rows()
+            return self.journal.compact(lambda: self.write_base(self.df, recipes), changes, *self.journal.position())
+
+    @timed("Food.write_base")
+    def write_base(self, df, recipes):
+        # Recipes go first, the new base file tells other instances to load both again
+        self.recipes.save(recipes)
+        # save returns once the file and its rename are on disk, only then the journal may go
+        self.storage.save(df, self.filename)
+        self.journal.clear()
+
+    def apply_change(self, change):
+        """Repeats the change read from the journal"""
+
+        # A product added by two instances gets the values of the later add
+        if change[0] == "add":
+            if self.get_product(change[1]) is None:
+                self.__add__(change[1], change[2:6])
+            else:
+                self.update_current_product_data(change[2:6])
+        elif change[0] == "add_many":
+            products = pd.DataFrame(dict(zip(self.dataFrame.columns, change[1])))
+            existing = [product in self.productIndex for product in products["product"].tolist()]
+            for product, *nutrients in products[existing].values.tolist():
+                self.get_product(product)
+                self.update_current_product_data(nutrients)
+            self.merge_products(products)
+        elif change[0] == "set":
+            if self.get_product(change[1]) is not None:
+                self.update_current_product_data(change[2])
+        elif change[0] == "rename":
+            self.update_key(change[1], change[2])
+        elif change[0] == "delete":
+            self.delete_by_name(change[1])
+        elif change[0] == "delete_many":
+            self.delete_many(change[1])
+        elif change[0] == "recipe":
+            if change[2]:
+                self.set_recipe(change[1], change[2])
+            else:
+                self.remove_recipe(change[1])
+
+    @timed("Food.get_product")
+    def get_product(self, product):
+        """Finds product and returns its index"""
+
+        row = self.productIndex.get(product)
+        if row is None:
+            increment("Food.get_product not found")
+            return None
+
+        self.currentProductIndex = [row]
+        return self.currentProductIndex
+
+    def __add__(self, product, nutrients=(0, 0, 0, 0)):
+        self.newRows.append([product, *nutrients])
+        self.journal.record("add", product, *nutrients, undo=[["delete", product]])
+        self.productIndex[product] = len(self.dataFrame) + len(self.newRows) - 1
+        if self.search is not None:
+            self.search.add(product)
+        self.hasChanges = True
+        return True
+
+    def add_new_to_object(self, product_name):
+        """Adds new product with zero default parameters"""
+
+        product = self.get_product(product_name)
+        if product is not None:
+            return False
+
+        self.__add__(product_name)
+        self.currentProductIndex = [self.productIndex[product_name]]
+        self.push_undo([["delete", product_name]], [["add", product_name, 0, 0, 0, 0]])
+        return True
+
+    def add_many_to_object(self, products):
+        """Adds many products at once. Takes product names or
+        [product, proteins, fats, carbohydrates, calories] rows. Existing products are skipped"""
+
+        added = 0
+        for product in products:
+            if isinstance(product, str):
+                product = [product, 0, 0, 0, 0]
+            if product[0] in self.productIndex:
+                continue
+
+            self.__add__(product[0], product[1:5])
+            added += 1
+        return added
+
+    def merge_products(self, products):
+        """Adds products from a table with the same columns in one concat.
+        Existing products are skipped. Returns number of added products"""
+
+        products = products[[product not in self.productIndex for product in products["product"].tolist()]]
+        products = products.drop_duplicates("product")
+        if products.empty:
+            return 0
+
+        start = len(self.df)
+        self.df = pd.concat([self.df, cast_like(products[self.df.columns], self.df)], ignore_index=True)
+        names = products["product"].tolist()
+        self.productIndex.update(zip(names, range(start, start + len(names))))
+        if self.search is not None:
+            for product in names:
+                self.search.add(product)
+
+        # Columns are recorded as lists, it is much cheaper than a list per row
+        self.journal.record("add_many", [products[column].tolist() for column in self.df.columns],
+                            undo=[["delete_many", names]])
+        self.hasChanges = True
+        return len(names)
+
+    def delete_by_name(self, product):
+        row = self.productIndex.get(product)
+        if row is None:
+            return False
+
+        # Undo adds the product again, with its recipe and in the recipes which lose it
+        undo_changes = [["add", product, *self.get_products_nutrients([product])[0]]]
+        if self.recipes.is_recipe(product):
+            undo_changes.append(["recipe", product, self.get_recipe(product)])
+        undo_changes += [["recipe", recipe, self.get_recipe(recipe)]
+                         for recipe in sorted(self.recipes.usedIn.get(product, ()))]
+        self.push_undo(undo_changes, [["delete", product]])
+
+        # Rows are renumbered, so the index positions stay equal to the row labels
+        self.df = self.df.drop(self.df.index[row]).reset_index(drop=True)
+        self.build_index()
+        if self.search is not None:
+            self.search.remove(product)
+        self.journal.record("delete", product, undo=undo_changes)
+        self.refresh_recipes(self.recipes.remove_product(product), include_changed=True)
+        self.currentProductIndex = None
+        self.hasChanges = True
+        return True
+
+    def delete_many(self, products):
+        """Deletes the products with one renumbering of the rows. Returns number of deleted products"""
+
+        products = [product for product in dict.fromkeys(products) if product in self.productIndex]
+        if not products:
+            return 0
+
+        # Undo adds the products again, then their recipes and the recipes which lose them
+        deleted = set(products)
+        undo_changes = [["add", product, *nutrients]
+                        for product, nutrients in zip(products, self.get_products_nutrients(products))]
+        recipes = {recipe for product in products for recipe in self.recipes.usedIn.get(product, ())}
+        recipes.update(product for product in products if self.recipes.is_recipe(product))
+        undo_changes += [["recipe", recipe, self.get_recipe(recipe)] for recipe in sorted(recipes)]
+
+        rows = [self.productIndex[product] for product in products]
+        self.df = self.df.drop(self.df.index[rows]).reset_index(drop=True)
+        self.build_index()
+        if self.search is not None:
+            for product in products:
+                self.search.remove(product)
+        self.journal.record("delete_many", products, undo=undo_changes)
+        changed = set()
+        for product in products:
+            changed.update(self.recipes.remove_product(product))
+        self.refresh_recipes(sorted(changed - deleted), include_changed=True)
+        self.currentProductIndex = None
+        self.hasChanges = True
+        return len(products)
+
+    @staticmethod
+    def merge_deletes(changes):
+        """Joins deletes following each other into one, every delete renumbers all rows"""
+
+        merged = []
+        for change in changes:
+            if change[0] not in ("delete", "delete_many"):
+                merged.append(change)
+                continue
+
+            products = [change[1]] if change[0] == "delete" else list(change[1])
+            if merged and merged[-1][0] == "delete_many":
+                merged[-1][1] += products
+            else:
+                merged.append(["delete_many", products])
+        return merged
+
+    def get_current_product_data(self):
+        if self.currentProductIndex is not None:
+            return self.df.iloc[self.currentProductIndex, :]
+
+    def get_product_nutrients(self, product):
+        """Returns proteins, fats, carbohydrates and calories of the product"""
+
+        if self.get_product(product) is None:
+            return None
+        return self.get_row_data(self.currentProductIndex[0])[1:5]
+
+    def get_row_data(self, row):
+        """Returns [product, proteins, fats, carbohydrates, calories] of the row as they were written"""
+
+        product, *nutrients = self.df.iloc[row, 0:5].tolist()
+        return [product] + [exact_float(value) for value in nutrients]
+
+    @staticmethod
+    def check_nutrients(proteins, fats, carbohydrates):
+        """Returns error text if nutrients are not real, otherwise None"""
+
+        if proteins < 0:
+            return "Proteins cannot be negative!"
+        if fats < 0:
+            return "Fats cannot be negative!"
+        if carbohydrates < 0:
+            return "Carbohydrates cannot be negative!"
+        return None
+
+    def update_current_product_data(self, array_data):
+        """Sets nutrients of the current product and recalculates dishes including it.
+        Nutrients of a dish come from its ingredients, so they are not set"""
+
+        row = self.currentProductIndex[0]
+        product = self.df.iat[row, 0]
+        if self.recipes.is_recipe(product):
+            return False
+
+        old_nutrients = self.get_products_nutrients([product])[0]
+        self.push_undo([["set", product, old_nutrients]], [["set", product, list(array_data)]])
+        self.journal.record("set", product, list(array_data), undo=[["set", product, old_nutrients]])
+        self.set_row_nutrients(row, array_data)
+        self.refresh_recipes([product])
+        self.hasChanges = True
+        return True
+
+    def set_row_nutrients(self, row, array_data):
+        columns = ["proteins", "fats", "carbohydrates", "calories"]
+        # One check of all values is much cheaper than a check of every column
+        if not fits_float32(array_data):
+            for column, value in zip(columns, array_data):
+                fit_value(self.df, column, value)
+        for column, value in zip(columns, array_data):
+            self.df.iat[row, self.df.columns.get_loc(column)] = value
+
+    def is_recipe(self, product):
+        return self.recipes.is_recipe(product)
+
+    def get_recipe(self, recipe):
+        """Returns [[ingredient, grams], ...] of the dish, None if the product is not a dish"""
+
+        ingredients = self.recipes.get(recipe)
+        return [list(item) for item in ingredients] if ingredients is not None else None
+
+    def check_recipe(self, recipe, ingredients):
+        """Returns error text if the dish can't be made of the ingredients, otherwise None"""
+
+        return self.recipes.check(recipe, ingredients, lambda product: product in self.productIndex)
+
+    def set_recipe(self, recipe, ingredients):
+        """Makes the product a dish of [[ingredient, grams], ...] and calculates its nutrients per 100 g.
+        A missing product is added. Returns False if the recipe is not right"""
+
+        ingredients = [[ingredient, float(grams)] for ingredient, grams in ingredients]
+        if self.check_recipe(recipe, ingredients) is not None:
+            return False
+
+        if recipe not in self.productIndex:
+            undo_changes = [["delete", recipe]]
+        elif self.recipes.is_recipe(recipe):
+            undo_changes = [["recipe", recipe, self.get_recipe(recipe)]]
+        else:
+            undo_changes = [["recipe", recipe, []], ["set", recipe, self.get_products_nutrients([recipe])[0]]]
+
+        self.recipes.set(recipe, ingredients)
+        self.push_undo(undo_changes, [["recipe", recipe, self.get_recipe(recipe)]])
+        if recipe in self.productIndex:
+            self.journal.record("recipe", recipe, self.get_recipe(recipe), undo=undo_changes)
+            self.refresh_recipes([recipe], include_changed=True)
+        else:
+            # Nothing depends on a new dish, it is added with its values
+            self.__add__(recipe, self.recipes.rollup(recipe, self.get_products_nutrients))
+            self.journal.record("recipe", recipe, self.get_recipe(recipe), undo=[["recipe", recipe, []]])
+        self.get_product(recipe)
+        self.hasChanges = True
+        return True
+
+    def remove_recipe(self, recipe):
+        """Makes the dish a plain product with the nutrients it has now"""
+
+        if not self.recipes.is_recipe(recipe):
+            return False
+
+        undo_changes = [["recipe", recipe, self.get_recipe(recipe)]]
+        self.push_undo(undo_changes, [["recipe", recipe, []]])
+        self.recipes.remove(recipe)
+        self.journal.record("recipe", recipe, [], undo=undo_changes)
+        self.hasChanges = True
+        return True
+
+    def push_undo(self, undo_changes, redo_changes):
+        """Remembers the edit for undo. Changes repeated from the journal are not edits of this instance"""
+
+        if not self.journal.replaying:
+            self.undoStack.push(undo_changes, redo_changes)
+
+    def undo(self):
+        """Undoes the last edit of this instance, the undo is saved as a usual edit.
+        Returns False if there is nothing to undo"""
+
+        return self.undoStack.undo(self.apply_change)
+
+    def redo(self):
+        """Repeats the last undone edit. Returns False if there is nothing to redo"""
+
+        return self.undoStack.redo(self.apply_change)
+
+    def refresh_recipes(self, products, include_changed=False):
+        """Recalculates nutrients of dishes depending on the products, only along their dependency paths.
+        With include_changed the products are dishes to recalculate too. Returns the recalculated dishes.
+        Values of dishes are not journaled, replaying the change of an ingredient calculates them again"""
+
+        recipes = self.recipes.dependents(products, include_changed)
+
+        # All values are calculated before writing, a write into the table makes the next read slow
+        values = {}
+
+        def get_nutrients(ingredients):
+            return [values[ingredient] if ingredient in values else nutrients
+                    for ingredient, nutrients in zip(ingredients, self.get_products_nutrients(ingredients))]
+
+        for recipe in recipes:
+            values[recipe] = self.recipes.rollup(recipe, get_nutrients)
+        for recipe, nutrients in values.items():
+            row = self.productIndex.get(recipe)
+            if row is not None:
+                self.set_row_nutrients(row, nutrients)
+        return recipes
+
+    def get_products_nutrients(self, products):
+        """Returns nutrients of the products as they were written, None for a missing product.
+        Reads columns as arrays and rows added since the last read from the list, so nothing is copied"""
+
+        start = len(self.dataFrame)
+        columns = [self.dataFrame[column].to_numpy() for column in ["proteins", "fats", "carbohydrates", "calories"]]
+        result = []
+        for product in products:
+            row = self.productIndex.get(product)
+            if row is None:
+                result.append(None)
+            elif row < start:
+                result.append([exact_float(values[row]) for values in columns])
+            else:
+                result.append([float(value) for value in self.newRows[row - start][1:5]])
+        return result
+
+
+class UserAccount:
+    """Password checks and daily targets of the current user, the same for Users and SqliteUsers.
+    The table gives hashIterations, passwordCache, targetCache, currentTargets,
+    get_current_user_data, set_current_user_data and get_current_user_parameters"""
+
+    def check_password(self, password):
+        """Checks password of the current user. Recent logins are checked by the cache,
+        plain text passwords and hashes of another cost are rehashed on success"""
+
+        user = self.get_current_user_data()
+        user_name = user["userName"]
+        stored = user["password"]
+        if not self.verify_user_password(user_name, stored, password):
+            return False
+
+        if needs_rehash(stored, self.hashIterations):
+            stored = hash_password(password, self.hashIterations)
+            self.set_current_user_data("password", stored)
+            self.passwordCache.add(user_name, stored, password)
+        return True
+
+    def verify_user_password(self, user_name, stored, password):
+        """Checks password against the stored one. Doesn't touch the table, so it may run without lock"""
+
+        if self.passwordCache.check(user_name, stored, password):
+            return True
+        if not verify_password(password, stored):
+            return False
+
+        self.passwordCache.add(user_name, stored, password)
+        return True
+
+    def get_current_user_targets(self):
+        """Returns daily targets of the current user. They are kept until the user or
+        the parameters change, users with the same parameters share them in targetCache"""
+
+        if self.currentTargets is None:
+            self.currentTargets = self.targetCache.get(self.get_current_user_parameters())
+        return self.currentTargets
+
+
+class Users(UserAccount):
+
+    def __init__(self, filename, storage_format=None, hash_iterations=HASH_ITERATIONS):
+        self.filename = filename
+        self.storage = get_storage(filename, storage_format)
+        self.journal = Journal(filename)
+        self.hashIterations = hash_iterations
+        self.passwordCache = PasswordCache()
+        self.targetCache = TargetCache()
+        self.currentTargets = None
+        self.loaded = False
+        self.hasChanges = False
+        self.currentUser = None
+        self.userIndex = {}
+        self.newRows = []
+
+        self.df = pd.DataFrame(data=[], columns=["userName", "password", "sex", "age", "w", "h", "activity", "goal"])
+        self.load()
+
+    @timed("Users.load")
+    def load(self):
+        """Loads users from file into virtual object. Loads again if another instance replaced the file meanwhile"""
+
+        while True:
+            base = self.journal.base_signature()
+            self.df = load_table(self.storage, self.filename, USERS_SCHEMA)
+            self.build_index()
+            if self.journal.replay(self.apply_change, base) is not None:
+                break
+        self.currentUser = None
+        self.currentTargets = None
+        self.loaded = True
+        self.hasChanges = False
+
+    def sync(self):
+        """Applies changes saved by other instances, as Food.sync does. The current user stays selected"""
+
+        if not self.loaded:
+            return False
+
+        with self.journal.stateLock:
+            changes = self.journal.read_new()
+            if changes == []:
+                return False
+
+            current_user = self.get_current_user()
+            has_changes = self.hasChanges
+            if changes is None:
+                self.load()  # another instance has rewritten the file
+            else:
+                self.journal.replay_changes(changes, self.apply_change)
+            self.journal.replay_local(self.apply_change)
+            self.hasChanges = has_changes
+
+        self.currentUser = None
+        self.currentTargets = None
+        if current_user is not None:
+            self.find(current_user.iloc[0]["userName"], False)
+        return True
+
+    def build_index(self):
+        """Builds user name -> row dictionary, so login doesn't scan the whole table"""
+
+        # Built from the end, so the first row of a repeated name wins
+        user_names = self.df["userName"].tolist()
+        self.userIndex = dict(zip(reversed(user_names), range(len(user_names) - 1, -1, -1)))
+
+    @property
+    def df(self):
+        if self.newRows:
+            self.merge_new_rows()
+        return self.dataFrame
+
+    @df.setter
+    def df(self, value):
+        self.newRows = []
+        self.dataFrame = value
+
+    def merge_new_rows(self):
+        """Appends users added since the last read to the table with one concat"""
+
+        new_rows = cast_like(pd.DataFrame(self.newRows, columns=self.dataFrame.columns), self.dataFrame)
+        self.newRows = []
+        self.dataFrame = pd.concat([self.dataFrame, new_rows], ignore_index=True)
+
+    @timed("Users.save_to_csv")
+    def save_to_csv(self):
+        """Appends changes to the journal. Rewrites the whole file only when the journal is long"""
+
+        save = self.prepare_save()
+        if save is None:
+            return True
+        save()
+
+    def prepare_save(self):
+        """Takes a snapshot of what has to be saved and returns function writing it.
+        The function may run in another thread while the table is being edited"""
+
+        if not self.hasChanges:
+            return None
+
+        # A save still writing must not move the position between sync and the snapshot
+        with self.journal.stateLock:
+            self.sync()
+            self.hasChanges = False
+            changes = self.journal.take_pending()
+            compaction = self.journal.needs_compaction(len(changes))
+            if compaction:
+                snapshot = self.df.copy()
+                position = self.journal.position()
+        if compaction:
+            write = lambda: self.journal.compact(lambda: self.write_base(snapshot), changes, *position)
+        else:
+            write = lambda: self.journal.write(changes)
+
+        @timed("Users.save")
+        def save():
+            try:
+                write()
+            except Exception:
+                self.journal.restore_pending(changes)
+                self.hasChanges = True
+                raise
+        return save
+
+    def compact(self):
+        """Writes the whole table into the file and empties the journal.
+        Only appends the changes if another instance has saved meanwhile"""
+
+        with self.journal.stateLock:
+            self.sync()
+            changes = self.journal.take_pending()
+            return self.journal.compact(lambda: self.write_base(self.df), changes, *self.journal.position())
+
+    @timed("Users.write_base")
+    def write_base(self, df):
+        # save returns once the file and its rename are on disk, only then the journal may go
+        self.storage.save(df, self.filename)
+        self.journal.clear()
+
+    def apply_change(self, change):
+        """Repeats the change read from the journal"""
+
+        # A user registered by two instances gets the password of the later registration
+        if change[0] == "add":
+            if self.find(change[1], False) is None:
+                self.__add__(change[1], change[2])
+            else:
+                self.set_current_user_data("password", change[2])
+        elif change[0] == "set":
+            if self.find(change[1], False) is not None:
+                self.set_current_user_data(change[2], change[3])
+
+    def find(self, user_name, add_user):
+        """Finds the user in object"""
+
+        self.currentTargets = None
+        row = self.userIndex.get(user_name)
+        if row is None:
+            self.currentUser = self.df.iloc[[]]
+            if not add_user:
+                return None
+            return self.currentUser
+
+        self.currentUser = self.df.iloc[[row]]
+        return self.currentUser
+
+    def add_new_to_object(self, user_name, password):
+        """Adds new user with zero parameters"""
+
+        if user_name not in self.userIndex:
+            self.__add__(user_name, hash_password(password, self.hashIterations))
+
+        return self.find(user_name, True)
+
+    def __add__(self, user_name, password_hash):
+        self.newRows.append([user_name, password_hash, 0, 0, 0, 0, 0, 0])
+        self.userIndex[user_name] = len(self.dataFrame) + len(self.newRows) - 1
+        self.journal.record("add", user_name, password_hash)
+        self.hasChanges = True
+        return True
+
+    def add_many_to_object(self, users):
+        """Adds many users with zero parameters at once. Takes (user name, password) pairs.
+        Existing users are skipped"""
+
+        added = 0
+        for user_name, password in users:
+            if user_name in self.userIndex:
+                continue
+
+            self.__add__(user_name, hash_password(password, self.hashIterations))
+            added += 1
+        return added
+
+    def get_current_user(self):
+        if self.currentUser is None:
+            return None
+        if self.currentUser.empty:
+            return None
+        return self.currentUser
+
+    def get_current_user_data(self):
+        if self.currentUser.empty:
+            return None
+        return self.currentUser.iloc[0]
+
+    def set_current_user_data(self, col_index, int_value):
+        self.journal.record("set", self.currentUser.iloc[0]["userName"], col_index, int_value)
+        index = self.currentUser.index
+        self.df.loc[index, col_index] = int_value
+        self.currentUser = self.df.loc[index]
+        self.currentTargets = None
+        self.hasChanges = True
+
+    def get_current_user_parameters(self):
+        """Returns (sex, age, w, h, activity, goal) of the current user"""
+
+        user = self.currentUser.iloc[0]
+        return tuple(int(user[column]) for column in PARAMETERS)
+
+    def is_unfilled_parameters(self):
+        if self.currentUser.empty:
+            return False
+        if self.currentUser.iloc[0]["age"] == 0:
+            return True
+
+        return False
+
+    def is_real_parameters(self):
+        if self.currentUser.empty:
+            return False
+
+        age = self.currentUser.iloc[0]["age"]
+        height = self.currentUser.iloc[0]["h"]
+        weight = self.currentUser.iloc[0]["w"]
+
+        if not (6 < age < 120 and 60 < height < 250 and 20 < weight < 600):
+            return False
+
+        return True
+
+    @staticmethod
+    def check_parameters(age, weight, height):
+        """Returns error text if parameters are not real, otherwise None"""
+
+        if not 6 < age < 120:
+            return "The age is not real! \n (should be from 6 to 120)"
+        if not 60 < height < 250:
+            return "The height is not real! \n (should be from 60 to 250)"
+        if not 20 < weight < 600:
+            return "The weight is not real! \n (should be from 20 to 600)"
+        return None
+
+
+class Menu:
+    """User's menu per day. Keeps nutrients of every row and running totals,
+    so changing one row costs one product lookup instead of a full recompute"""
+
+    def __init__(self, food_table):
+        self.foodTable = food_table
+        self.rows = []  # [product, volume, [proteins, fats, carbohydrates, calories], row calories]
+        self.sum_cal = [0, 0, 0, 0]
+
+    def clear(self):
+        self.rows = []
+        self.sum_cal = [0, 0, 0, 0]
+
+    @staticmethod
+    def parse_volume(value):
+        """Volume in grams. Other values, infinite ones and ones too large for a float too, count as 0"""
+
+        try:
+            volume = int(value)
+            float(volume)
+            return volume
+        except (TypeError, ValueError, OverflowError):
+            return 0
+
+    def calculate_row(self, product, volume):
+        """Calculates what the row adds to the totals and calories shown in the row"""
+
+        nutrients = self.foodTable.get_product_nutrients(product)
+        if nutrients is None:
+            return [0, 0, 0, 0], None
+
+        coefficient = round(volume / 100, 6)
+        contribution = [int(coefficient * value) for value in nutrients]
+        calories = int(float(nutrients[3] / 100) * volume)
+        return contribution, calories
+
+    def apply_row(self, row, contribution, calories):
+        """Replaces contribution of the row in totals by the new one"""
+
+        old_contribution = self.rows[row][2]
+        for i in range(4):
+            self.sum_cal[i] += contribution[i] - old_contribution[i]
+
+        self.rows[row][2] = contribution
+        self.rows[row][3] = calories
+
+    def add_row(self, product, volume):
+        self.rows.append([product, self.parse_volume(volume), [0, 0, 0, 0], None])
+        row = len(self.rows) - 1
+        self.apply_row(row, *self.calculate_row(product, self.rows[row][1]))
+        return row
+
+    def set_volume(self, row, volume):
+        self.rows[row][1] = self.parse_volume(volume)
+        self.apply_row(row, *self.calculate_row(self.rows[row][0], self.rows[row][1]))
+
+    def remove_row(self, row):
+        self.apply_row(row, [0, 0, 0, 0], None)
+        del self.rows[row]
+
+    def refresh_product(self, product):
+        """Recalculates rows with changed product and returns their numbers"""
+
+        changed_rows = [row for row, data in enumerate(self.rows) if data[0] == product]
+        for row in changed_rows:
+            self.apply_row(row, *self.calculate_row(product, self.rows[row][1]))
+        return changed_rows
+
+    def remove_product(self, product):
+        """Removes rows of the deleted product with their part of the totals and returns their numbers"""
+
+        removed_rows = [row for row, data in enumerate(self.rows) if data[0] == product]
+        for row in reversed(removed_rows):
+            self.remove_row(row)
+        return removed_rows
+
+    def rename_product(self, old_product, new_product):
+        """Moves rows of the renamed product to the new name, recalculates them and returns their numbers"""
+
+        renamed_rows = [row for row, data in enumerate(self.rows) if data[0] == old_product]
+        for row in renamed_rows:
+            self.rows[row][0] = new_product
+            self.apply_row(row, *self.calculate_row(new_product, self.rows[row][1]))
+        return renamed_rows
+
+    def get_row_calories(self, row):
+        return self.rows[row][3]
+
+    def get_meals(self):
+        """Returns [product, volume, proteins, fats, carbohydrates, calories] rows for the meal history"""
+
+        return [[product, volume, *contribution] for product, volume, contribution, calories in self.rows]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'Login.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_DialogLogin(object):
+    def setupUi(self, DialogLogin):
+        DialogLogin.setObjectName("DialogLogin")
+        DialogLogin.resize(232, 153)
+        self.verticalLayout = QtWidgets.QVBoxLayout(DialogLogin)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.label = QtWidgets.QLabel(DialogLogin)
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(14)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.verticalLayout.addWidget(self.label)
+        self.LoginLine = QtWidgets.QLineEdit(DialogLogin)
+        self.LoginLine.setObjectName("LoginLine")
+        self.verticalLayout.addWidget(self.LoginLine)
+        self.label_2 = QtWidgets.QLabel(DialogLogin)
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(14)
+        self.label_2.setFont(font)
+        self.label_2.setObjectName("label_2")
+        self.verticalLayout.addWidget(self.label_2)
+        self.PasswordLine = QtWidgets.QLineEdit(DialogLogin)
+        self.PasswordLine.setObjectName("PasswordLine")
+        self.verticalLayout.addWidget(self.PasswordLine)
+        self.LoginButton = QtWidgets.QPushButton(DialogLogin)
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(14)
+        self.LoginButton.setFont(font)
+        self.LoginButton.setObjectName("LoginButton")
+        self.verticalLayout.addWidget(self.LoginButton)
+
+        self.retranslateUi(DialogLogin)
+        QtCore.QMetaObject.connectSlotsByName(DialogLogin)
+
+    def retranslateUi(self, DialogLogin):
+        _translate = QtCore.QCoreApplication.translate
+        DialogLogin.setWindowTitle(_translate("DialogLogin", "Login"))
+        self.label.setText(_translate("DialogLogin", "Login:"))
+        self.label_2.setText(_translate("DialogLogin", "Password:"))
+        self.LoginButton.setText(_translate("DialogLogin", "Login"))
+
+
+UI_FORM = Ui_DialogLogin
+UI_HASH = '6cf04fc060f4f545b26fdd9224de5a0303177522'
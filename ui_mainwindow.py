@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'MainWindow.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(664, 476)
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(12)
+        MainWindow.setFont(font)
+        MainWindow.setTabShape(QtWidgets.QTabWidget.Rounded)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.label = QtWidgets.QLabel(self.centralwidget)
+        self.label.setGeometry(QtCore.QRect(10, 0, 81, 31))
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(14)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.Username_Button = QtWidgets.QPushButton(self.centralwidget)
+        self.Username_Button.setGeometry(QtCore.QRect(100, 0, 161, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.Username_Button.setFont(font)
+        self.Username_Button.setText("")
+        self.Username_Button.setObjectName("Username_Button")
+        self.tabWidget = QtWidgets.QTabWidget(self.centralwidget)
+        self.tabWidget.setGeometry(QtCore.QRect(10, 50, 271, 371))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.tabWidget.setFont(font)
+        self.tabWidget.setAutoFillBackground(False)
+        self.tabWidget.setObjectName("tabWidget")
+        self.tab = QtWidgets.QWidget()
+        self.tab.setObjectName("tab")
+        self.label_6 = QtWidgets.QLabel(self.tab)
+        self.label_6.setGeometry(QtCore.QRect(20, 320, 61, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_6.setFont(font)
+        self.label_6.setObjectName("label_6")
+        self.label_4 = QtWidgets.QLabel(self.tab)
+        self.label_4.setGeometry(QtCore.QRect(20, 280, 31, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_4.setFont(font)
+        self.label_4.setObjectName("label_4")
+        self.label_3 = QtWidgets.QLabel(self.tab)
+        self.label_3.setGeometry(QtCore.QRect(20, 260, 61, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_3.setFont(font)
+        self.label_3.setObjectName("label_3")
+        self.label_5 = QtWidgets.QLabel(self.tab)
+        self.label_5.setGeometry(QtCore.QRect(20, 300, 91, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_5.setFont(font)
+        self.label_5.setObjectName("label_5")
+        self.label_8 = QtWidgets.QLabel(self.tab)
+        self.label_8.setGeometry(QtCore.QRect(150, 240, 41, 21))
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(12)
+        self.label_8.setFont(font)
+        self.label_8.setObjectName("label_8")
+        self.CarbohValue = QtWidgets.QLabel(self.tab)
+        self.CarbohValue.setGeometry(QtCore.QRect(140, 300, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.CarbohValue.setFont(font)
+        self.CarbohValue.setText("")
+        self.CarbohValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.CarbohValue.setObjectName("CarbohValue")
+        self.ProteinValue = QtWidgets.QLabel(self.tab)
+        self.ProteinValue.setGeometry(QtCore.QRect(140, 260, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.ProteinValue.setFont(font)
+        self.ProteinValue.setText("")
+        self.ProteinValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.ProteinValue.setObjectName("ProteinValue")
+        self.CaloriesValue = QtWidgets.QLabel(self.tab)
+        self.CaloriesValue.setGeometry(QtCore.QRect(140, 320, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.CaloriesValue.setFont(font)
+        self.CaloriesValue.setText("")
+        self.CaloriesValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.CaloriesValue.setObjectName("CaloriesValue")
+        self.FatsValue = QtWidgets.QLabel(self.tab)
+        self.FatsValue.setGeometry(QtCore.QRect(140, 280, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.FatsValue.setFont(font)
+        self.FatsValue.setText("")
+        self.FatsValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.FatsValue.setObjectName("FatsValue")
+        self.MaxCaloriesValue = QtWidgets.QLabel(self.tab)
+        self.MaxCaloriesValue.setGeometry(QtCore.QRect(200, 320, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.MaxCaloriesValue.setFont(font)
+        self.MaxCaloriesValue.setText("")
+        self.MaxCaloriesValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.MaxCaloriesValue.setObjectName("MaxCaloriesValue")
+        self.MaxFatsValue = QtWidgets.QLabel(self.tab)
+        self.MaxFatsValue.setGeometry(QtCore.QRect(200, 280, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.MaxFatsValue.setFont(font)
+        self.MaxFatsValue.setText("")
+        self.MaxFatsValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.MaxFatsValue.setObjectName("MaxFatsValue")
+        self.label_7 = QtWidgets.QLabel(self.tab)
+        self.label_7.setGeometry(QtCore.QRect(210, 240, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_7.setFont(font)
+        self.label_7.setObjectName("label_7")
+        self.MaxCarbohValue = QtWidgets.QLabel(self.tab)
+        self.MaxCarbohValue.setGeometry(QtCore.QRect(200, 300, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.MaxCarbohValue.setFont(font)
+        self.MaxCarbohValue.setText("")
+        self.MaxCarbohValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.MaxCarbohValue.setObjectName("MaxCarbohValue")
+        self.MaxProteinValue = QtWidgets.QLabel(self.tab)
+        self.MaxProteinValue.setGeometry(QtCore.QRect(200, 260, 41, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.MaxProteinValue.setFont(font)
+        self.MaxProteinValue.setText("")
+        self.MaxProteinValue.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.MaxProteinValue.setObjectName("MaxProteinValue")
+        self.tableMenu = QtWidgets.QTableWidget(self.tab)
+        self.tableMenu.setGeometry(QtCore.QRect(10, 10, 241, 231))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.tableMenu.setFont(font)
+        self.tableMenu.setObjectName("tableMenu")
+        self.tableMenu.setColumnCount(0)
+        self.tableMenu.setRowCount(0)
+        self.tabWidget.addTab(self.tab, "")
+        self.tableFoods = QtWidgets.QTableView(self.centralwidget)
+        self.tableFoods.setGeometry(QtCore.QRect(320, 90, 331, 331))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.tableFoods.setFont(font)
+        self.tableFoods.setFrameShape(QtWidgets.QFrame.Box)
+        self.tableFoods.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.tableFoods.setObjectName("tableFoods")
+        self.FoodFilterLine = QtWidgets.QLineEdit(self.centralwidget)
+        self.FoodFilterLine.setGeometry(QtCore.QRect(320, 50, 141, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.FoodFilterLine.setFont(font)
+        self.FoodFilterLine.setClearButtonEnabled(True)
+        self.FoodFilterLine.setObjectName("FoodFilterLine")
+        self.AddFoodButton = QtWidgets.QPushButton(self.centralwidget)
+        self.AddFoodButton.setGeometry(QtCore.QRect(580, 50, 31, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.AddFoodButton.setFont(font)
+        self.AddFoodButton.setObjectName("AddFoodButton")
+        self.RemoveFoodButton = QtWidgets.QPushButton(self.centralwidget)
+        self.RemoveFoodButton.setGeometry(QtCore.QRect(620, 50, 31, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.RemoveFoodButton.setFont(font)
+        self.RemoveFoodButton.setObjectName("RemoveFoodButton")
+        self.label_2 = QtWidgets.QLabel(self.centralwidget)
+        self.label_2.setGeometry(QtCore.QRect(470, 50, 51, 31))
+        font = QtGui.QFont()
+        font.setFamily("Times New Roman")
+        font.setPointSize(14)
+        self.label_2.setFont(font)
+        self.label_2.setObjectName("label_2")
+        self.AddFoodToUserMenu_Button = QtWidgets.QPushButton(self.centralwidget)
+        self.AddFoodToUserMenu_Button.setGeometry(QtCore.QRect(280, 190, 31, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.AddFoodToUserMenu_Button.setFont(font)
+        self.AddFoodToUserMenu_Button.setObjectName("AddFoodToUserMenu_Button")
+        self.line = QtWidgets.QFrame(self.centralwidget)
+        self.line.setGeometry(QtCore.QRect(10, 30, 641, 20))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.line.setFont(font)
+        self.line.setFrameShape(QtWidgets.QFrame.HLine)
+        self.line.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.line.setObjectName("line")
+        self.UserChangeParameters_Button = QtWidgets.QPushButton(self.centralwidget)
+        self.UserChangeParameters_Button.setGeometry(QtCore.QRect(320, 0, 81, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.UserChangeParameters_Button.setFont(font)
+        self.UserChangeParameters_Button.setObjectName("UserChangeParameters_Button")
+        self.HeightLabel = QtWidgets.QLabel(self.centralwidget)
+        self.HeightLabel.setGeometry(QtCore.QRect(600, 0, 51, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.HeightLabel.setFont(font)
+        self.HeightLabel.setText("")
+        self.HeightLabel.setObjectName("HeightLabel")
+        self.label_11 = QtWidgets.QLabel(self.centralwidget)
+        self.label_11.setGeometry(QtCore.QRect(550, 0, 41, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_11.setFont(font)
+        self.label_11.setObjectName("label_11")
+        self.label_12 = QtWidgets.QLabel(self.centralwidget)
+        self.label_12.setGeometry(QtCore.QRect(430, 0, 51, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.label_12.setFont(font)
+        self.label_12.setObjectName("label_12")
+        self.WeightLabel = QtWidgets.QLabel(self.centralwidget)
+        self.WeightLabel.setGeometry(QtCore.QRect(480, 0, 51, 31))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.WeightLabel.setFont(font)
+        self.WeightLabel.setText("")
+        self.WeightLabel.setObjectName("WeightLabel")
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 664, 21))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuUser = QtWidgets.QMenu(self.menubar)
+        self.menuUser.setEnabled(False)
+        self.menuUser.setObjectName("menuUser")
+        self.menuFood = QtWidgets.QMenu(self.menubar)
+        self.menuFood.setObjectName("menuFood")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.actionRegister = QtWidgets.QAction(MainWindow)
+        self.actionRegister.setObjectName("actionRegister")
+        self.actionLogin = QtWidgets.QAction(MainWindow)
+        self.actionLogin.setObjectName("actionLogin")
+        self.actionSave_all = QtWidgets.QAction(MainWindow)
+        self.actionSave_all.setObjectName("actionSave_all")
+        self.actionExit = QtWidgets.QAction(MainWindow)
+        self.actionExit.setObjectName("actionExit")
+        self.actionChangeUserParametersMenu = QtWidgets.QAction(MainWindow)
+        self.actionChangeUserParametersMenu.setEnabled(True)
+        self.actionChangeUserParametersMenu.setObjectName("actionChangeUserParametersMenu")
+        self.actionChange_Food = QtWidgets.QAction(MainWindow)
+        self.actionChange_Food.setObjectName("actionChange_Food")
+        self.actionSaveUserMenu = QtWidgets.QAction(MainWindow)
+        self.actionSaveUserMenu.setObjectName("actionSaveUserMenu")
+        self.actionFoodView = QtWidgets.QAction(MainWindow)
+        self.actionFoodView.setObjectName("actionFoodView")
+        self.actionChangeFoodName = QtWidgets.QAction(MainWindow)
+        self.actionChangeFoodName.setObjectName("actionChangeFoodName")
+        self.actionAddFood = QtWidgets.QAction(MainWindow)
+        self.actionAddFood.setObjectName("actionAddFood")
+        self.actionRemoveFood = QtWidgets.QAction(MainWindow)
+        self.actionRemoveFood.setObjectName("actionRemoveFood")
+        self.actionHistory = QtWidgets.QAction(MainWindow)
+        self.actionHistory.setObjectName("actionHistory")
+        self.actionGenerateMenu = QtWidgets.QAction(MainWindow)
+        self.actionGenerateMenu.setObjectName("actionGenerateMenu")
+        self.actionSaveRecipe = QtWidgets.QAction(MainWindow)
+        self.actionSaveRecipe.setObjectName("actionSaveRecipe")
+        self.actionUndo = QtWidgets.QAction(MainWindow)
+        self.actionUndo.setEnabled(False)
+        self.actionUndo.setObjectName("actionUndo")
+        self.actionRedo = QtWidgets.QAction(MainWindow)
+        self.actionRedo.setEnabled(False)
+        self.actionRedo.setObjectName("actionRedo")
+        self.menuFile.addAction(self.actionLogin)
+        self.menuFile.addAction(self.actionSave_all)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionExit)
+        self.menuUser.addAction(self.actionChangeUserParametersMenu)
+        self.menuUser.addSeparator()
+        self.menuUser.addAction(self.actionSaveUserMenu)
+        self.menuUser.addAction(self.actionHistory)
+        self.menuUser.addAction(self.actionGenerateMenu)
+        self.menuFood.addAction(self.actionUndo)
+        self.menuFood.addAction(self.actionRedo)
+        self.menuFood.addSeparator()
+        self.menuFood.addAction(self.actionAddFood)
+        self.menuFood.addAction(self.actionRemoveFood)
+        self.menuFood.addSeparator()
+        self.menuFood.addAction(self.actionChangeFoodName)
+        self.menuFood.addSeparator()
+        self.menuFood.addAction(self.actionSaveRecipe)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuUser.menuAction())
+        self.menubar.addAction(self.menuFood.menuAction())
+
+        self.retranslateUi(MainWindow)
+        self.tabWidget.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "Calculator"))
+        self.label.setText(_translate("MainWindow", "Username:"))
+        self.label_6.setText(_translate("MainWindow", "Calories"))
+        self.label_4.setText(_translate("MainWindow", "Fats"))
+        self.label_3.setText(_translate("MainWindow", "Proteins"))
+        self.label_5.setText(_translate("MainWindow", "Carbohydrates"))
+        self.label_8.setText(_translate("MainWindow", "Total"))
+        self.label_7.setText(_translate("MainWindow", "MAX"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "Daily Ration"))
+        self.FoodFilterLine.setPlaceholderText(_translate("MainWindow", "Search..."))
+        self.AddFoodButton.setText(_translate("MainWindow", "+"))
+        self.RemoveFoodButton.setText(_translate("MainWindow", "-"))
+        self.label_2.setText(_translate("MainWindow", "Food"))
+        self.AddFoodToUserMenu_Button.setText(_translate("MainWindow", "<<"))
+        self.UserChangeParameters_Button.setText(_translate("MainWindow", "Parameters"))
+        self.label_11.setText(_translate("MainWindow", "Height:"))
+        self.label_12.setText(_translate("MainWindow", "Weight:"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuUser.setTitle(_translate("MainWindow", "User"))
+        self.menuFood.setTitle(_translate("MainWindow", "Food"))
+        self.actionRegister.setText(_translate("MainWindow", "Register"))
+        self.actionLogin.setText(_translate("MainWindow", "Login"))
+        self.actionSave_all.setText(_translate("MainWindow", "Save All"))
+        self.actionExit.setText(_translate("MainWindow", "Exit"))
+        self.actionChangeUserParametersMenu.setText(_translate("MainWindow", "View parameters"))
+        self.actionChange_Food.setText(_translate("MainWindow", "Change Food"))
+        self.actionSaveUserMenu.setText(_translate("MainWindow", "Save Menu"))
+        self.actionFoodView.setText(_translate("MainWindow", "View"))
+        self.actionChangeFoodName.setText(_translate("MainWindow", "Change Food Name"))
+        self.actionAddFood.setText(_translate("MainWindow", "Add Food"))
+        self.actionRemoveFood.setText(_translate("MainWindow", "Remove Food"))
+        self.actionHistory.setText(_translate("MainWindow", "History"))
+        self.actionGenerateMenu.setText(_translate("MainWindow", "Generate Menu"))
+        self.actionSaveRecipe.setText(_translate("MainWindow", "Save Menu as Recipe"))
+        self.actionUndo.setText(_translate("MainWindow", "Undo"))
+        self.actionUndo.setShortcut(_translate("MainWindow", "Ctrl+Z"))
+        self.actionRedo.setText(_translate("MainWindow", "Redo"))
+        self.actionRedo.setShortcut(_translate("MainWindow", "Ctrl+Y"))
+
+
+UI_FORM = Ui_MainWindow
+UI_HASH = '7749ca85e5b3ac3eba0d1dcb8dc29474c952dcec'
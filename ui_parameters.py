@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'Parameters.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_DialogParameters(object):
+    def setupUi(self, DialogParameters):
+        DialogParameters.setObjectName("DialogParameters")
+        DialogParameters.resize(512, 171)
+        self.label = QtWidgets.QLabel(DialogParameters)
+        self.label.setGeometry(QtCore.QRect(9, 20, 29, 18))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label.setFont(font)
+        self.label.setObjectName("label")
+        self.Sex_comboBox = QtWidgets.QComboBox(DialogParameters)
+        self.Sex_comboBox.setGeometry(QtCore.QRect(9, 40, 151, 22))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.Sex_comboBox.setFont(font)
+        self.Sex_comboBox.setObjectName("Sex_comboBox")
+        self.Sex_comboBox.addItem("")
+        self.Sex_comboBox.addItem("")
+        self.label_2 = QtWidgets.QLabel(DialogParameters)
+        self.label_2.setGeometry(QtCore.QRect(9, 70, 30, 18))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label_2.setFont(font)
+        self.label_2.setObjectName("label_2")
+        self.AgeLine = QtWidgets.QLineEdit(DialogParameters)
+        self.AgeLine.setGeometry(QtCore.QRect(9, 90, 151, 20))
+        self.AgeLine.setObjectName("AgeLine")
+        self.label_3 = QtWidgets.QLabel(DialogParameters)
+        self.label_3.setGeometry(QtCore.QRect(9, 120, 83, 18))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label_3.setFont(font)
+        self.label_3.setObjectName("label_3")
+        self.HeightLine = QtWidgets.QLineEdit(DialogParameters)
+        self.HeightLine.setGeometry(QtCore.QRect(9, 140, 151, 20))
+        self.HeightLine.setObjectName("HeightLine")
+        self.label_4 = QtWidgets.QLabel(DialogParameters)
+        self.label_4.setGeometry(QtCore.QRect(180, 70, 82, 18))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label_4.setFont(font)
+        self.label_4.setObjectName("label_4")
+        self.WeightLine = QtWidgets.QLineEdit(DialogParameters)
+        self.WeightLine.setGeometry(QtCore.QRect(180, 90, 151, 20))
+        self.WeightLine.setObjectName("WeightLine")
+        self.label_5 = QtWidgets.QLabel(DialogParameters)
+        self.label_5.setGeometry(QtCore.QRect(180, 20, 57, 21))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label_5.setFont(font)
+        self.label_5.setObjectName("label_5")
+        self.Activity_comboBox = QtWidgets.QComboBox(DialogParameters)
+        self.Activity_comboBox.setGeometry(QtCore.QRect(180, 40, 321, 21))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.Activity_comboBox.setFont(font)
+        self.Activity_comboBox.setInsertPolicy(QtWidgets.QComboBox.InsertAtTop)
+        self.Activity_comboBox.setObjectName("Activity_comboBox")
+        self.Activity_comboBox.addItem("")
+        self.Activity_comboBox.addItem("")
+        self.Activity_comboBox.addItem("")
+        self.Activity_comboBox.addItem("")
+        self.SaveButton = QtWidgets.QPushButton(DialogParameters)
+        self.SaveButton.setGeometry(QtCore.QRect(350, 90, 151, 31))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.SaveButton.setFont(font)
+        self.SaveButton.setObjectName("SaveButton")
+        self.CloseButton = QtWidgets.QPushButton(DialogParameters)
+        self.CloseButton.setGeometry(QtCore.QRect(350, 130, 151, 31))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.CloseButton.setFont(font)
+        self.CloseButton.setObjectName("CloseButton")
+        self.goal_comboBox = QtWidgets.QComboBox(DialogParameters)
+        self.goal_comboBox.setGeometry(QtCore.QRect(180, 140, 151, 22))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        self.goal_comboBox.setFont(font)
+        self.goal_comboBox.setObjectName("goal_comboBox")
+        self.goal_comboBox.addItem("")
+        self.goal_comboBox.addItem("")
+        self.goal_comboBox.addItem("")
+        self.label_6 = QtWidgets.QLabel(DialogParameters)
+        self.label_6.setGeometry(QtCore.QRect(180, 120, 71, 16))
+        font = QtGui.QFont()
+        font.setPointSize(11)
+        self.label_6.setFont(font)
+        self.label_6.setObjectName("label_6")
+
+        self.retranslateUi(DialogParameters)
+        self.Sex_comboBox.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(DialogParameters)
+
+    def retranslateUi(self, DialogParameters):
+        _translate = QtCore.QCoreApplication.translate
+        DialogParameters.setWindowTitle(_translate("DialogParameters", "Parameters"))
+        self.label.setText(_translate("DialogParameters", "Sex:"))
+        self.Sex_comboBox.setItemText(0, _translate("DialogParameters", "Male"))
+        self.Sex_comboBox.setItemText(1, _translate("DialogParameters", "Female"))
+        self.label_2.setText(_translate("DialogParameters", "Age:"))
+        self.label_3.setText(_translate("DialogParameters", "Height (cm):"))
+        self.label_4.setText(_translate("DialogParameters", "Weight (kg):"))
+        self.label_5.setText(_translate("DialogParameters", "Lifestyle:"))
+        self.Activity_comboBox.setItemText(0, _translate("DialogParameters", "Moderate activity \n"
+"(sedentary work and light physical\n"
+"exercises or classes 1-3 times a week; housewives)"))
+        self.Activity_comboBox.setItemText(1, _translate("DialogParameters", "Average activity\n"
+"(sedentary work plus exercises 3-5 \n"
+"times per week; housewife with a garden; \n"
+"work on legs up to 12 hours without physical work)"))
+        self.Activity_comboBox.setItemText(2, _translate("DialogParameters", "High activity\n"
+"(intensive exercices 6-7 times per week; \n"
+"work on the legs and intense sports)"))
+        self.Activity_comboBox.setItemText(3, _translate("DialogParameters", "Very high activity\n"
+"(athletes and people who have \n"
+"hard exercices 6-7 times a week)"))
+        self.SaveButton.setText(_translate("DialogParameters", "Save"))
+        self.CloseButton.setText(_translate("DialogParameters", "Close"))
+        self.goal_comboBox.setItemText(0, _translate("DialogParameters", "Lose weight"))
+        self.goal_comboBox.setItemText(1, _translate("DialogParameters", "Maintain weight"))
+        self.goal_comboBox.setItemText(2, _translate("DialogParameters", "Gain weight"))
+        self.label_6.setText(_translate("DialogParameters", "Main goal:"))
+
+
+UI_FORM = Ui_DialogParameters
+UI_HASH = 'e076b50801a6536c51e171b587401bedb9986f97'
@@ -0,0 +1,55 @@
+UNDO_LIMIT = 10000
+
+
+class UndoStack:
+    """Undo and redo of table edits. An edit keeps only the changes undoing and redoing it,
+    in the form of the journal, so its memory depends on the edit and not on the table.
+    Applying the changes through the table journals them as usual edits"""
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.limit = limit
+        self.undoItems = []     # [undo changes, redo changes], the last edit is the last
+        self.redoItems = []
+        self.recording = True   # off while an edit is being undone or redone
+
+    def push(self, undo_changes, redo_changes):
+        """Remembers an edit. A new edit drops the undone ones"""
+
+        if not self.recording or self.limit <= 0:
+            return
+        self.undoItems.append([undo_changes, redo_changes])
+        self.redoItems = []
+        if len(self.undoItems) > self.limit:
+            del self.undoItems[:len(self.undoItems) - self.limit]
+
+    def can_undo(self):
+        return bool(self.undoItems)
+
+    def can_redo(self):
+        return bool(self.redoItems)
+
+    def replay(self, apply_change, from_items, to_items, side):
+        """Applies undo (side 0) or redo (side 1) changes of the last edit and moves it to the other list"""
+
+        if not from_items:
+            return False
+
+        item = from_items.pop()
+        self.recording = False
+        try:
+            for change in item[side]:
+                apply_change(change)
+        finally:
+            self.recording = True
+        to_items.append(item)
+        return True
+
+    def undo(self, apply_change):
+        return self.replay(apply_change, self.undoItems, self.redoItems, 0)
+
+    def redo(self, apply_change):
+        return self.replay(apply_change, self.redoItems, self.undoItems, 1)
+
+    def clear(self):
+        self.undoItems = []
+        self.redoItems = []
@@ -0,0 +1,68 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from metrics import profile_thread
+
+
+class TaskSignals(QObject):
+
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class Task(QRunnable):
+    """Runs steps in a pool thread. Step is a pair (title, function).
+    Sends results of all steps when finished"""
+
+    def __init__(self, steps):
+        super().__init__()
+        self.steps = steps
+        self.signals = TaskSignals()
+
+    def run(self):
+        results = []
+        # Profiling is kept out of try, so it never fails the task
+        with profile_thread():
+            try:
+                for i, (title, step) in enumerate(self.steps):
+                    self.signals.progress.emit(i, len(self.steps), title)
+                    results.append(step())
+            except Exception as error:
+                self.signals.failed.emit(str(error))
+                return
+
+        self.signals.progress.emit(len(self.steps), len(self.steps), "")
+        self.signals.finished.emit(results)
+
+
+class TaskQueue:
+    """Runs tasks one after another in a background thread,
+    so two saves never write the same file at once"""
+
+    def __init__(self):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.tasks = []
+
+    def start(self, steps, on_finished, on_failed, on_progress=None):
+        task = Task(steps)
+        task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(on_failed)
+        if on_progress is not None:
+            task.signals.progress.connect(on_progress)
+
+        # Task must live until its signals are delivered
+        self.tasks.append(task)
+        task.signals.finished.connect(lambda results: self.tasks.remove(task))
+        task.signals.failed.connect(lambda error: self.tasks.remove(task))
+
+        self.pool.start(task)
+        return task
+
+    def is_busy(self):
+        return bool(self.tasks)
+
+    def wait(self):
+        """Blocks until all started tasks are done"""
+
+        self.pool.waitForDone()